@@ -1,22 +1,36 @@
+import importlib
 
 from .session import Session
-from .core import Scheduler
 
-from ._setup import _setup_defaults
-from . import (
-    conditions,
-    log,
-    
-    args,
-    time,
-    tasks,
-)
-from .tasks import FuncTask
-_setup_defaults()
 session = Session()
 session.set_as_default()
 
-from .application import RedEngine
+# The rest is imported when first accessed (PEP 562) as
+# they pull in pandas and register the parsers. Short-lived
+# processes that only need the session do not pay for them.
+_SUBMODULES = ("conditions", "log", "args", "time", "tasks", "core", "parse")
+_ATTRIBUTES = {
+    "Scheduler": "redengine.core",
+    "FuncTask": "redengine.tasks",
+    "RedEngine": "redengine.application",
+}
 
-from . import _version
-__version__ = _version.get_versions()['version']
+def __getattr__(name):
+    if name == "__version__":
+        from . import _version
+        value = _version.get_versions()['version']
+    elif name in _SUBMODULES:
+        from ._setup import _setup_defaults
+        _setup_defaults()
+        value = importlib.import_module(f"{__name__}.{name}")
+    elif name in _ATTRIBUTES:
+        from ._setup import _setup_defaults
+        _setup_defaults()
+        value = getattr(importlib.import_module(_ATTRIBUTES[name]), name)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted([*globals(), "__version__", *_SUBMODULES, *_ATTRIBUTES])
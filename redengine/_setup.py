@@ -1,24 +1,26 @@
-from redengine.core import BaseCondition, Task
+_is_set_up = False
 
-from redengine.session import Session, Config
-from redengine.parse import add_condition_parser
-from redengine.conditions import true, false
-from redengine.tasks import CommandTask, FuncTask, CodeTask
-from redengine.tasks.maintain import ShutDown, Restart
-from redengine.tasks.maintain import Restart
+def _setup_defaults():
+    """Set up the task classes and conditions Redengine provides out-of-the-box
 
-from redengine.conditions.meta import _FuncTaskCondWrapper
+    The conditions, time periods and tasks (and their parsers)
+    are loaded lazily thus this is called when they are first
+    needed (ie. a task is created or a condition is parsed).
+    Calling this again does nothing."""
+    global _is_set_up
+    if _is_set_up:
+        return
+    # Set before importing as the imports may set up (recursively)
+    _is_set_up = True
 
-def _setup_defaults():
-    "Set up the task classes and conditions Redengine provides out-of-the-box"
-    
-    # Add some extra parsers from core 
-    add_condition_parser({
-        "true": true,
-        "false": false,
-        "always false": false,
-        "always true": true
-    })
+    from redengine.core import BaseCondition, Task
+
+    from redengine.session import Session, Config
+    from redengine import conditions, log, args, time, tasks
+    from redengine.tasks import CommandTask, FuncTask, CodeTask
+    from redengine.tasks.maintain import ShutDown, Restart
+
+    from redengine.conditions.meta import _FuncTaskCondWrapper
 
     # Update type hints
     cls_tasks = (
@@ -34,4 +36,4 @@ def _setup_defaults():
     Config.update_forward_refs(BaseCondition=BaseCondition)
     #Session.update_forward_refs(
     #    Task=Task, Parameters=Parameters, Scheduler=Scheduler
-    #)
\ No newline at end of file
+    #)
@@ -34,9 +34,9 @@ class _AppMixin:
         else:
             return FuncTask(name_include_module=False, _name_template='{func_name}', **kwargs)
 
-    def param(self, name:Optional[str]=None):
+    def param(self, name:Optional[str]=None, cache=None):
         "Set one session parameter (decorator)"
-        return FuncParam(name, session=self.session)
+        return FuncParam(name, session=self.session, cache=cache)
 
 
 class RedEngine(_AppMixin):
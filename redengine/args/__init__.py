@@ -1,3 +1,3 @@
 
-from .builtin import Arg, FuncArg, Return, Session, Task
+from .builtin import Arg, FuncArg, Return, Session, Task, Shared
 from .secret import Private
\ No newline at end of file
@@ -1,8 +1,15 @@
 
-from typing import Any, Callable
+import time
+import logging
+import datetime
+import threading
+from typing import Any, Callable, Union
 
 from redengine.core.parameters import BaseArgument
 from redengine.core.utils import filter_keyword_args
+from redengine.core.utils.shared import SharedValue
+
+logger = logging.getLogger(__name__)
 
 class SimpleArg(BaseArgument):
     """A simple argument.
@@ -81,6 +88,14 @@ class Return(BaseArgument):
         @FuncTask(parameters={"myarg": Return('my_task_1')})
         def my_task_2(myarg):
             ...
+
+    Notes
+    -----
+    Large return values (NumPy arrays, pandas objects and 
+    bytes) of process tasks are passed via shared memory
+    (see ``Config.shared_memory_threshold``). Only a 
+    handle to them is passed to the process tasks
+    using the argument.
     """
 
     def __init__(self, task_name, default=None):
@@ -88,17 +103,111 @@ class Return(BaseArgument):
         self.default = default
 
     def get_value(self, task=None) -> Any:
+        value = self._get_return(task)
+        if isinstance(value, SharedValue):
+            return value.load()
+        return value
+
+    def _get_return(self, task=None) -> Any:
+        "Get the return (SharedValue is not read)"
         session = task.session
         input_task = session[self.task_name]
         try:
-            return session.returns[input_task]
+            return session.returns._get_raw(input_task)
         except KeyError:
             if input_task not in session:
                 raise KeyError(f"Task {repr(self.task_name)} does not exists. Cannot get return value")
             return self.default
 
     def stage(self, task=None):
-        return SimpleArg(self.get_value(task))
+        value = self._get_return(task)
+        if isinstance(value, SharedValue):
+            # Only the handle is passed to the child
+            return SharedArg(value)
+        return SimpleArg(value)
+
+class SharedArg(BaseArgument):
+    """An argument which value is in shared memory.
+    The value is read (zero-copy for arrays) when
+    the value is requested.
+
+    Parameters
+    ----------
+    value : SharedValue
+        Handle to the value.
+    readonly : bool
+        Whether the arrays of the value are read-only.
+        If False, they are copy-on-write.
+    """
+    def __init__(self, value:SharedValue, readonly:bool=False):
+        self._value = value
+        self.readonly = readonly
+
+    def get_value(self, task=None) -> Any:
+        return self._value.load(readonly=self.readonly)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._value!r})'
+
+class Shared(BaseArgument):
+    """An argument which value is shared with the
+    process tasks via shared memory.
+
+    The value is put to shared memory when first 
+    passed to a process task and the child processes 
+    read it zero-copy and read-only. Useful for large
+    reference data (ie. lookup tables) used by
+    multiple tasks. Assign a new value to update it:
+    modifying the value in place is not reflected to
+    the shared memory.
+
+    Parameters
+    ----------
+    value : Any
+        Value of the argument. Should be picklable.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        from redengine import session
+        from redengine.args import Shared
+
+        session.parameters["lookup"] = Shared(pd.read_csv("lookup.csv"))
+
+        @FuncTask(execution="process")
+        def my_task(lookup):
+            ...
+    """
+    def __init__(self, value:Any):
+        self.value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._handle = None
+
+    def get_value(self, task=None) -> Any:
+        return self._value
+
+    def stage(self, task=None):
+        if task is not None and task.get_execution() != "process":
+            # Threads use the value directly
+            return self
+        if self._handle is None:
+            self._handle = SharedValue.create(self._value)
+            self._handle.own()
+        return SharedArg(self._handle, readonly=True)
+
+    def __getstate__(self):
+        # Only passed to the children via staging
+        state = self.__dict__.copy()
+        state["_handle"] = None
+        return state
 
 class FuncArg(BaseArgument):
     """An argument which value is defined by the 
@@ -131,6 +240,15 @@ class FuncArg(BaseArgument):
         def my_task(my_param):
             ...
 
+    Compute the value at most once per scheduler cycle 
+    (or ie. once in 10 minutes with ``datetime.timedelta(minutes=10)``)
+    for all tasks:
+
+    .. code-block:: python
+
+        arg = FuncArg(my_func)
+        arg.cache = "cycle"
+
     Example to set to session:
 
     .. doctest:: funcarg
@@ -149,6 +267,27 @@ class FuncArg(BaseArgument):
         self.func = __func
         self.args = args
         self.kwargs = self._get_kwargs(kwargs)
+        self._lock = threading.Lock()
+        self._cached = None # (cycle or time, value)
+        self.cache = None
+
+    @property
+    def cache(self) -> Union[None, str, datetime.timedelta]:
+        """None, str or timedelta: How long the value is
+        reused by all the tasks: None (not cached), 
+        "cycle" (once per scheduler cycle) or time to live
+        as timedelta (or seconds). Cached values are 
+        computed in the scheduler also for process tasks."""
+        return self._cache
+
+    @cache.setter
+    def cache(self, value):
+        if isinstance(value, (int, float)):
+            value = datetime.timedelta(seconds=value)
+        if not (value is None or value == "cycle" or isinstance(value, datetime.timedelta)):
+            raise ValueError(f"Invalid cache: {value!r}. Use None, 'cycle' or time to live (timedelta or seconds)")
+        self._cache = value
+        self._cached = None
 
     def _get_kwargs(self, kwargs):
         defaults = {
@@ -158,7 +297,43 @@ class FuncArg(BaseArgument):
         return filter_keyword_args(self.func, defaults)
 
     def get_value(self, task=None):
-        return self(task=task)
+        if self.cache is None:
+            return self._compute(task=task)
+        with self._lock:
+            session = task.session if task is not None else self.session
+            if self.cache == "cycle":
+                key = (id(session.scheduler), session.scheduler.n_cycles)
+                is_valid = self._cached is not None and self._cached[0] == key
+            else:
+                key = session.clock.time()
+                is_valid = self._cached is not None and key - self._cached[0] < self.cache.total_seconds()
+            if not is_valid:
+                self._cached = (key, self._compute(task=task))
+            return self._cached[1]
+
+    def stage(self, task=None):
+        if self.cache is None:
+            # Computed in the child
+            return self
+        # Computed (or reused) here to share
+        # the value with other tasks
+        return SimpleArg(self.get_value(task))
+
+    def _compute(self, task=None):
+        start = time.perf_counter()
+        value = self(task=task)
+        logger.debug(f"Materialized {self!r} in {time.perf_counter() - start:.3f} seconds")
+        return value
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_cached"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
     def __call__(self, **kwargs):
         kwargs.update(self.kwargs)
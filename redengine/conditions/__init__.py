@@ -101,4 +101,17 @@ def _set_scheduler_parsing():
 
 _set_is_period_parsing()
 _set_task_has_parsing()
-_set_scheduler_parsing()
\ No newline at end of file
+_set_scheduler_parsing()
+
+def _set_default_parsing():
+
+    Session._cls_cond_parsers.update(
+        {
+            "true": true,
+            "false": false,
+            "always false": false,
+            "always true": true,
+        }
+    )
+
+_set_default_parsing()
@@ -71,6 +71,9 @@ class TaskCond(BaseCondition):
             ...
 
     """
+    # Parsing creates a task thus the parsed
+    # condition cannot be restored from a cache
+    _cacheable = False
 
     def __init__(self,
                  session,
@@ -122,7 +125,7 @@ class TaskCond(BaseCondition):
 
     def _set_parsing(self):
         from redengine.parse import CondParser
-        self.session._cond_parsers[self.syntax] = CondParser(func=self._set_task, session=self.session, cached=True)
+        self.session.get_cond_parsers()[self.syntax] = CondParser(func=self._set_task, session=self.session, cached=True)
 
     def _get_func_name(self, func):
         func_module = func.__module__
@@ -9,6 +9,7 @@ from redengine.core.condition import Statement, Historical, Comparable, All
 from redengine.core.time import TimeDelta
 from ..time import IsPeriod
 from redengine.time.construct import get_before, get_between, get_full_cycle, get_after, get_on
+from redengine.time.cron import Cron
 
 
 class TaskStarted(Historical, Comparable):
@@ -30,7 +31,7 @@ class TaskStarted(Historical, Comparable):
 
         task = Statement.session.get_task(task)
         if _start_ is None and _end_ is None:
-            now = datetime.datetime.fromtimestamp(time.time())
+            now = self.session.clock.now()
             interv = task.period.rollback(now)
             _start_, _end_ = interv.left, interv.right
 
@@ -300,6 +301,7 @@ class TaskExecutable(Historical):
             None: get_full_cycle,
             "every": TimeDelta,
             "on": get_on,
+            "cron": Cron,
         }[span_type]
         period = period_func(**kwargs)
         return cls(period=period)
@@ -312,6 +314,7 @@ class TaskExecutable(Historical):
         re.compile(r"(run )?(?P<type_>monthly|weekly|daily|hourly|minutely)"): "_from_period",
         re.compile(r"(run )?(?P<type_>monthly|weekly|daily|hourly|minutely) (?P<span_type>on) (?P<start>.+)"): "_from_period",
         re.compile(r"(run )?(?P<span_type>every) (?P<past>.+)"): "_from_period",
+        re.compile(r"(run )?(?P<span_type>cron) '(?P<expression>.+)'"): "_from_period",
     }
 
 
@@ -58,7 +58,7 @@ class TaskStatusMixin:
 
         task = Statement.session.get_task(task)
         if _start_ is None and _end_ is None:
-            now = datetime.datetime.fromtimestamp(time.time())
+            now = self.session.clock.now()
             interv = task.period.rollback(now)
             _start_, _end_ = interv.left, interv.right
         
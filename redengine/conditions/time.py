@@ -35,7 +35,7 @@ class IsPeriod(BaseCondition):
         self.period = period
 
     def __bool__(self):
-        return datetime.datetime.now() in self.period
+        return self.session.clock.timestamp() in self.period
 
     def __str__(self):
         if hasattr(self, "_str"):
@@ -1,12 +1,26 @@
+import importlib
 
-from . import task
+# The submodules are imported when first accessed (PEP 562)
+# as they pull in pandas and the rest of the machinery
+_SUBMODULES = ("task", "time", "schedule", "condition")
+_ATTRIBUTES = {
+    "Parameters": "parameters",
+    "BaseArgument": "parameters",
+    "Scheduler": "schedule",
+    "Task": "task",
+    "BaseCondition": "condition",
+    "TimePeriod": "time",
+}
 
-from . import time
-from . import schedule
-from . import condition
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _ATTRIBUTES:
+        module = importlib.import_module(f"{__name__}.{_ATTRIBUTES[name]}")
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .parameters import Parameters, BaseArgument
-from .schedule import Scheduler
-from .task import Task
-from .condition import BaseCondition
-from .time import TimePeriod
\ No newline at end of file
+def __dir__():
+    return sorted([*globals(), *_SUBMODULES, *_ATTRIBUTES])
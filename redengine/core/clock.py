@@ -0,0 +1,176 @@
+import os
+import time
+import datetime
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+class _Snapshot:
+    "Current time taken once (in different formats)"
+
+    def __init__(self, time:float, now:datetime.datetime):
+        self.time = time
+        self.now = now
+        self._timestamp = None
+
+    @property
+    def timestamp(self) -> 'pd.Timestamp':
+        if self._timestamp is None:
+            import pandas as pd
+            self._timestamp = pd.Timestamp(self.now)
+        return self._timestamp
+
+
+class Clock:
+    """Source of current time of a session.
+
+    The scheduler, the tasks and the conditions
+    get the current time from the clock of the
+    session instead of the system clock directly.
+
+    The clock can be frozen so that the current time
+    is taken only once and the same time is used till
+    the clock is unfrozen. The scheduler freezes the
+    clock for each cycle (see ``Config.freeze_time``)
+    so that all the conditions of a cycle are checked
+    against the same moment. Only the thread that froze
+    the clock sees the frozen time.
+
+    Examples
+    --------
+    >>> from redengine import session
+    >>> session.clock.now() # doctest: +SKIP
+    datetime.datetime(2022, 1, 1, 12, 0)
+    >>> with session.clock.frozen():
+    ...     assert session.clock.now() == session.clock.now()
+    """
+
+    _frozen: Optional[Tuple[int, int, _Snapshot]] = None
+
+    def time(self) -> float:
+        "Get current time as seconds from epoch"
+        snapshot = self._get_snapshot()
+        return snapshot.time if snapshot is not None else time.time()
+
+    def now(self) -> datetime.datetime:
+        "Get current time as datetime"
+        snapshot = self._get_snapshot()
+        return snapshot.now if snapshot is not None else datetime.datetime.fromtimestamp(time.time())
+
+    def timestamp(self) -> 'pd.Timestamp':
+        "Get current time as pd.Timestamp"
+        snapshot = self._get_snapshot()
+        if snapshot is not None:
+            return snapshot.timestamp
+        import pandas as pd
+        return pd.Timestamp(self.now())
+
+    def sleep(self, seconds:float):
+        "Wait given amount of seconds"
+        time.sleep(seconds)
+
+    def freeze(self):
+        "Take the current time and use it till unfrozen"
+        snapshot = self._take_snapshot()
+        self._frozen = (os.getpid(), threading.get_ident(), snapshot)
+
+    def unfreeze(self):
+        "Use the actual current time again"
+        self._frozen = None
+
+    @property
+    def is_frozen(self) -> bool:
+        "bool: Whether the current time is frozen (for this thread)"
+        return self._get_snapshot() is not None
+
+    @contextmanager
+    def frozen(self):
+        "Freeze the clock for the duration of the block"
+        if self.is_frozen:
+            # Already frozen by outer block
+            yield self
+            return
+        self.freeze()
+        try:
+            yield self
+        finally:
+            self.unfreeze()
+
+    @contextmanager
+    def unfrozen(self):
+        """Use the actual time for the duration of the
+        block and freeze again to the new time after"""
+        was_frozen = self.is_frozen
+        self.unfreeze()
+        try:
+            yield self
+        finally:
+            if was_frozen:
+                self.freeze()
+
+    def _take_snapshot(self) -> _Snapshot:
+        now = time.time()
+        return _Snapshot(now, datetime.datetime.fromtimestamp(now))
+
+    def _get_snapshot(self) -> Optional[_Snapshot]:
+        frozen = self._frozen
+        if frozen is None:
+            return None
+        pid, thread_id, snapshot = frozen
+        if thread_id != threading.get_ident() or pid != os.getpid():
+            # Other threads and child processes
+            # see the actual time
+            return None
+        return snapshot
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_frozen", None)
+        return state
+
+
+class VirtualClock(Clock):
+    """Clock that moves only when told to.
+
+    Used in simulations (see ``Session.simulate``)
+    to run the scheduler faster than real time.
+
+    Parameters
+    ----------
+    start : datetime-like
+        Initial time of the clock.
+    """
+
+    def __init__(self, start:Union[str, datetime.datetime]):
+        self.set(start)
+
+    def time(self) -> float:
+        return self._now.timestamp()
+
+    def now(self) -> datetime.datetime:
+        return self._now
+
+    def timestamp(self) -> 'pd.Timestamp':
+        if self._timestamp is None:
+            import pandas as pd
+            self._timestamp = pd.Timestamp(self._now)
+        return self._timestamp
+
+    def sleep(self, seconds:float):
+        "Move the clock forward (does not wait)"
+        self.advance(seconds)
+
+    def advance(self, seconds:Union[float, datetime.timedelta]):
+        "Move the clock forward"
+        if not isinstance(seconds, datetime.timedelta):
+            seconds = datetime.timedelta(seconds=seconds)
+        self.set(self._now + seconds)
+
+    def set(self, dt:Union[str, datetime.datetime]):
+        "Move the clock to given time"
+        import pandas as pd
+        self._now = pd.Timestamp(dt).to_pydatetime(warn=False)
+        self._timestamp = None
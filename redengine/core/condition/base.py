@@ -89,6 +89,10 @@ class BaseCondition(RedBase, metaclass=_ConditionMeta):
     __parsers__ = {}
     __register__ = False
 
+    # Whether the parsed condition can be stored
+    # to the parse cache (see Config.parse_cache)
+    _cacheable = True
+
     @abstractmethod
     def __bool__(self) -> bool:
         """Check whether the condition holds.
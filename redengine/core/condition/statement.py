@@ -218,7 +218,7 @@ class Historical(Statement):
         if self.period is None:
             return kwargs
 
-        dt = datetime.datetime.fromtimestamp(time.time())
+        dt = self.session.clock.timestamp()
 
         interval = self.period.rollback(dt)
         start = interval.left
@@ -0,0 +1,519 @@
+"""Forecasting when the tasks of a session will start.
+
+The start conditions are translated to constraints that
+know the next moment they allow a run (as nanoseconds
+from epoch, wall clock time). The time periods of the
+conditions are materialized in bulk (see
+``TimePeriod.occurrences``) so the prediction does
+not need to evaluate the conditions cycle by cycle.
+
+The forecast assumes that the tasks start as soon as
+their conditions allow, that they finish instantly and
+that they succeed.
+"""
+
+import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from redengine.core.time.utils import to_epoch_ns, timedelta_to_ns
+from redengine.core.time.base import _sweep_occurrences
+
+if TYPE_CHECKING:
+    from redengine import Session
+    from redengine.core import Task, BaseCondition
+    from redengine.core.time import TimePeriod
+
+
+class Unforecastable(Exception):
+    "The condition cannot be analysed"
+
+
+class _Constraint:
+    """Part of a start condition.
+
+    Attributes
+    ----------
+    limits : bool
+        Whether a run of the task makes the constraint
+        false (for a while). If not, the condition keeps
+        holding after the task has started.
+    """
+    limits = False
+
+    def next_allowed(self, ns:int, last:Optional[int]) -> Optional[int]:
+        """Get the earliest moment at or after ns when the
+        constraint holds given the task last ran at last.
+        Returns None if never."""
+        raise NotImplementedError
+
+    def holds_until(self, ns:int) -> int:
+        "Get the moment until the constraint holds (from ns)"
+        return ns
+
+    def bulk(self, start:int, end:int, last:Optional[int]) -> Optional[np.ndarray]:
+        "Get the runs at once if possible"
+        return None
+
+
+class _Always(_Constraint):
+
+    def next_allowed(self, ns, last):
+        return ns
+
+    def holds_until(self, ns):
+        return np.iinfo(np.int64).max
+
+
+class _Never(_Constraint):
+
+    def next_allowed(self, ns, last):
+        return None
+
+
+class _Window(_Constraint):
+    "Constraint that holds in given intervals (ie. IsPeriod)"
+
+    def __init__(self, starts:np.ndarray, ends:np.ndarray):
+        self.starts = starts
+        self.ends = ends
+
+    def _locate(self, ns):
+        # Index of the first interval that has not ended by ns
+        return int(np.searchsorted(self.ends, ns, side="left"))
+
+    def next_allowed(self, ns, last):
+        i = self._locate(ns)
+        if i == len(self.ends):
+            return None
+        return max(ns, int(self.starts[i]))
+
+    def holds_until(self, ns):
+        i = self._locate(ns)
+        if i < len(self.ends) and self.starts[i] <= ns:
+            return int(self.ends[i])
+        return ns
+
+
+class _OncePer(_Window):
+    """Constraint that holds in given intervals till
+    the task has run in them (ie. TaskExecutable)"""
+    limits = True
+
+    def next_allowed(self, ns, last):
+        i = self._locate(ns)
+        while i < len(self.ends):
+            start = int(self.starts[i])
+            if last is None or not (start <= last <= self.ends[i]):
+                return max(ns, start)
+            # Already ran in the interval
+            i += 1
+        return None
+
+    def bulk(self, start, end, last):
+        return self._first_in(None, start, end, last)
+
+    def _first_in(self, window:Optional[_Window], start, end, last):
+        "Get the first allowed moments of the intervals (inside the window)"
+        starts = np.maximum(self.starts, start)
+        ends = np.minimum(self.ends, end)
+        if window is not None:
+            if not len(window.ends):
+                return np.array([], dtype=np.int64)
+            index = np.searchsorted(window.ends, starts, side="left")
+            is_found = index < len(window.ends)
+            index = np.minimum(index, len(window.ends) - 1)
+            starts = np.where(is_found, np.maximum(starts, window.starts[index]), end + 1)
+        mask = starts <= ends
+        if last is not None:
+            mask &= ~((self.starts <= last) & (last <= self.ends))
+        return starts[mask]
+
+
+class _Every(_Constraint):
+    """Constraint that holds when given time has passed from
+    the last run (or from the last finish if later)"""
+    limits = True
+
+    def __init__(self, delta:int, finished:Optional[int]=None):
+        self.delta = delta
+        self.finished = finished
+
+    def get_base(self, last:Optional[int]) -> Optional[int]:
+        "Get the time the delta is counted from"
+        if last is None or self.finished is None:
+            return self.finished if last is None else last
+        return max(last, self.finished)
+
+    def next_allowed(self, ns, last):
+        base = self.get_base(last)
+        if base is None:
+            return ns
+        return max(ns, base + self.delta)
+
+    def bulk(self, start, end, last):
+        base = self.get_base(last)
+        first = start if base is None else max(start, base + self.delta)
+        return np.arange(first, end + 1, self.delta, dtype=np.int64)
+
+
+class _Depend(_Constraint):
+    """Constraint that holds when another task has
+    finished after the task last ran (ie. DependSuccess)"""
+    limits = True
+
+    def __init__(self, finishes:np.ndarray):
+        self.finishes = finishes
+
+    def next_allowed(self, ns, last):
+        i = 0 if last is None else int(np.searchsorted(self.finishes, last, side="right"))
+        if i == len(self.finishes):
+            return None
+        return max(ns, int(self.finishes[i]))
+
+    def bulk(self, start, end, last):
+        finishes = self.finishes if last is None else self.finishes[self.finishes > last]
+        runs = np.unique(np.maximum(finishes, start))
+        return runs[runs <= end]
+
+
+class _AllOf(_Constraint):
+
+    max_iterations = 10_000
+
+    def __init__(self, constraints:List[_Constraint]):
+        self.constraints = constraints
+        self.limits = any(constr.limits for constr in constraints)
+
+    def next_allowed(self, ns, last):
+        for _ in range(self.max_iterations):
+            latest = ns
+            for constr in self.constraints:
+                allowed = constr.next_allowed(ns, last)
+                if allowed is None:
+                    return None
+                latest = max(latest, allowed)
+            if latest == ns:
+                # All hold at ns
+                return ns
+            ns = latest
+        return None
+
+    def holds_until(self, ns):
+        return min(constr.holds_until(ns) for constr in self.constraints)
+
+    def bulk(self, start, end, last):
+        # Only a run limiting constraint restricted
+        # by windows can be calculated at once
+        windows = [constr for constr in self.constraints if type(constr) is _Window]
+        limiting = [constr for constr in self.constraints if type(constr) in (_Every, _OncePer)]
+        if len(limiting) != 1 or len(limiting) + len(windows) != len(self.constraints):
+            return None
+        limiting = limiting[0]
+
+        if isinstance(limiting, _OncePer):
+            if windows:
+                starts, ends = _sweep_occurrences(
+                    [(window.starts, window.ends) for window in windows],
+                    min_count=len(windows)
+                )
+                windows = _Window(starts, ends)
+            else:
+                windows = None
+            return limiting._first_in(windows, start, end, last)
+
+        # Runs with the interval inside the windows
+        delta = limiting.delta
+        windows = _AllOf(windows)
+        runs = []
+        ns = start
+        while True:
+            ns = windows.next_allowed(ns, None)
+            if ns is None or ns > end:
+                break
+            base = limiting.get_base(last)
+            if base is not None and ns < base + delta:
+                ns = base + delta
+                continue
+            until = min(windows.holds_until(ns), end)
+            window_runs = np.arange(ns, until + 1, delta, dtype=np.int64)
+            runs.append(window_runs)
+            last = int(window_runs[-1])
+            ns = until + 1
+        return np.concatenate(runs) if runs else np.array([], dtype=np.int64)
+
+
+class _AnyOf(_Constraint):
+
+    def __init__(self, constraints:List[_Constraint]):
+        self.constraints = constraints
+        self.limits = all(constr.limits for constr in constraints)
+
+    def next_allowed(self, ns, last):
+        allowed = [constr.next_allowed(ns, last) for constr in self.constraints]
+        allowed = [val for val in allowed if val is not None]
+        return min(allowed) if allowed else None
+
+    def holds_until(self, ns):
+        return max(
+            (
+                constr.holds_until(ns)
+                for constr in self.constraints
+                if constr.next_allowed(ns, None) == ns
+            ),
+            default=ns
+        )
+
+
+class Forecaster:
+    """Predicts the start times of the tasks
+    of a session.
+
+    Parameters
+    ----------
+    session : redengine.Session
+        Session to forecast.
+    start : datetime-like
+        Start of the forecast.
+    end : datetime-like
+        End of the forecast.
+    """
+
+    def __init__(self, session:'Session', start, end):
+        self.session = session
+        self.start = to_epoch_ns(pd.Timestamp(start))
+        self.end = to_epoch_ns(pd.Timestamp(end))
+
+        self._tasks = {task.name: task for task in session.tasks}
+
+        self._occurrences: Dict[Tuple[type, str], Tuple[np.ndarray, np.ndarray]] = {}
+        self._runs: Dict[str, Tuple[np.ndarray, str]] = {}
+        self._unknown: Dict[str, str] = {}
+        self._resolving = set()
+
+    def forecast(self) -> pd.DataFrame:
+        "Get the predicted starts as data frame"
+        names, starts, statuses, reasons = [], [], [], []
+        for task in self._ordered_tasks():
+            try:
+                runs, status = self.get_runs(task)
+            except Unforecastable as exc:
+                runs = np.array([np.iinfo(np.int64).min]) # NaT
+                status = "unknown"
+                reason = str(exc)
+            else:
+                reason = None
+            names.append(task.name)
+            starts.append(runs)
+            statuses.append(status)
+            reasons.append(reason)
+
+        # Expand the per task values to the runs
+        counts = [len(runs) for runs in starts]
+        df = pd.DataFrame({
+            "task": np.repeat(np.array(names, dtype=object), counts),
+            "start": np.concatenate(starts or [np.array([], dtype=np.int64)]).astype(np.int64).view("datetime64[ns]"),
+            "status": np.repeat(np.array(statuses, dtype=object), counts),
+            "reason": np.repeat(np.array(reasons, dtype=object), counts),
+        })
+        return df.sort_values(["start", "task"], kind="stable", na_position="last").reset_index(drop=True)
+
+    def get_runs(self, task:'Task') -> Tuple[np.ndarray, str]:
+        """Get the predicted runs of a task (as nanoseconds
+        from epoch) and the status of the prediction"""
+        name = task.name
+        if name in self._runs:
+            return self._runs[name]
+        if name in self._unknown:
+            raise Unforecastable(self._unknown[name])
+        if name in self._resolving:
+            raise Unforecastable(f"Circular dependency with task '{name}'")
+
+        self._resolving.add(name)
+        try:
+            if task.disabled:
+                result = (np.array([], dtype=np.int64), "predicted")
+            else:
+                constraint = self.get_constraint(task.start_cond, task=task)
+                last = None if task.last_run is None else to_epoch_ns(task.last_run)
+                result = (
+                    self._predict(constraint, last),
+                    "predicted" if constraint.limits else "continuous"
+                )
+        except Unforecastable as exc:
+            self._unknown[name] = str(exc)
+            raise
+        finally:
+            self._resolving.discard(name)
+        self._runs[name] = result
+        return result
+
+    def _predict(self, constraint:_Constraint, last:Optional[int]) -> np.ndarray:
+        runs = constraint.bulk(self.start, self.end, last)
+        if runs is not None:
+            return runs
+
+        runs = []
+        ns = self.start
+        while ns <= self.end:
+            ns = constraint.next_allowed(ns, last)
+            if ns is None or ns > self.end:
+                break
+            runs.append(ns)
+            if constraint.limits:
+                last = ns
+                ns += 1
+            else:
+                # The condition keeps holding
+                # thus only the beginning is relevant
+                ns = constraint.holds_until(ns) + 1
+        return np.array(runs, dtype=np.int64)
+
+    def get_constraint(self, cond:'BaseCondition', task:'Task') -> _Constraint:
+        "Turn a condition to a constraint"
+        from redengine.core.condition import All, Any, Not, AlwaysTrue, AlwaysFalse
+        from redengine.core.time import TimeDelta
+        from redengine.conditions import IsPeriod, TaskExecutable, DependSuccess, DependFinish, DependFailure
+
+        if isinstance(cond, AlwaysTrue):
+            return _Always()
+        elif isinstance(cond, AlwaysFalse):
+            return _Never()
+        elif isinstance(cond, All):
+            return _AllOf([self.get_constraint(sub, task=task) for sub in cond])
+        elif isinstance(cond, Any):
+            return _AnyOf([self.get_constraint(sub, task=task) for sub in cond])
+        elif isinstance(cond, Not) and isinstance(cond.condition, (AlwaysTrue, AlwaysFalse)):
+            return _Never() if isinstance(cond.condition, AlwaysTrue) else _Always()
+        elif isinstance(cond, IsPeriod):
+            return _Window(*self.get_occurrences(cond.period))
+        elif isinstance(cond, TaskExecutable):
+            if not self._is_task(cond.kwargs.get("task"), task):
+                raise Unforecastable(f"Condition {cond!r} observes another task")
+            period = cond.period
+            if isinstance(period, TimeDelta):
+                delta = timedelta_to_ns(period.past)
+                if delta <= 0:
+                    return _Always()
+                finishes = [
+                    getattr(task, f"last_{action}")
+                    for action in ("success", "fail", "inaction", "terminate")
+                ]
+                finishes = [to_epoch_ns(dt) for dt in finishes if dt is not None]
+                return _Every(delta, finished=max(finishes, default=None))
+            return _OncePer(*self.get_occurrences(period, extend_back=True))
+        elif isinstance(cond, (DependSuccess, DependFinish, DependFailure)):
+            if not self._is_task(cond.kwargs.get("task"), task):
+                raise Unforecastable(f"Condition {cond!r} observes another task")
+            return _Depend(self._get_finishes(cond))
+        raise Unforecastable(f"Condition {cond!r} cannot be forecasted")
+
+    def get_occurrences(self, period:'TimePeriod', extend_back=False) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the occurrences of a period in the forecast range.
+        If extend_back, the first interval is not clipped to the
+        start of the forecast."""
+        # Same periods are shared by many tasks (ie. daily)
+        key = (type(period), repr(period), extend_back)
+        if key in self._occurrences:
+            return self._occurrences[key]
+
+        starts, ends = period._occurrences_ns(self.start, self.end)
+        if extend_back and len(starts) and starts[0] == self.start:
+            starts = starts.copy()
+            starts[0] = min(period._rollback_span(self.start)[0], self.start)
+
+        self._occurrences[key] = (starts, ends)
+        return starts, ends
+
+    def _get_finishes(self, cond) -> np.ndarray:
+        "Get the times the depend task finishes (in the way the condition requires)"
+        from redengine.conditions import DependSuccess, DependFinish
+        try:
+            depend_task = self._get_task(cond.kwargs["depend_task"])
+        except KeyError:
+            raise Unforecastable(f"Task '{cond.kwargs['depend_task']}' not found")
+
+        if isinstance(cond, DependSuccess):
+            latest = depend_task.last_success
+        elif isinstance(cond, DependFinish):
+            latest = max(
+                (dt for dt in (depend_task.last_success, depend_task.last_fail) if dt is not None),
+                default=None
+            )
+        else:
+            # Predicted runs are assumed to succeed
+            latest = depend_task.last_fail
+            return np.array([] if latest is None else [to_epoch_ns(latest)], dtype=np.int64)
+
+        runs, status = self.get_runs(depend_task)
+        if status != "predicted":
+            raise Unforecastable(f"Task '{depend_task.name}' runs continuously")
+        past = [] if latest is None else [to_epoch_ns(latest)]
+        return np.concatenate([np.array(past, dtype=np.int64), runs])
+
+    def get_depends(self) -> Dict[str, set]:
+        "Get the names of the tasks each task depends on"
+        from redengine.core.condition import BaseCondition
+        from redengine.conditions import DependSuccess, DependFinish, DependFailure
+
+        depends = {}
+        for task in self._tasks.values():
+            names = set()
+            conds = [task.start_cond]
+            while conds:
+                cond = conds.pop()
+                if isinstance(cond, (DependSuccess, DependFinish, DependFailure)):
+                    dep = cond.kwargs["depend_task"]
+                    names.add(dep if isinstance(dep, str) else dep.name)
+                conds.extend(
+                    sub for sub in getattr(cond, "subconditions", ())
+                    if isinstance(sub, BaseCondition)
+                )
+            depends[task.name] = names
+        return depends
+
+    def _ordered_tasks(self) -> List['Task']:
+        """Get the tasks so that the depended tasks come
+        first (to avoid deep recursion with long chains)"""
+        tasks = sorted(self._tasks.values(), key=lambda task: task.name)
+        depends = self.get_depends()
+
+        ordered = []
+        visited = set()
+        for task in tasks:
+            # Iterative depth first search (post order)
+            stack = [(task.name, False)]
+            while stack:
+                name, expanded = stack.pop()
+                if expanded:
+                    ordered.append(name)
+                    continue
+                if name in visited or name not in depends:
+                    continue
+                visited.add(name)
+                stack.append((name, True))
+                stack.extend((dep, False) for dep in depends[name] if dep not in visited)
+        return [self._tasks[name] for name in ordered]
+
+    def _is_task(self, task_ref, task:'Task') -> bool:
+        if task_ref is None or task_ref is task:
+            return True
+        try:
+            return self._get_task(task_ref) is task
+        except KeyError:
+            return False
+
+    def _get_task(self, task_ref) -> 'Task':
+        name = task_ref if isinstance(task_ref, str) else task_ref.name
+        return self._tasks[name]
+
+
+def forecast(session:'Session', start=None, end=None) -> pd.DataFrame:
+    "Predict the task starts of a session (see Session.forecast)"
+    if start is None:
+        start = session.clock.now()
+    if end is None:
+        end = pd.Timestamp(start) + datetime.timedelta(days=1)
+    return Forecaster(session, start, end).forecast()
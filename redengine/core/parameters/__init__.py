@@ -1,2 +1,3 @@
 from .parameters import Parameters
 from .arguments import BaseArgument
+from .returns import Returns
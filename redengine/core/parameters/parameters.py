@@ -1,13 +1,15 @@
 
 
 from collections.abc import Mapping
-from typing import Callable, Type, Union, TYPE_CHECKING
+import time
+from typing import Callable, Tuple, Type, Union, TYPE_CHECKING
 from functools import partial
 
 from redengine._base import RedBase
 from .arguments import BaseArgument
 from redengine.core.utils import is_pickleable
 from redengine.core.utils import filter_keyword_args
+from redengine.core.utils.shared import get_size, stage_value
 
 if TYPE_CHECKING:
     import redengine
@@ -68,29 +70,64 @@ class Parameters(RedBase, Mapping): # Mapping so that mytask(**Parameters(...))
     def pre_materialize(self, *args, **kwargs):
         """Turn arguments to their values before passed
         to child processes/threads. 
+
+        If ``durations`` (dict) is passed, the seconds
+        each argument took are stored to it.
         """
-        self._params = {
-            key: 
-                value 
-                if not isinstance(value, BaseArgument)
-                else value.stage(*args, **kwargs)
-            for key, value in self._params.items()
-        }
-        return self
+        return Parameters(self._call_arguments("stage", *args, **kwargs))
+
+    def share(self, threshold:int):
+        """Put large values (NumPy arrays, pandas objects 
+        and bytes of at least threshold bytes) to shared 
+        memory before passed to child processes. The 
+        children read them zero-copy and read-only."""
+        from redengine.args.builtin import SimpleArg, SharedArg
+        params = {}
+        for key, value in self._params.items():
+            raw = value.get_value() if isinstance(value, SimpleArg) else value
+            size = get_size(raw)
+            if size is not None and size >= threshold:
+                value = SharedArg(stage_value(raw), readonly=True)
+            params[key] = value
+        return Parameters(params)
 
     def materialize(self, *args, **kwargs):
         """Turn arguments to their values (after passed
         to child processes/threads). These should be their
         final values.
+
+        If ``durations`` (dict) is passed, the seconds
+        each argument took are stored to it.
         """
-        
-        return {
-            key: 
-                value 
-                if not isinstance(value, BaseArgument) 
-                else value.get_value(*args, **kwargs)
-            for key, value in self._params.items()
-        }
+        return self._call_arguments("get_value", *args, **kwargs)
+
+    def _call_arguments(self, method:str, *args, task=None, durations:dict=None, **kwargs) -> dict:
+        """Call a method of the arguments. The arguments are 
+        called concurrently in the pool of the session if
+        the session of the task sets ``materialize_workers``.
+        The durations (seconds) of the calls are stored to
+        ``durations`` (if given)."""
+        arguments = [key for key, value in self._params.items() if isinstance(value, BaseArgument)]
+        session = getattr(task, "session", None)
+        pool = session._get_materialize_pool() if session is not None and len(arguments) > 1 else None
+
+        if task is not None:
+            kwargs["task"] = task
+        params = self._params.copy()
+        if pool is not None:
+            futures = {
+                key: pool.submit(_call_timed, getattr(params[key], method), *args, **kwargs)
+                for key in arguments
+            }
+            results = {key: future.result() for key, future in futures.items()}
+        else:
+            results = {key: _call_timed(getattr(params[key], method), *args, **kwargs) for key in arguments}
+
+        for key, (value, duration) in results.items():
+            params[key] = value
+            if durations is not None:
+                durations[key] = duration
+        return params
 
     def __setitem__(self, key, item):
         "Set parameter value"
@@ -182,3 +219,9 @@ class Parameters(RedBase, Mapping): # Mapping so that mytask(**Parameters(...))
 
     def to_dict(self):
         return self._params
+
+def _call_timed(func:Callable, *args, **kwargs) -> Tuple[object, float]:
+    "Call the function and measure its duration (seconds)"
+    start = time.perf_counter()
+    value = func(*args, **kwargs)
+    return value, time.perf_counter() - start
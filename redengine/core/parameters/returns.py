@@ -0,0 +1,207 @@
+import sys
+import inspect
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Set
+
+from .parameters import Parameters
+from .arguments import BaseArgument
+from redengine.core.utils.shared import SharedValue, get_size
+
+if TYPE_CHECKING:
+    import redengine
+
+class _Spilled:
+    "Return value spilled to the disk"
+    def __init__(self, handle:SharedValue):
+        self.handle = handle
+
+    def __repr__(self):
+        return f"<spilled: {self.handle.path}>"
+
+class Returns(Parameters):
+    """Return values of the tasks.
+
+    The returns are kept in memory in least recently
+    used order. If the session config sets a budget
+    (``returns_max_count`` or ``returns_max_size``),
+    the least recently used values that no ``Return``
+    argument refers to are evicted when the budget is
+    exceeded. The evicted values are spilled to the
+    disk if ``returns_spill_dir`` is set (and read
+    back when accessed) or otherwise dropped.
+
+    Large returns of process tasks are kept in shared
+    memory (see ``Config.shared_memory_threshold``).
+    They count to the size budget and are read
+    (zero-copy for arrays) when accessed.
+
+    Parameters
+    ----------
+    _param : dict, optional
+        Return values as {task: value}.
+    session : redengine.Session, optional
+        Session of the returns (its config sets
+        the budget).
+    """
+
+    def __init__(self, _param:dict=None, session:'redengine.Session'=None):
+        super().__init__()
+        self._params = OrderedDict()
+        self._sizes: Dict[Any, int] = {} # Sizes of the values in memory
+        self._size = 0
+        self._evictions = 0
+        self._spills = 0
+        self._reloads = 0
+        if session is not None:
+            self.session = session
+        if _param is not None:
+            self.update(_param)
+
+    def __getitem__(self, item):
+        value = self._get_raw(item)
+        if isinstance(value, SharedValue):
+            return value.load()
+        return value if not isinstance(value, BaseArgument) else value.get_value()
+
+    def _get_raw(self, item):
+        "Get the stored value (SharedValue is not read)"
+        value = self._params[item]
+        if isinstance(value, _Spilled):
+            value = self._reload(item, value)
+        else:
+            self._params.move_to_end(item)
+        return value
+
+    def __setitem__(self, key, item):
+        self._discard(key)
+        self._params[key] = item
+        self._add_size(key, item)
+        self._evict()
+
+    def __delitem__(self, key):
+        self._discard(key)
+        del self._params[key]
+
+    def __iter__(self):
+        # Accessing a value changes the order
+        return iter(list(self._params))
+
+    def keys(self):
+        return list(self._params)
+
+    def items(self):
+        return [(key, self[key]) for key in list(self._params)]
+
+    def update(self, params):
+        params = params._params if isinstance(params, Parameters) else params
+        for key, value in params.items():
+            self[key] = value
+
+    def clear(self):
+        "Empty the returns"
+        self._params = OrderedDict()
+        self._sizes = {}
+        self._size = 0
+
+    def to_dict(self):
+        return {key: self[key] for key in list(self._params)}
+
+    @property
+    def metrics(self) -> dict:
+        """dict: Size (bytes in memory) and count of
+        the returns and counts of evictions, spills
+        and reloads"""
+        return {
+            "count": len(self._params),
+            "count_in_memory": len(self._sizes),
+            "size": self._size,
+            "evictions": self._evictions,
+            "spills": self._spills,
+            "reloads": self._reloads,
+        }
+
+    def _add_size(self, key, value):
+        if isinstance(value, SharedValue):
+            # In shared memory
+            size = value.nbytes
+        else:
+            size = get_size(value)
+        if size is None:
+            size = sys.getsizeof(value)
+        self._sizes[key] = size
+        self._size += size
+
+    def _discard(self, key):
+        "Remove the value from the memory accounting"
+        self._size -= self._sizes.pop(key, 0)
+
+    def _reload(self, key, spilled:_Spilled):
+        "Read a spilled value back to memory"
+        value = spilled.handle.load()
+        spilled.handle.release()
+        self._reloads += 1
+        self._params[key] = value
+        self._params.move_to_end(key)
+        self._add_size(key, value)
+        self._evict(keep=key)
+        return value
+
+    def _is_over(self, config) -> bool:
+        max_count = config.returns_max_count
+        max_size = config.returns_max_size
+        return (
+            (max_count is not None and len(self._sizes) > max_count)
+            or (max_size is not None and self._size > max_size)
+        )
+
+    def _evict(self, keep=None):
+        "Evict least recently used values till the budget is met"
+        config = self.session.config
+        if not self._is_over(config):
+            return
+        referenced = self._get_referenced()
+        spill_dir = config.returns_spill_dir
+        # Oldest first (skipping the spilled)
+        in_memory = [key for key in self._params if key in self._sizes]
+        for key in in_memory:
+            if key is keep or getattr(key, "name", key) in referenced:
+                continue
+            if spill_dir is not None:
+                value = self._params[key]
+                if isinstance(value, SharedValue):
+                    # Moved from shared memory to the disk
+                    shared = value
+                    value = shared.load()
+                    shared.release()
+                handle = SharedValue.create(value, dir=str(spill_dir))
+                handle.own()
+                self._params[key] = _Spilled(handle)
+                self._spills += 1
+            else:
+                del self._params[key]
+            self._discard(key)
+            self._evictions += 1
+            if not self._is_over(config):
+                break
+
+    def _get_referenced(self) -> Set[str]:
+        "Get names of the tasks which return a Return argument uses"
+        from redengine.args import Return
+        session = self.session
+        args = list(session.parameters._params.values())
+        for task in session.tasks:
+            args += task.parameters._params.values()
+            args.append(getattr(task, "map", None))
+            func = getattr(task, "func", None)
+            if func is not None:
+                # Arguments as defaults in the function
+                try:
+                    args += [param.default for param in inspect.signature(func).parameters.values()]
+                except (TypeError, ValueError):
+                    pass
+        return {arg.task_name for arg in args if isinstance(arg, Return)}
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["session"] = None
+        return state
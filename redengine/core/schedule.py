@@ -1,7 +1,7 @@
 
 from multiprocessing import cpu_count
 import multiprocessing
-from typing import TYPE_CHECKING, Callable, Optional, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Union
 import threading
 import time
 import sys, os, subprocess
@@ -10,6 +10,7 @@ import datetime
 import platform
 from copy import copy
 from queue import Empty
+from contextlib import ExitStack
 
 import pandas as pd
 
@@ -18,6 +19,7 @@ from redengine.core.condition import BaseCondition, AlwaysFalse
 from redengine.core.task import Task
 from redengine.exc import SchedulerRestart, SchedulerExit
 from redengine.core.hook import _Hooker
+from redengine.core.utils.pool import ThreadPool
 
 if TYPE_CHECKING:
     from redengine import Session
@@ -89,6 +91,8 @@ class Scheduler(RedBase):
         self.is_alive = None
 
         self._log_queue = multiprocessing.Queue(-1)
+        self._thread_pool = None
+        self._batches: Dict[multiprocessing.Process, List[Task]] = {}
 
     def _register_instance(self):
         self.session.scheduler = self
@@ -156,9 +160,10 @@ class Scheduler(RedBase):
         Each task is inspected and in case their starting condition
         is fulfilled, they are run.  A task can be running once at 
         any given time (in other words, multiple paraller execution 
-        of a single task is not supported at the moment). Tasks that 
-        are running but their termination condition is fulfilled are 
-        terminated.
+        of a single task is not supported at the moment but a task 
+        can run multiple parameter sets in parallel, see ``Task.map``). 
+        Tasks that are running but their termination condition is 
+        fulfilled are terminated.
         """
         tasks = self.tasks
         self.logger.debug(f"Beginning cycle with {len(tasks)} tasks...", extra={"action": "run"})
@@ -167,23 +172,41 @@ class Scheduler(RedBase):
         hooker = _Hooker(self.session.hooks.scheduler_cycle)
         hooker.prerun(self)
 
-        for task in tasks:
-            with task.lock:
-                self.handle_logs()
-                if task.on_startup or task.on_shutdown:
-                    # Startup or shutdown tasks are not run in main sequence
-                    pass
-                elif self._flag_enabled.is_set() and self.is_task_runnable(task):
-                    # Run the actual task
-                    self.run_task(task)
-                    # Reset force_run as a run has forced
-                    task.force_run = False
-                elif self.is_timeouted(task):
-                    # Terminate the task
-                    self.terminate_task(task, reason="timeout")
-                elif self.is_out_of_condition(task):
-                    # Terminate the task
-                    self.terminate_task(task)
+        # The conditions of the cycle are checked
+        # against the same moment
+        clock = self.session.clock
+        if self.session.config.freeze_time:
+            clock.freeze()
+        batch = []
+        try:
+            for task in tasks:
+                with task.lock:
+                    self.handle_logs()
+                    if task.on_startup or task.on_shutdown:
+                        # Startup or shutdown tasks are not run in main sequence
+                        pass
+                    elif self._flag_enabled.is_set() and self.is_task_runnable(task):
+                        if self.is_batchable(task):
+                            # Run later with other short tasks
+                            batch.append(task)
+                        else:
+                            # Run the actual task
+                            self.run_task(task)
+                        # Reset force_run as a run has forced
+                        task.force_run = False
+                    elif self.is_timeouted(task):
+                        # Terminate the task
+                        self.terminate_task(task, reason="timeout")
+                    elif self.is_out_of_condition(task):
+                        # Terminate the task
+                        self.terminate_task(task)
+                if len(batch) >= self.session.config.batch_max_size:
+                    self.run_batch(batch)
+                    batch = []
+            if batch:
+                self.run_batch(batch)
+        finally:
+            clock.unfreeze()
 
         # Running hooks
         hooker.postrun()
@@ -200,10 +223,17 @@ class Scheduler(RedBase):
 
     def run_task(self, task:Task, *args, **kwargs):
         """Run a given task"""
-        start_time = datetime.datetime.fromtimestamp(time.time())
+        clock = self.session.clock
+        start_time = clock.now()
 
         try:
-            task(log_queue=self._log_queue)
+            if task.get_execution() == "main":
+                # The task may take long thus using the
+                # actual time and taking new time after
+                with clock.unfrozen():
+                    task(log_queue=self._log_queue)
+            else:
+                task(log_queue=self._log_queue)
         except (SchedulerRestart, SchedulerExit) as exc:
             raise 
         except Exception as exc:
@@ -213,6 +243,77 @@ class Scheduler(RedBase):
             exception = None
             status = "success"
 
+    def run_batch(self, tasks:List[Task]):
+        """Run given process tasks one after another 
+        in one process.
+
+        The tasks log their records and pass their 
+        return values as if they were run in their 
+        own processes. The tasks are logged running
+        when the process is started."""
+        if len(tasks) == 1:
+            self.run_task(tasks[0])
+            return
+
+        self._clear_batches()
+
+        config = self.session.config
+        with ExitStack() as stack:
+            for task in tasks:
+                stack.enter_context(task.lock)
+
+            items = []
+            for task in tasks:
+                try:
+                    params, direct_params = task._get_process_params(task.get_extra_params(None))
+                    items.append((task, params, direct_params, task._get_child_config(), task._get_hooks("task_execute")))
+                except Exception:
+                    # Something went wrong in the initiation
+                    task.log_running()
+                    task.log_failure()
+                    if not config.silence_task_prerun:
+                        raise
+            if not items:
+                return
+
+            daemon = config.tasks_as_daemon and all(task._get_daemon() for task, *_ in items)
+            process = multiprocessing.Process(target=_run_batch, args=(items, self._log_queue), daemon=daemon)
+            for task, *_ in items:
+                task._process = process
+                task._mark_running = True # needed in pickling
+            try:
+                process.start()
+            finally:
+                for task, *_ in items:
+                    task._mark_running = False
+            # Logged here as the tasks are run one after another
+            # (the scheduler should not wait for the earlier ones)
+            for task, *_ in items:
+                task.log_running()
+            self._batches[process] = [task for task, *_ in items]
+
+    def _clear_batches(self):
+        "Remove finished batches (and fail their tasks that did not finish)"
+        finished = [process for process in self._batches if not process.is_alive()]
+        if not finished:
+            return
+        self.handle_logs()
+        for process in finished:
+            for task in self._batches.pop(process):
+                if task.status == "run" and task._process is process:
+                    # Batch process crashed before the task finished
+                    task.log_failure()
+
+    def is_batchable(self, task:Task) -> bool:
+        """Whether the task is run in a batch with other
+        short process tasks (the task allows it and 
+        its runtime is usually below ``batch_max_runtime``)."""
+        max_runtime = self.session.config.batch_max_runtime
+        if max_runtime is None or not task.batchable or task.get_execution() != "process":
+            return False
+        runtime = task._mean_runtime
+        return runtime is not None and runtime <= max_runtime.total_seconds()
+
     def terminate_all(self, reason:str=None):
         """Terminate all running tasks."""
         for task in self.tasks:
@@ -238,6 +339,14 @@ class Scheduler(RedBase):
 
             # Resetting attr force_termination
             task.force_termination = False
+
+            batch = self._batches.pop(task._process, [])
+            if batch:
+                # The other tasks in the batch did not finish
+                self.handle_logs()
+                for other in batch:
+                    if other is not task and other.status == "run":
+                        other.log_termination(reason=f"batch terminated ({reason or 'unknown reason'})")
         else:
             # The process/thread probably just died after the check
             pass
@@ -262,7 +371,7 @@ class Scheduler(RedBase):
         
         if timeout is None:
             return False
-        run_duration = datetime.datetime.fromtimestamp(time.time()) - task.get_last_run()
+        run_duration = self.session.clock.now() - task.get_last_run()
         return run_duration > timeout
 
     def is_task_runnable(self, task:Task):
@@ -279,8 +388,9 @@ class Scheduler(RedBase):
             return is_condition
         elif execution == "thread":
             is_not_running = not task.is_alive()
+            has_free_threads = self.has_free_threads()
             is_condition = self.check_cond(task)
-            return is_not_running and is_condition
+            return is_not_running and has_free_threads and is_condition
         else:
             raise NotImplementedError(task.execution)
 
@@ -309,36 +419,41 @@ class Scheduler(RedBase):
             except Empty:
                 break
             else:
-                self.logger.debug(f"Inserting record for '{record.task_name}' ({record.action})")
-                task = self.session.get_task(record.task_name)
-                if record.action == "fail":
-                    # There is a caveat in logging 
-                    # https://github.com/python/cpython/blame/fad6af2744c0b022568f7f4a8afc93fed056d4db/Lib/logging/handlers.py#L1383 
-                    # https://bugs.python.org/issue34334
-
-                    # The traceback/exception info is no longer in record.exc_info/record.exc_text 
-                    # and it has been formatted to record.message/record.msg
-                    # This means we have to rely that message really contains
-                    # the full traceback
-
-                    record.exc_info = record.exc_text
-                    record.exc_text = record.exc_text
-                    if record.exc_text is not None and record.exc_text not in record.message:
-                        record.message = record.message + "\n" + record.message
-                elif record.action == "success":
-                    # Take the return value from the record and delete
-                    # Note that record has attr __return__ only if task running as process
-                    return_value = record.__return__
-                    task._handle_return(return_value)
-                    del record.__return__
-                
-                task.log_record(record)
+                self.handle_record(record)
+
+    def handle_record(self, record:logging.LogRecord):
+        """Log a record from a process task (and handle 
+        the return value in it)."""
+        self.logger.debug(f"Inserting record for '{record.task_name}' ({record.action})")
+        task = self.session.get_task(record.task_name)
+        if record.action == "fail":
+            # There is a caveat in logging 
+            # https://github.com/python/cpython/blame/fad6af2744c0b022568f7f4a8afc93fed056d4db/Lib/logging/handlers.py#L1383 
+            # https://bugs.python.org/issue34334
+
+            # The traceback/exception info is no longer in record.exc_info/record.exc_text 
+            # and it has been formatted to record.message/record.msg
+            # This means we have to rely that message really contains
+            # the full traceback
+
+            record.exc_info = record.exc_text
+            record.exc_text = record.exc_text
+            if record.exc_text is not None and record.exc_text not in record.message:
+                record.message = record.message + "\n" + record.message
+        elif record.action == "success":
+            # Take the return value from the record and delete
+            # Note that record has attr __return__ only if task running as process
+            return_value = record.__return__
+            task._handle_return(return_value)
+            del record.__return__
+        
+        task.log_record(record)
 
     def _hibernate(self):
         """Go to sleep and wake up when next task can be executed."""
         delay = self.session.config.cycle_sleep
         if delay is not None:
-            time.sleep(delay)
+            self.session.clock.sleep(delay)
 
     def startup(self):
         """Start up the scheduler.
@@ -351,7 +466,7 @@ class Scheduler(RedBase):
         hooker.prerun(self)
 
         self.n_cycles = 0
-        self.startup_time = datetime.datetime.fromtimestamp(time.time())
+        self.startup_time = self.session.clock.now()
 
         self.logger.info(f"Beginning startup sequence...")
         for task in self.tasks:
@@ -364,13 +479,45 @@ class Scheduler(RedBase):
                     self.run_task(task)
 
         hooker.postrun()
+        # Conditions of the tasks are parsed by now
+        self._save_parse_cache()
         self.logger.info(f"Setup complete.")
 
+    def _save_parse_cache(self):
+        "Persist the parse results (see Config.parse_cache)"
+        try:
+            self.session._save_parse_cache()
+        except OSError:
+            self.logger.exception("Could not save the parse cache")
+
     def has_free_processors(self) -> bool:
         """Whether the Scheduler has free processors to
         allocate more tasks."""
         return self.n_alive <= self.session.config.max_process_count
 
+    def has_free_threads(self) -> bool:
+        """Whether the thread pool (if used) has free
+        threads or space in the queue for more tasks."""
+        pool = self.get_thread_pool()
+        return pool is None or not pool.is_saturated()
+
+    def get_thread_pool(self) -> Optional[ThreadPool]:
+        """Get the pool of threads for thread tasks
+        (None if each run has its own thread).
+        
+        The pool is created when first needed and 
+        recreated if its size is changed in the config."""
+        config = self.session.config
+        pool = self._thread_pool
+        if config.thread_pool_size is None:
+            return None
+        if pool is None or (pool.size, pool.queue_size) != (config.thread_pool_size, config.thread_queue_size):
+            if pool is not None:
+                # The runs in the old pool are finished
+                pool.shutdown(wait=False)
+            pool = self._thread_pool = ThreadPool(config.thread_pool_size, queue_size=config.thread_queue_size)
+        return pool
+
     @property
     def n_alive(self) -> int:
         """Count of tasks that are alive."""
@@ -446,9 +593,15 @@ class Scheduler(RedBase):
         if not self.session.config.instant_shutdown:
             self.wait_task_alive() # Wait till all tasks' threads and processes are dead
 
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False)
+            self._thread_pool = None
+        self.session._close_materialize_pool()
+
         # Running hooks
         hooker.postrun()
 
+        self._save_parse_cache()
         self.is_alive = False
         self.logger.info(f"Shutdown completed. Good bye.")
         if isinstance(exception, SchedulerRestart):
@@ -525,3 +678,9 @@ class Scheduler(RedBase):
 
         # TODO: Use TaskAdapter to relay the scheduler name?
         self._logger = logger
+
+def _run_batch(items:list, queue):
+    "Run the tasks of a batch in the child process"
+    for task, params, direct_params, config, exec_hooks in items:
+        # Logged running by the scheduler
+        task._run_as_process(params, direct_params, queue, config, exec_hooks, log_running=False)
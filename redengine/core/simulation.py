@@ -0,0 +1,392 @@
+"""Simulation of the scheduling against a virtual clock.
+
+The simulator is a scheduler that does not execute
+the tasks. The tasks are logged to run and to finish
+after a synthetic runtime and the clock jumps directly
+to the next moment something could happen (a task
+finishes or a start condition could become true).
+"""
+
+import heapq
+import itertools
+import logging
+import random
+import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from redbird.logging import RepoHandler
+from redbird.repos import MemoryRepo
+
+from redengine.core.clock import VirtualClock
+from redengine.core.schedule import Scheduler
+from redengine.core.task import Task
+from redengine.core.forecast import Forecaster, Unforecastable
+from redengine.core.time.utils import to_epoch_ns, epoch_ns_to_datetime
+from redengine.core.log import TaskAdapter
+from redengine.log.log_record import MinimalRecord
+
+if TYPE_CHECKING:
+    from redengine import Session
+
+
+class _ClockFilter(logging.Filter):
+    "Set the creation time of the log records from the clock"
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def filter(self, record):
+        record.created = self.clock.time()
+        return True
+
+
+class Simulator(Scheduler):
+    """Scheduler that runs against a virtual clock.
+
+    The tasks are not executed but they are logged to
+    run and to finish after a runtime sampled from their
+    history. The clock jumps to the next moment a task
+    finishes or a start condition could become true
+    (see ``Session.forecast``). The runs are logged to
+    in-memory copies of the logs of the tasks and the
+    statuses of the tasks are restored afterwards thus
+    the simulation does not change the history.
+
+    Parameters
+    ----------
+    session : redengine.Session
+        Session to simulate.
+    start : datetime-like
+        Start time of the simulation.
+    end : datetime-like
+        End time of the simulation.
+    runtimes : dict, optional
+        Runtimes of the tasks (task name to seconds,
+        timedelta or list of them to sample from). By
+        default, sampled from the logs of the tasks.
+        Tasks without history finish instantly.
+    step : datetime.timedelta, optional
+        Maximum jump of the clock if a start condition
+        cannot be forecasted (ie. FuncCond), by default
+        a minute.
+    seed : int, optional
+        Seed for sampling the runtimes.
+
+    Examples
+    --------
+    >>> from redengine import session
+    >>> runs = session.simulate("2022-01-01", "2022-01-08") # doctest: +SKIP
+    """
+
+    def __init__(self, session=None, start=None, end=None, runtimes:Dict[str, Union[float, datetime.timedelta, List]]=None,
+                 step:datetime.timedelta=datetime.timedelta(minutes=1), seed:int=None, **kwargs):
+        super().__init__(session=session, **kwargs)
+        self.clock = VirtualClock(start)
+        self.end = pd.Timestamp(end).to_pydatetime(warn=False)
+        self.runtimes = {} if runtimes is None else runtimes
+        self.step = pd.Timedelta(step).to_pytimedelta()
+        self._random = random.Random(seed)
+
+        self.runs = []
+        self._running: Dict[str, dict] = {}
+        self._finishes = [] # Heap of (time, order, task name, action, run)
+        self._order = itertools.count()
+
+        # Predicted starts (see Forecaster)
+        self._starts = [] # Heap of (time, task name, version, is retry)
+        self._predicted: Dict[str, np.ndarray] = {}
+        self._versions: Dict[str, int] = {}
+        self._changed_tasks = set()
+        self._unknown = set()
+
+    def __call__(self) -> pd.DataFrame:
+        """Run the simulation.
+
+        Returns
+        -------
+        pd.DataFrame
+            Simulated runs with columns ``task``,
+            ``start``, ``end`` and ``action`` (status
+            the run finished with). Runs that did not
+            finish by the end have no end nor action.
+        """
+        session = self.session
+        self._tasks = {task.name: task for task in session.tasks}
+        self._samples = {name: self._get_samples(task) for name, task in self._tasks.items()}
+        self._dependents = self._get_dependents()
+        self._changed_tasks = set(self._tasks)
+
+        # Timestamps of the session and the logs are
+        # taken from the virtual clock
+        real_clock = session.clock
+        log_filter = _ClockFilter(self.clock)
+        loggers = {task.logger.logger for task in self._tasks.values()}
+        states = {task: self._get_state(task) for task in self._tasks.values()}
+        real_handlers = self._isolate_logs(loggers)
+        session.clock = self.clock
+        for logger in loggers:
+            logger.addFilter(log_filter)
+
+        self.is_alive = True
+        try:
+            self.n_cycles = 0
+            self.startup_time = self.clock.now()
+            while self.clock.now() <= self.end:
+                self.run_cycle()
+                self._hibernate()
+        finally:
+            session.clock = real_clock
+            for logger in loggers:
+                logger.removeFilter(log_filter)
+                logger.handlers, logger.propagate = real_handlers[logger]
+            for task, state in states.items():
+                self._set_state(task, state)
+            self.is_alive = False
+        return pd.DataFrame(self.runs, columns=["task", "start", "end", "action"])
+
+    def _isolate_logs(self, loggers:set) -> dict:
+        """Point the loggers to in-memory repos with copies of
+        their records. Returns the original handlers and
+        propagations of the loggers"""
+        originals = {}
+        for logger in loggers:
+            originals[logger] = (logger.handlers, logger.propagate)
+            try:
+                repo = TaskAdapter(logger, None, ignore_warnings=True)._get_repo()
+            except AttributeError:
+                # Not readable
+                model, records = MinimalRecord, []
+            else:
+                model, records = getattr(repo, "model", dict), list(repo.filter_by().all())
+            logger.handlers = [RepoHandler(repo=MemoryRepo(model=model, collection=records))]
+            logger.propagate = False
+        return originals
+
+    @staticmethod
+    def _get_state(task:Task) -> dict:
+        "Get the runtime state (statuses etc.) of the task"
+        state = {name: task.__dict__[name] for name in task._runtime_fields}
+        state["_mean_runtime"] = task._mean_runtime
+        return state
+
+    @staticmethod
+    def _set_state(task:Task, state:dict):
+        state = state.copy()
+        task._mean_runtime = state.pop("_mean_runtime")
+        task.__dict__.update(state)
+
+    def run_task(self, task:Task, *args, **kwargs):
+        """Simulate running a given task"""
+        runtime, action = self._sample(task)
+        execution = task.get_execution()
+        timeout = task.timeout if task.timeout is not None else self.session.config.timeout
+        if task.permanent_task:
+            runtime = None
+        elif execution != "main" and timeout is not None and runtime > timeout:
+            runtime = timeout
+            action = "terminate"
+
+        task.log_running()
+        start = self.clock.now()
+        run = {"task": task.name, "start": start, "end": None, "action": None}
+        self.runs.append(run)
+        self._running[task.name] = run
+        self._set_changed(task)
+        if runtime is not None:
+            heapq.heappush(self._finishes, (start + runtime, next(self._order), task.name, action, run))
+        if execution == "main" and runtime is not None:
+            # Scheduler is blocked till the task finishes
+            self._advance(start + runtime)
+
+    def terminate_task(self, task, reason=None):
+        """Simulate terminating a given task."""
+        self._finish(task, "terminate", reason=reason)
+
+    def is_timeouted(self, task):
+        # Timeouts are handled when sampling the runtime
+        return False
+
+    def is_task_runnable(self, task:Task):
+        """Inspect whether the task should be run."""
+        execution = task.get_execution()
+        is_not_running = task.name not in self._running
+        if execution == "process":
+            return is_not_running and self.has_free_processors() and self.check_cond(task)
+        elif execution == "main":
+            return self.check_cond(task)
+        elif execution == "thread":
+            return is_not_running and self.check_cond(task)
+        else:
+            raise NotImplementedError(task.execution)
+
+    def is_out_of_condition(self, task:Task):
+        """Inspect whether the task should be terminated."""
+        if task.name not in self._running:
+            return False
+        elif task.force_termination:
+            return True
+        else:
+            return self.check_cond(task.end_cond)
+
+    def handle_logs(self):
+        """Finish the tasks that have finished by now."""
+        self._advance(self.clock.now())
+
+    @property
+    def n_alive(self) -> int:
+        """Count of tasks that are running in the simulation."""
+        return len(self._running)
+
+    def _hibernate(self):
+        """Move the clock to the next moment something could happen."""
+        now = self.clock.now()
+        next_time = self.end + datetime.timedelta(microseconds=1)
+
+        while self._finishes and not self._is_current(self._finishes[0]):
+            heapq.heappop(self._finishes)
+        if self._finishes:
+            next_time = min(next_time, self._finishes[0][0])
+
+        next_start = self._get_next_start(now)
+        if next_start is not None:
+            next_time = min(next_time, next_start)
+        if self._unknown:
+            next_time = min(next_time, now + self.step)
+        self._advance(max(next_time, now + datetime.timedelta(microseconds=1)))
+
+    def _advance(self, to:datetime.datetime):
+        "Move the clock and finish the tasks on the way"
+        while self._finishes and self._finishes[0][0] <= to:
+            finish_time, _, name, action, run = heapq.heappop(self._finishes)
+            if not self._is_current((finish_time, None, name, action, run)):
+                continue
+            self.clock.set(max(finish_time, self.clock.now()))
+            self._finish(self._tasks[name], action)
+        self.clock.set(max(to, self.clock.now()))
+
+    def _is_current(self, event) -> bool:
+        "Whether the finish event is of an ongoing run"
+        return self._running.get(event[2]) is event[4]
+
+    def _finish(self, task:Task, action:str, reason=None):
+        run = self._running.pop(task.name, None)
+        if run is None:
+            return
+        if action == "success":
+            task.log_success()
+        elif action == "fail":
+            task.log_failure()
+        elif action == "inaction":
+            task.log_inaction()
+        else:
+            task.log_termination(reason=reason or "timeout")
+        run["end"] = self.clock.now()
+        run["action"] = action
+        self._set_changed(task)
+
+    def _set_changed(self, task:Task):
+        "Mark the predicted starts of the task and its dependents outdated"
+        names = [task.name]
+        while names:
+            name = names.pop()
+            if name not in self._changed_tasks:
+                self._changed_tasks.add(name)
+                names.extend(self._dependents.get(name, ()))
+
+    def _get_next_start(self, now:datetime.datetime) -> Optional[datetime.datetime]:
+        "Get the next moment a start condition could become true"
+        now_ns = to_epoch_ns(now)
+        if self._changed_tasks:
+            forecaster = Forecaster(self.session, now, self.end)
+            for name in self._changed_tasks:
+                self._versions[name] = self._versions.get(name, 0) + 1
+                try:
+                    runs, _ = forecaster.get_runs(self._tasks[name])
+                except Unforecastable:
+                    self._unknown.add(name)
+                    self._predicted.pop(name, None)
+                else:
+                    self._unknown.discard(name)
+                    self._predicted[name] = runs
+                    self._push_start(name, now_ns)
+            self._changed_tasks = set()
+
+        starts = self._starts
+        while starts:
+            start_ns, name, version, is_retry = starts[0]
+            if version != self._versions[name]:
+                heapq.heappop(starts)
+            elif start_ns <= now_ns:
+                heapq.heappop(starts)
+                self._push_start(name, now_ns)
+                if start_ns == now_ns and not is_retry:
+                    # The task did not start (or the prediction would
+                    # be outdated). Some conditions turn true only
+                    # after the boundary (ie. every 2 hours).
+                    heapq.heappush(starts, (now_ns + 1000, name, version, True))
+            else:
+                # Rounding up to microseconds (resolution of datetime)
+                return epoch_ns_to_datetime(-(-start_ns // 1000) * 1000)
+        return None
+
+    def _push_start(self, name:str, now_ns:int):
+        runs = self._predicted[name]
+        i = np.searchsorted(runs, now_ns, side="right")
+        if i < len(runs):
+            heapq.heappush(self._starts, (int(runs[i]), name, self._versions[name], False))
+
+    def _get_dependents(self) -> Dict[str, set]:
+        "Get the names of the tasks that depend on each task"
+        depends = Forecaster(self.session, self.clock.now(), self.end).get_depends()
+        dependents = {}
+        for name, depend_names in depends.items():
+            for depend_name in depend_names:
+                dependents.setdefault(depend_name, set()).add(name)
+        return dependents
+
+    def _sample(self, task:Task) -> Tuple[datetime.timedelta, str]:
+        "Get synthetic runtime and outcome of a run"
+        samples = self._samples[task.name]
+        if not samples:
+            return datetime.timedelta(0), "success"
+        return self._random.choice(samples)
+
+    def _get_samples(self, task:Task) -> List[Tuple[datetime.timedelta, str]]:
+        "Get runtimes and outcomes to sample from"
+        if task.name in self.runtimes:
+            runtimes = self.runtimes[task.name]
+            if not isinstance(runtimes, (list, tuple)):
+                runtimes = [runtimes]
+            return [(self._to_timedelta(runtime), "success") for runtime in runtimes]
+
+        try:
+            records = task.logger.get_records()
+        except AttributeError:
+            # Logs not readable
+            return []
+        samples = []
+        run_created = None
+        records = sorted(records, key=lambda record: self._get_field(record, "created"))
+        for record in records:
+            action = self._get_field(record, "action")
+            created = self._get_field(record, "created")
+            if action == "run":
+                run_created = created
+            elif run_created is not None and action in ("success", "fail", "inaction", "terminate"):
+                samples.append((datetime.timedelta(seconds=created - run_created), action))
+                run_created = None
+        return samples
+
+    @staticmethod
+    def _get_field(record, field):
+        return record[field] if isinstance(record, dict) else getattr(record, field)
+
+    @staticmethod
+    def _to_timedelta(value) -> datetime.timedelta:
+        if isinstance(value, (int, float)):
+            return datetime.timedelta(seconds=value)
+        return pd.Timedelta(value).to_pytimedelta()
@@ -1,4 +1,5 @@
 
+import pickle
 from pickle import PicklingError
 import sys
 import time
@@ -7,12 +8,13 @@ import logging
 import platform
 from types import FunctionType, TracebackType
 import warnings
-from copy import copy
+from copy import copy, deepcopy
 from abc import abstractmethod
 from typing import TYPE_CHECKING, Any, Callable, ClassVar, List, Dict, Literal, Type, Union, Tuple, Optional, get_type_hints
 import multiprocessing
 import threading
 from queue import Empty
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
 
 import pandas as pd
 from pydantic import BaseModel, Field, PrivateAttr, validator
@@ -22,19 +24,45 @@ from redengine.core.condition import BaseCondition, AlwaysFalse, All, set_statem
 from redengine.core.time import TimePeriod
 from redengine.core.parameters import Parameters
 from redengine.core.log import TaskAdapter
+from redengine.core.clock import Clock
 from redengine.core.utils import is_pickleable, filter_keyword_args, is_main_subprocess
-from redengine.exc import SchedulerRestart, SchedulerExit, TaskInactionException, TaskTerminationException
+from redengine.core.utils.shared import SharedValue, share_value
+from redengine.core.utils import mapping
+from redengine.exc import SchedulerRestart, SchedulerExit, TaskInactionException, TaskTerminationException, MapError
 from redengine.core.meta import _register
 from redengine.core.hook import _Hooker
+from redengine._setup import _setup_defaults
 from redengine.log import QueueHandler
 
+logger = logging.getLogger(__name__)
+
 if TYPE_CHECKING:
     from redengine import Session
     from redengine.core.parameters import BaseArgument
 
 _IS_WINDOWS = platform.system()
 
-class Task(RedBase, BaseModel):
+class _TaskMeta(type(BaseModel)):
+    def __new__(mcs, name, bases, class_dict, **kwargs):
+        # Pydantic considers the default session (RedBase.session)
+        # as an attribute the field 'session' would shadow. The
+        # tasks may be loaded after the session is created.
+        session = RedBase.session
+        RedBase.session = None
+        try:
+            return super().__new__(mcs, name, bases, class_dict, **kwargs)
+        finally:
+            RedBase.session = session
+
+def _load_task(cls, payload:bytes, runtime:dict, clock):
+    "Unpickle a task passed to a child process (see Task.__reduce_ex__)"
+    task = cls.__new__(cls)
+    task.__setstate__(pickle.loads(payload))
+    task.__dict__.update(runtime)
+    task._clock = clock
+    return task
+
+class Task(RedBase, BaseModel, metaclass=_TaskMeta):
     """Base class for Tasks.
 
     A task can be a function, command or other procedure that 
@@ -69,6 +97,22 @@ class Task(RedBase, BaseModel):
     parameters : Parameters, optional
         Parameters set specifically to the task, 
         by default None
+    map : list of dict, argument, optional
+        Parameter sets to run the task with. If set,
+        a run of the task runs the task once for each
+        parameter set in parallel and the return value
+        is the list of the return values. Can be an
+        argument (ie. ``Return('other task')``) that
+        returns the parameter sets. By default None
+    map_workers : int, optional
+        Max number of the parameter sets run at the same
+        time, by default the default of 
+        ``concurrent.futures`` executors.
+    map_execution : str, {'thread', 'process'}
+        Whether the parameter sets are run in threads or
+        in processes. If 'process', the task cannot run
+        as a daemon process (and it is not run as one
+        unless ``daemon`` is set). By default 'thread'.
     disabled : bool
         If True, the task is not allowed to be run
         regardless of the start_cond,
@@ -83,6 +127,13 @@ class Task(RedBase, BaseModel):
     on_shutdown : bool
         Run the task on the shutdown sequence of 
         the Scheduler, by default False
+    batchable : bool
+        Whether the task can be run in the same
+        process with other short process tasks
+        (see ``batch_max_runtime`` in the config).
+        The tasks in a batch run one after another
+        and terminating one terminates the batch,
+        by default False
     priority : int, optional
         Priority of the task. Higher priority
         tasks are first inspected whether they
@@ -169,11 +220,16 @@ class Task(RedBase, BaseModel):
 
     parameters: Parameters = Parameters()
 
+    map: Optional[Any] = Field(description="Parameter sets to run the task with (in parallel)")
+    map_workers: Optional[int]
+    map_execution: Literal['thread', 'process'] = 'thread'
+
     start_cond: BaseCondition = AlwaysFalse() #! TODO: Create get_start_cond so that this could also be as string (lazily parsed)
     end_cond: BaseCondition = AlwaysFalse()
 
     on_startup: bool = False
     on_shutdown: bool = False
+    batchable: bool = False
 
     last_run: Optional[datetime.datetime]
     last_success: Optional[datetime.datetime]
@@ -188,6 +244,21 @@ class Task(RedBase, BaseModel):
 
     _mark_running = False
 
+    # Pickled state of the task for child processes as (version, mutables, bytes).
+    # Version is incremented when a field (other than runtime state) is set and
+    # mutables are copies of the lists, dicts and sets of the fields (compared
+    # to notice modifying them in place).
+    _payload: Optional[tuple] = None
+    _version: int = 0
+    _clock: Optional[Clock] = None # Clock of the session if no session (in child process)
+    _child_config: Optional[Any] = None # Config subset (in child process)
+    _mean_runtime: Optional[float] = None # Moving average of the runtimes (seconds)
+    _staged: Optional[list] = None # Shared memory handles passed to the latest process
+    _runtime_fields: ClassVar[Tuple] = (
+        "status", "last_run", "last_success", "last_fail", "last_terminate", "last_inaction",
+        "disabled", "force_run", "force_termination",
+    )
+
     @validator('start_cond', pre=True)
     def parse_start_cond(cls, value, values):
         from redengine.parse.condition import parse_condition
@@ -234,10 +305,14 @@ class Task(RedBase, BaseModel):
         return TaskAdapter(logger, task=self)
 
     def __init__(self, **kwargs):
+        # Type hints of the tasks are set when 
+        # the defaults are loaded (lazily)
+        _setup_defaults()
 
         hooker = _Hooker(self.session.hooks.task_init)
         hooker.prerun(self)
 
+        register = kwargs.pop("_register", True) # Session.add_tasks registers at once
         if kwargs.get("session") is None:
             kwargs['session'] = self.session
         kwargs['name'] = self._get_name(**kwargs)
@@ -249,11 +324,31 @@ class Task(RedBase, BaseModel):
 
         self._set_default_task()
 
-        self.register()
+        if register:
+            self.register()
+
+        if self.execution == "process":
+            # Validate (and cache) the pickled state
+            # once instead of in every run
+            try:
+                self._get_payload()
+            except Exception as exc:
+                warnings.warn(f"Task '{self.name}' cannot be pickled thus it cannot run as a process: {exc}")
         
         # Hooks
         hooker.postrun()
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in self.__fields__ and name not in self._runtime_fields:
+            # The pickled state is outdated
+            self._version += 1
+        if name == "name":
+            # The session finds the tasks by names
+            tasks = self.session.tasks
+            if self in tasks:
+                tasks._reindex()
+
     def _get_name(self, name=None, **kwargs):
         if name is None:
             use_instance_naming = self.session.config.use_instance_naming
@@ -296,6 +391,12 @@ class Task(RedBase, BaseModel):
             raise ValueError(f"Task name '{value}' already exists. Please pick another")
         return value
 
+    @validator('map_execution')
+    def validate_map_execution(cls, value, values):
+        if value == "process" and values.get("map") is not None and values.get("daemon"):
+            raise ValueError("Daemon processes cannot have children: map_execution='process' requires daemon=False.")
+        return value
+
     @validator('parameters', pre=True)
     def parse_parameters(cls, value):
         if isinstance(value, Parameters):
@@ -417,14 +518,23 @@ class Task(RedBase, BaseModel):
         status = None
         output = None
         exc_info = (None, None, None)
+        params = Parameters(params)
+        map_items = params._params.pop("_map_", None)
         params = self.postfilter_params(params)
         params = Parameters(params) | Parameters(direct_params)
-        params = params.materialize(task=self)
+        durations = {}
+        params = params.materialize(task=self, durations=durations)
+        if durations:
+            logger.debug(f"Materialized the arguments of task '{self.name}' (seconds): {durations}")
 
         if execution == 'main':
             self.log_running()
         try:
-            output = self.execute(**params)
+            if map_items is None:
+                output = self.execute(**params)
+            else:
+                map_items = Parameters(_map_=map_items).materialize(task=self)["_map_"]
+                output = self.execute_map(map_items, **params)
 
             # NOTE: we process success here in case the process_success
             # fails (therefore task fails)
@@ -486,17 +596,95 @@ class Task(RedBase, BaseModel):
             #    os.chdir(old_cwd)
             hooker.postrun(*exc_info)
 
+    def execute_map(self, items:list, **params) -> list:
+        """Execute the task for each parameter set in parallel.
+
+        Parameters
+        ----------
+        items : iterable of dict
+            Parameter sets. Each is passed to ``execute``
+            with the other parameters.
+        **params : dict
+            The other parameters of the task.
+
+        Returns
+        -------
+        list
+            Return values of the parameter sets (in order).
+        """
+        items = list(items)
+        for item in items:
+            if not isinstance(item, dict):
+                raise TypeError(f"Map items must be dicts of parameters, got: {item!r}")
+
+        if self.map_execution == "process":
+            executor = ProcessPoolExecutor(max_workers=self.map_workers, initializer=mapping._init_worker, initargs=(self,))
+            func = mapping._execute_item
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.map_workers, thread_name_prefix="redengine-map")
+            func = lambda item: self.execute(**item)
+
+        with executor:
+            futures = [executor.submit(func, {**params, **item}) for item in items]
+            indexes = {future: i for i, future in enumerate(futures)}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.1)
+                for future in done:
+                    self._log_map_item(indexes[future], future, n_items=len(items))
+                if self._thread_terminate.is_set():
+                    for future in pending:
+                        future.cancel()
+                    raise TaskTerminationException
+        
+        outputs = []
+        errors = {}
+        for i, future in enumerate(futures):
+            exc = future.exception()
+            if exc is not None:
+                errors[i] = exc
+            else:
+                outputs.append(future.result())
+        if errors:
+            raise MapError(errors, n_items=len(items))
+        return outputs
+
+    def _log_map_item(self, i:int, future, n_items:int):
+        "Log a finished map item"
+        exc = future.exception()
+        if exc is not None:
+            logger.error(f"Task '{self.name}' map item {i} of {n_items} failed: {exc!r}", exc_info=exc)
+        else:
+            logger.info(f"Task '{self.name}' map item {i} of {n_items} finished")
+
+    def _get_daemon(self) -> bool:
+        "Whether the process of the task is a daemon"
+        if self.daemon is not None:
+            return self.daemon
+        if self.map is not None and self.map_execution == "process":
+            # Daemon processes cannot have children
+            return False
+        return self.session.config.tasks_as_daemon
+
     def run_as_thread(self, params:Parameters, **kwargs):
-        """Create a new thread and run the task on that."""
+        """Create a new thread and run the task on that
+        (or run it in the thread pool if it is used)."""
 
         params = params.pre_materialize(task=self)
         direct_params = self.parameters.pre_materialize(task=self)
 
         self._thread_terminate.clear()
 
+        pool = self.session.scheduler.get_thread_pool()
+        if pool is not None:
+            # Run in the thread pool (may wait for a free thread)
+            self.last_run = self._get_clock().now() # Needed for termination
+            self._thread = pool.submit(self._run_as_thread, params, direct_params)
+            return
+
         event_is_running = threading.Event()
         self._thread = threading.Thread(target=self._run_as_thread, args=(params, direct_params, event_is_running))
-        self.last_run = datetime.datetime.fromtimestamp(time.time()) # Needed for termination
+        self.last_run = self._get_clock().now() # Needed for termination
         self._thread.start()
         event_is_running.wait() # Wait until the task is confirmed to run 
  
@@ -504,8 +692,15 @@ class Task(RedBase, BaseModel):
         """Running the task in a new thread. This method should only
         be run by the new thread."""
 
+        if event is None and self._thread_terminate.is_set():
+            # Terminated while waiting for a thread in the pool
+            self.log_running()
+            self.log_termination(reason="terminated while queued")
+            return
+
         self.log_running()
-        event.set()
+        if event is not None:
+            event.set()
         try:
             output = self._run_as_main(params=params, direct_params=direct_params, execution="thread")
         except:
@@ -517,30 +712,57 @@ class Task(RedBase, BaseModel):
     def run_as_process(self, params:Parameters, daemon=None, log_queue: multiprocessing.Queue=None):
         """Create a new process and run the task on that."""
 
-        params = params.pre_materialize(task=self)
-        direct_params = self.parameters.pre_materialize(task=self)
+        params, direct_params = self._get_process_params(params)
 
         # Daemon resolution: task.daemon >> scheduler.tasks_as_daemon
         log_queue = self.session.scheduler._log_queue if log_queue is None else log_queue
 
-        daemon = self.daemon if self.daemon is not None else self.session.config.tasks_as_daemon
+        daemon = self._get_daemon()
         self._process = multiprocessing.Process(
             target=self._run_as_process, 
-            args=(params, direct_params, log_queue, self.session.config, self._get_hooks("task_execute")), 
+            args=(params, direct_params, log_queue, self._get_child_config(), self._get_hooks("task_execute")), 
             daemon=daemon
         ) 
         #self._last_run = datetime.datetime.fromtimestamp(time.time()) # Needed for termination
         self._mark_running = True # needed in pickling
-        
-        self._process.start()
-        self._mark_running = False
+        try:
+            self._process.start()
+        finally:
+            self._mark_running = False
         
         self._lock_to_run_log(log_queue)
         return log_queue
 
-    def _run_as_process(self, params:Parameters, direct_params:Parameters, queue, config, exec_hooks):
+    def _get_process_params(self, params:Parameters) -> Tuple[Parameters, Parameters]:
+        "Get the parameters and the task parameters passed to a child process"
+        from redengine.args.builtin import SharedArg
+        params = params.pre_materialize(task=self)
+        direct_params = self.parameters.pre_materialize(task=self)
+
+        threshold = self.session.config.shared_memory_threshold
+        if threshold is not None:
+            # Large values are read from shared memory
+            # instead of copying them to the child
+            params = params.share(threshold)
+            direct_params = direct_params.share(threshold)
+
+        # The files must exist till the child has read them
+        self._staged = [
+            arg._value for arg in [*params._params.values(), *direct_params._params.values()]
+            if isinstance(arg, SharedArg)
+        ]
+        return params, direct_params
+
+    def _get_child_config(self):
+        "Get the options of the session config the child process needs"
+        config = self.session.config
+        return type(config).construct(shared_memory_threshold=config.shared_memory_threshold)
+
+    def _run_as_process(self, params:Parameters, direct_params:Parameters, queue, config, exec_hooks, log_running=True):
         """Running the task in a new process. This method should only
-        be run by the new process."""
+        be run by the new process. If not log_running, the run was
+        already logged by the scheduler (batch)."""
+        self._child_config = config
 
         # NOTE: This is in the process and other info in the application
         # cannot be accessed here. Self is a copy of the original
@@ -567,7 +789,11 @@ class Task(RedBase, BaseModel):
         except:
             logger.critical(f"Task '{self.name}' crashed in setting up logger.", exc_info=True, extra={"action": "fail", "task_name": self.name})
             raise
-        self.log_running()
+        if log_running:
+            self.log_running()
+        else:
+            # For the runtime
+            self.last_run = self._get_clock().now()
         try:
             # NOTE: The parameters are "materialized" 
             # here in the actual process that runs the task
@@ -605,6 +831,9 @@ class Task(RedBase, BaseModel):
         extra_params = Parameters(_session_=self.session, _task_=self, _thread_terminate_=self._thread_terminate)
 
         params = Parameters(self.prefilter_params(session_params | passed_params | extra_params))
+        if self.map is not None:
+            # Passed and materialized as the parameters
+            params["_map_"] = self.map
 
         return params
 
@@ -745,9 +974,8 @@ class Task(RedBase, BaseModel):
                     return
             else:
                 
-                #self.logger.debug(f"Inserting record for '{record.task_name}' ({record.action})")
-                task = self.session.get_task(record.task_name)
-                task.log_record(record)
+                # Records of other tasks may come first
+                self.session.scheduler.handle_record(record)
 
                 action = record.action
 
@@ -785,6 +1013,8 @@ class Task(RedBase, BaseModel):
         cache_attr = f"last_{record.action}"
         record_time = datetime.datetime.fromtimestamp(record.created)
         setattr(self, cache_attr, record_time)
+        if record.action in ("success", "fail", "inaction"):
+            self._update_runtime(getattr(record, "runtime", None))
 
         self.logger.handle(record)
         self.status = record.action
@@ -816,7 +1046,7 @@ class Task(RedBase, BaseModel):
             raise KeyError(f"Invalid action: {action}")
         
         if action is not None:
-            now = datetime.datetime.fromtimestamp(time.time())
+            now = self._get_clock().now()
             if action == "run":
                 extra = {"action": "run", "start": now}
                 # self._last_run = now
@@ -824,13 +1054,17 @@ class Task(RedBase, BaseModel):
                 start_time = self.get_last_run()
                 runtime = now - start_time if start_time is not None else None
                 extra = {"action": action, "start": start_time, "end": now, "runtime": runtime}
+                if action in ("success", "fail", "inaction"):
+                    self._update_runtime(runtime)
             
             is_running_as_child = self.logger.name.endswith("._process")
             if is_running_as_child and action == "success":
                 # If child process, the return value is passed via QueueHandler to the main process
                 # and it's handled then in Scheduler.
                 # Else the return value is handled in Task itself (__call__ & _run_as_thread)
-                extra["__return__"] = return_value
+                # Large values are passed via shared memory instead of the queue
+                threshold = getattr(self._child_config, "shared_memory_threshold", None)
+                extra["__return__"] = share_value(return_value, threshold=threshold)
 
             log_method = self.logger.exception if action == "fail" else self.logger.info
             log_method(
@@ -841,6 +1075,14 @@ class Task(RedBase, BaseModel):
             setattr(self, cache_attr, now)
         self.status = action
 
+    def _update_runtime(self, runtime:Optional[datetime.timedelta]):
+        "Update the moving average of the runtime"
+        if runtime is None:
+            return
+        runtime = runtime.total_seconds()
+        mean = self._mean_runtime
+        self._mean_runtime = runtime if mean is None else 0.5 * mean + 0.5 * runtime
+
     def get_last_success(self) -> datetime.datetime:
         """Get the lastest timestamp when the task succeeded."""
         return self._get_last_action("success")
@@ -924,6 +1166,9 @@ class Task(RedBase, BaseModel):
         priv_attrs['_process'] = None
         priv_attrs['_thread'] = None
         priv_attrs['_thread_terminate'] = None
+        priv_attrs['_payload'] = None
+        priv_attrs['_staged'] = None
+        priv_attrs['_mark_running'] = False
 
         # We also get rid of the conditions as if there is a task
         # containing an attr that cannot be pickled (like FuncTask
@@ -939,25 +1184,65 @@ class Task(RedBase, BaseModel):
         dict_state['parameters'] = Parameters()
         dict_state['session'] = None
 
-        if not is_pickleable(state):
-            if self._mark_running:
-                # When this block might get executed?
-                #   - If FuncTask func is non-picklable
-                #       - There is another func with same name in the file
-                #       - The function is lambda or decorated func
-                unpicklable = {key: val for key, val in state.items() if not is_pickleable(val)}
-                self.log_running()
-                self.logger.critical(f"Task '{self.name}' crashed in pickling. Cannot pickle: {unpicklable}", extra={"action": "fail", "task_name": self.name})
-                raise PicklingError(f"Task {self.name} could not be pickled. Cannot pickle: {unpicklable}")
-            else:
-                # Is pickled by something else than task execution
-                return state
-
         # what we return here will be stored in the pickle
         return state
 
+    def __reduce_ex__(self, protocol):
+        if not self._mark_running:
+            # Is pickled by something else than task execution
+            return super().__reduce_ex__(protocol)
+
+        # Passing the task to a child process: the pickled
+        # state is reused as long as the task is not modified
+        try:
+            payload = self._get_payload()
+        except Exception as exc:
+            # When this block might get executed?
+            #   - If FuncTask func is non-picklable
+            #       - There is another func with same name in the file
+            #       - The function is lambda or decorated func
+            state = self.__getstate__()
+            unpicklable = {
+                key: val 
+                for attrs in (state['__dict__'], state['__private_attribute_values__'])
+                for key, val in attrs.items() 
+                if not is_pickleable(val)
+            }
+            self.log_running()
+            self.logger.critical(f"Task '{self.name}' crashed in pickling. Cannot pickle: {unpicklable}", extra={"action": "fail", "task_name": self.name})
+            raise PicklingError(f"Task {self.name} could not be pickled. Cannot pickle: {unpicklable}") from exc
+        runtime = {name: self.__dict__[name] for name in self._runtime_fields}
+        return (_load_task, (type(self), payload, runtime, self.session.clock))
+
+    def _get_clock(self) -> Clock:
+        if self.session is None:
+            # Spawned child process (the task was unpickled without session)
+            return self._clock if self._clock is not None else Clock()
+        return self.session.clock
+
+    def _get_payload(self) -> bytes:
+        "Get pickled state of the task (cached until the task is modified)"
+        if self._payload is None or self._payload[0] != self._version or self._is_mutated(self._payload[1]):
+            mutables = {
+                name: deepcopy(value) for name, value in self.__dict__.items()
+                if isinstance(value, (list, dict, set)) and name in self.__fields__
+            }
+            self._payload = (self._version, mutables, pickle.dumps(self.__getstate__()))
+        return self._payload[2]
+
+    def _is_mutated(self, mutables:dict) -> bool:
+        "Whether the lists, dicts or sets of the fields were modified in place"
+        try:
+            return any(self.__dict__[name] != value for name, value in mutables.items())
+        except Exception:
+            # Cannot be compared (ie. contains arrays)
+            return True
+
     def _handle_return(self, value):
         "Handle the return value (ie. store to parameters)"
+        if isinstance(value, SharedValue):
+            # The file is removed when the value is no longer used
+            value.own()
         self.session.returns[self] = value
 
     def delete(self):
@@ -1009,3 +1294,8 @@ class Task(RedBase, BaseModel):
             kwargs['exclude'] = set()
         kwargs['exclude'].update({'session'})
         return super().json(**kwargs)
+
+# Resolved here (and not only in the setup) so
+# that tasks subclassed before the setup work
+from redengine.session import Session
+Task.update_forward_refs(Session=Session, BaseCondition=BaseCondition)
@@ -1,13 +1,16 @@
 
 
+from collections import OrderedDict
 from datetime import datetime
-from typing import Union
+from typing import TYPE_CHECKING, Hashable, Optional, Union
 from abc import abstractmethod
 
-import pandas as pd
+from .utils import to_nanoseconds, timedelta_to_str, to_dict, to_epoch_ns, epoch_ns_to_datetime
+from .base import TimeInterval, _to_timestamp, _to_interval, _clip_occurrences
 
-from .utils import to_nanoseconds, timedelta_to_str, to_dict
-from .base import TimeInterval
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 
 class AnchoredInterval(TimeInterval):
@@ -47,6 +50,11 @@ class AnchoredInterval(TimeInterval):
     _scope = None # ie. day, hour, second, microsecond
     _scope_max = None
 
+    # Number of cycles of the scope cached per instance (see _get_cycle)
+    cycle_cache_size = 64
+    _cycle_cache: Optional[OrderedDict] = None
+    _last_cycle: Optional[tuple] = None
+
     def __init__(self, start=None, end=None, time_point=None):
         #self.start = start
         #self.end = end
@@ -76,7 +84,7 @@ class AnchoredInterval(TimeInterval):
         kwargs = {key: val for key, val in d.items() if key in comps}
         return to_nanoseconds(**kwargs)
 
-    def anchor_dt(self, dt: Union[datetime, pd.Timestamp], **kwargs) -> int:
+    def anchor_dt(self, dt: 'Union[datetime, pd.Timestamp]', **kwargs) -> int:
         "Turn datetime to nanoseconds according to the scope (by removing higher time elements)"
         components = self.components
         components = components[components.index(self._scope) + 1:]
@@ -89,6 +97,52 @@ class AnchoredInterval(TimeInterval):
 
         return to_nanoseconds(**d)
 
+    def anchor_ns(self, ns:int) -> int:
+        """Turn nanoseconds from epoch to nanoseconds according to the scope.
+        Override for faster calculation."""
+        return self.anchor_dt(_to_timestamp(ns))
+
+    def _get_cycle(self, ns_dt:int) -> tuple:
+        """Get the cycle of the scope (ie. the day for TimeOfDay) 
+        the nanoseconds from epoch are in as a tuple:
+        (start, end, offset, length back, length forward).
+        Nanoseconds relative to the scope (see anchor_ns) are 
+        ns_dt - offset. The cycles are cached per instance."""
+        cycle = self._last_cycle
+        if cycle is not None and cycle[0] <= ns_dt < cycle[1]:
+            return cycle
+
+        key = self._cycle_key(ns_dt)
+        if key is None:
+            # Cycle cannot be cached
+            return self._compute_cycle(ns_dt)
+
+        cache = self._cycle_cache
+        if cache is None:
+            cache = self._cycle_cache = OrderedDict()
+        cycle = cache.get(key)
+        if cycle is None:
+            cycle = cache[key] = self._compute_cycle(ns_dt)
+            if len(cache) > self.cycle_cache_size:
+                cache.popitem(last=False)
+        else:
+            cache.move_to_end(key)
+        self._last_cycle = cycle
+        return cycle
+
+    def _cycle_key(self, ns_dt:int) -> Optional[Hashable]:
+        """Get key of the cycle of the scope for caching.
+        Override to cache the cycles (see _compute_cycle)"""
+        return None
+
+    def _compute_cycle(self, ns_dt:int) -> tuple:
+        """Compute the cycle of the scope (see _get_cycle).
+        Override for faster calculation."""
+        dt = epoch_ns_to_datetime(ns_dt)
+        offset = ns_dt - self.anchor_ns(ns_dt)
+        # Not known where the cycle starts or ends
+        return (ns_dt, ns_dt + 1, offset, self.get_scope_back(dt), self.get_scope_forward(dt))
+
     def set_start(self, val):
         if val is None:
             ns = 0
@@ -113,6 +167,7 @@ class AnchoredInterval(TimeInterval):
 
     @property
     def start(self):
+        import pandas as pd
         delta = pd.Timedelta(self._start, unit="ns")
         repr_scope = self.components[self.components.index(self._scope) + 1]
         return timedelta_to_str(delta, default_scope=repr_scope)
@@ -123,6 +178,7 @@ class AnchoredInterval(TimeInterval):
 
     @property
     def end(self):
+        import pandas as pd
         delta = pd.Timedelta(self._end, unit="ns")
         repr_scope = self.components[self.components.index(self._scope) + 1]
         return timedelta_to_str(delta, default_scope=repr_scope)
@@ -137,7 +193,9 @@ class AnchoredInterval(TimeInterval):
 
     def __contains__(self, dt) -> bool:
         "Whether dt is in the interval"
+        return self._contains_ns(to_epoch_ns(dt))
 
+    def _contains_ns(self, ns_dt:int) -> bool:
         ns_start = self._start
         ns_end = self._end
 
@@ -147,7 +205,7 @@ class AnchoredInterval(TimeInterval):
             # cycle (ie. from 10:00 to 10:00)
             return True
 
-        ns = self.anchor_dt(dt) # In relative nanoseconds (removed more accurate than scope)
+        ns = ns_dt - self._get_cycle(ns_dt)[2] # In relative nanoseconds (removed more accurate than scope)
 
         is_over_period = ns_start > ns_end # period is overnight, over weekend etc.
         if not is_over_period:
@@ -163,6 +221,55 @@ class AnchoredInterval(TimeInterval):
         "Override if offsetting back is different than forward"
         return self._scope_max + 1
 
+    def rollforward(self, dt) -> 'pd.Interval':
+        "Get next time interval of the period"
+        return _to_interval(self._rollforward_span(to_epoch_ns(dt)), like=dt)
+
+    def rollback(self, dt) -> 'pd.Interval':
+        "Get previous time interval of the period"
+        return _to_interval(self._rollback_span(to_epoch_ns(dt)), like=dt)
+
+    def _rollforward_span(self, ns_dt:int) -> tuple:
+        start = ns_dt if self._contains_ns(ns_dt) else self._next_start_ns(ns_dt)
+        end = self._next_end_ns(ns_dt)
+        return (start, end, "both")
+
+    def _rollback_span(self, ns_dt:int) -> tuple:
+        end = ns_dt if self._contains_ns(ns_dt) else self._prev_end_ns(ns_dt)
+        start = self._prev_start_ns(ns_dt)
+        return (start, end, "both")
+
+    def _occurrences_ns(self, start, end):
+        import numpy as np
+        ns_start = int(self._start)
+        ns_end = int(self._end)
+        if ns_start == ns_end:
+            # Full cycle
+            return _clip_occurrences(np.array([start]), np.array([end]), start, end)
+
+        cycles = self._get_cycles(start, end)
+        if cycles is None:
+            return super()._occurrences_ns(start, end)
+
+        starts = self._offset_cycles(cycles[:-1], ns_start)
+        if ns_start < ns_end:
+            ends = self._offset_cycles(cycles[:-1], ns_end)
+        else:
+            # Period is over the cycle (ie. overnight)
+            ends = self._offset_cycles(cycles[1:], ns_end)
+        return _clip_occurrences(starts, ends, start, end)
+
+    def _get_cycles(self, start:int, end:int) -> 'np.ndarray':
+        """Get starts of the cycles of the scope (ie. 
+        midnights for a day) as nanoseconds from epoch 
+        from the one before start to the one after end.
+        Returns None if the cycles are not known."""
+        return None
+
+    def _offset_cycles(self, cycles:'np.ndarray', ns:int) -> 'np.ndarray':
+        "Turn nanoseconds relative to scope to nanoseconds from epoch"
+        return cycles + ns
+
     def rollstart(self, dt):
         "Roll forward to next point in time that on the period"
         if dt in self:
@@ -179,7 +286,11 @@ class AnchoredInterval(TimeInterval):
 
     def next_start(self, dt):
         "Get next start point of the period"
-        ns = self.anchor_dt(dt) # In relative nanoseconds (removed more accurate than scope)
+        return _to_timestamp(self._next_start_ns(to_epoch_ns(dt)), like=dt)
+
+    def _next_start_ns(self, ns_dt:int) -> int:
+        _, _, offset, scope_back, scope_forward = self._get_cycle(ns_dt)
+        ns = ns_dt - offset # In relative nanoseconds (removed more accurate than scope)
         ns_start = self._start
         ns_end = self._end
 
@@ -198,7 +309,7 @@ class AnchoredInterval(TimeInterval):
             #            dt
             #  -->----------<----------->--------------<-
             #  start   |   end        start     |     end
-            offset = pd.Timedelta(int(ns_start) - int(ns), unit="ns")
+            offset = int(ns_start) - int(ns)
         else:
             # not in period, later than start
             #      dt             
@@ -214,13 +325,16 @@ class AnchoredInterval(TimeInterval):
             #                    dt             
             # --<---------->-----------<-------------->--
             #  end   |   start        end    |      start
-            ns_scope = self.get_scope_forward(dt)
-            offset = pd.Timedelta(int(ns_start) - int(ns) + ns_scope, unit="ns")
-        return dt + offset
+            offset = int(ns_start) - int(ns) + scope_forward
+        return ns_dt + offset
 
     def next_end(self, dt):
         "Get next end point of the period"
-        ns = self.anchor_dt(dt) # In relative nanoseconds (removed more accurate than scope)
+        return _to_timestamp(self._next_end_ns(to_epoch_ns(dt)), like=dt)
+
+    def _next_end_ns(self, ns_dt:int) -> int:
+        _, _, offset, scope_back, scope_forward = self._get_cycle(ns_dt)
+        ns = ns_dt - offset # In relative nanoseconds (removed more accurate than scope)
         ns_start = self._start
         ns_end = self._end
 
@@ -239,7 +353,7 @@ class AnchoredInterval(TimeInterval):
             #          dt                              
             # --<---------->-----------<-------------->--
             #  end   |   start        end    |      start
-            offset = pd.Timedelta(int(ns_end) - int(ns), unit="ns")
+            offset = int(ns_end) - int(ns)
         else:
             # not in period, over night
             #                     dt
@@ -255,13 +369,16 @@ class AnchoredInterval(TimeInterval):
             #       dt
             #  -->----------<----------->--------------<-
             #  start   |   end        start     |     end
-            ns_scope = self.get_scope_forward(dt)
-            offset = pd.Timedelta(int(ns_end) - int(ns) + ns_scope, unit="ns")
-        return dt + offset
+            offset = int(ns_end) - int(ns) + scope_forward
+        return ns_dt + offset
 
     def prev_start(self, dt):
         "Get previous start point of the period"
-        ns = self.anchor_dt(dt) # In relative nanoseconds (removed more accurate than scope)
+        return _to_timestamp(self._prev_start_ns(to_epoch_ns(dt)), like=dt)
+
+    def _prev_start_ns(self, ns_dt:int) -> int:
+        _, _, offset, scope_back, scope_forward = self._get_cycle(ns_dt)
+        ns = ns_dt - offset # In relative nanoseconds (removed more accurate than scope)
         ns_start = self._start
         ns_end = self._end
 
@@ -280,8 +397,7 @@ class AnchoredInterval(TimeInterval):
             #            dt
             #  -->----------<----------->--------------<-
             #  start   |   end        start     |     end
-            ns_scope = self.get_scope_back(dt)
-            offset = pd.Timedelta(int(ns_start) - int(ns) - ns_scope, unit="ns")
+            offset = int(ns_start) - int(ns) - scope_back
         else:
             # not in period, later than start
             #      dt             
@@ -297,12 +413,16 @@ class AnchoredInterval(TimeInterval):
             #                    dt             
             # --<---------->-----------<-------------->--
             #  end   |   start        end    |      start
-            offset = pd.Timedelta(int(ns_start) - int(ns), unit="ns")
-        return dt + offset
+            offset = int(ns_start) - int(ns)
+        return ns_dt + offset
 
     def prev_end(self, dt):
         "Get pervious end point of the period"
-        ns = self.anchor_dt(dt) # In relative nanoseconds (removed more accurate than scope)
+        return _to_timestamp(self._prev_end_ns(to_epoch_ns(dt)), like=dt)
+
+    def _prev_end_ns(self, ns_dt:int) -> int:
+        _, _, offset, scope_back, scope_forward = self._get_cycle(ns_dt)
+        ns = ns_dt - offset # In relative nanoseconds (removed more accurate than scope)
         ns_start = self._start
         ns_end = self._end
 
@@ -321,8 +441,7 @@ class AnchoredInterval(TimeInterval):
             #          dt                              
             # --<---------->-----------<-------------->--
             #  end   |   start        end    |      start
-            ns_scope = self.get_scope_back(dt)
-            offset = pd.Timedelta(int(ns_end) - int(ns) - ns_scope, unit="ns")
+            offset = int(ns_end) - int(ns) - scope_back
         else:
             # not in period, over night
             #                     dt
@@ -338,9 +457,9 @@ class AnchoredInterval(TimeInterval):
             #       dt
             #  -->----------<----------->--------------<-
             #  start   |   end        start     |     end
-            offset = pd.Timedelta(int(ns_end) - int(ns), unit="ns")
+            offset = int(ns_end) - int(ns)
 
-        return dt + offset
+        return ns_dt + offset
 
     def __repr__(self):
         cls_name = type(self).__name__
@@ -348,6 +467,7 @@ class AnchoredInterval(TimeInterval):
 
     def __str__(self):
         # Hour: '15:'
+        import pandas as pd
         start_ns = self._start
         end_ns = self._end
 
@@ -362,3 +482,15 @@ class AnchoredInterval(TimeInterval):
 
         start_str = f"0 {repr_scope}s" if not start_str else start_str
         return f"{start_str} - {end_str}"
+
+def _fixed_cycle(ns:int, length:int, shift:int=0) -> tuple:
+    "Get cycle (see AnchoredInterval._get_cycle) that has fixed length (and starts from epoch + shift)"
+    start = (ns - shift) // length * length + shift
+    return (start, start + length, start, length, length)
+
+def _fixed_cycles(start:int, end:int, length:int, shift:int=0) -> 'np.ndarray':
+    "Get cycles that have fixed length (and start from epoch + shift)"
+    import numpy as np
+    first = (start - shift) // length - 1
+    last = (end - shift) // length + 1
+    return np.arange(first, last + 1, dtype=np.int64) * length + shift
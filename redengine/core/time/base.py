@@ -1,30 +1,43 @@
 import datetime
 import time
 from abc import abstractmethod
-from typing import Callable, Dict, List, Pattern, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, Pattern, Tuple, Union
 import itertools
-
-import pandas as pd
+from functools import lru_cache
 
 from redengine._base import RedBase
 from redengine.core.meta import _add_parser
 from redengine.session import Session
+from .utils import to_epoch_ns, timedelta_to_ns
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
 
 PARSERS: Dict[Union[str, Pattern], Union[Callable, 'TimePeriod']] = {}
 
 class _TimeMeta(type):
     def __new__(mcs, name, bases, class_dict):
         cls = type.__new__(mcs, name, bases, class_dict)
-        # Add the parsers
-        if cls.session is None:
-            # Package defaults
-            _add_parser(cls, container=Session._time_parsers)
-        else:
-            # User defined
-            _add_parser(cls, container=cls.session.time_parsers)
+        # Add the parsers (the package defaults and
+        # the user defined time periods are stored
+        # to the class as the defaults are loaded
+        # lazily after the session is created)
+        _add_parser(cls, container=Session._time_parsers)
         return cls
 
 
+class _TimestampAttr:
+    "Attribute of pd.Timestamp (pandas is imported on first access)"
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        import pandas as pd
+        return getattr(pd.Timestamp, self.name)
+
+
 class TimePeriod(RedBase, metaclass=_TimeMeta):
     """Base for all classes that represent a time period.
 
@@ -34,15 +47,15 @@ class TimePeriod(RedBase, metaclass=_TimeMeta):
     is in a given time span.
     """
 
-    resolution = pd.Timestamp.resolution
-    min = pd.Timestamp.min
-    max = pd.Timestamp.max
+    resolution = _TimestampAttr()
+    min = _TimestampAttr()
+    max = _TimestampAttr()
 
     def __contains__(self, other):
         """Whether a given point of time is in
         the TimePeriod"""
-        interval = self.rollforward(other)
-        return other in interval
+        ns = to_epoch_ns(other)
+        return _in_span(ns, self._rollforward_span(ns))
 
     def __and__(self, other):
         # self & other
@@ -67,6 +80,54 @@ class TimePeriod(RedBase, metaclass=_TimeMeta):
         "Get previous time interval of the period."
         raise NotImplementedError
 
+    def _rollforward_span(self, ns:int) -> tuple:
+        """Get next time interval of the period as 
+        (start, end, closed) in nanoseconds from epoch.
+        Override for faster calculation."""
+        return _to_span(self.rollforward(_to_timestamp(ns)))
+
+    def _rollback_span(self, ns:int) -> tuple:
+        """Get previous time interval of the period as 
+        (start, end, closed) in nanoseconds from epoch.
+        Override for faster calculation."""
+        return _to_span(self.rollback(_to_timestamp(ns)))
+
+    def occurrences(self, start, end) -> 'Tuple[np.ndarray, np.ndarray]':
+        """Get the intervals of the period between start and end.
+
+        Parameters
+        ----------
+        start : datetime-like
+            Start of the range.
+        end : datetime-like
+            End of the range.
+
+        Returns
+        -------
+        np.ndarray, np.ndarray
+            Starts and ends (datetime64[ns], wall clock 
+            time) of the intervals. The intervals are 
+            closed and clipped to the range.
+        """
+        starts, ends = self._occurrences_ns(to_epoch_ns(start), to_epoch_ns(end))
+        return starts.view("datetime64[ns]"), ends.view("datetime64[ns]")
+
+    def _occurrences_ns(self, start:int, end:int) -> 'Tuple[np.ndarray, np.ndarray]':
+        """Get the intervals between start and end as nanoseconds
+        from epoch. Override for faster calculation."""
+        import numpy as np
+        starts = []
+        ends = []
+        cursor = start
+        while cursor <= end:
+            span_start, span_end, _ = self._rollforward_span(cursor)
+            if span_start > end:
+                break
+            starts.append(span_start)
+            ends.append(min(span_end, end))
+            cursor = max(span_end, cursor) + 1
+        return np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)
+
     def next(self, dt):
         "Get next interval (excluding currently ongoing if any)."
         interv = self.rollforward(dt)
@@ -133,12 +194,13 @@ class TimeInterval(TimePeriod):
         raise NotImplementedError("Contains not implemented.")
 
     @abstractmethod
-    def from_between(start, end) -> pd.Interval:
+    def from_between(start, end) -> 'pd.Interval':
         raise NotImplementedError("__between__ not implemented.")
 
     def rollforward(self, dt):
         "Get next time interval of the period"
 
+        import pandas as pd
         start = self.rollstart(dt)
         end = self.next_end(dt)
 
@@ -147,9 +209,10 @@ class TimeInterval(TimePeriod):
         
         return pd.Interval(start, end, closed="both")
     
-    def rollback(self, dt) -> pd.Interval:
+    def rollback(self, dt) -> 'pd.Interval':
         "Get previous time interval of the period"
 
+        import pandas as pd
         end = self.rollend(dt)
         start = self.prev_start(dt)
 
@@ -182,6 +245,7 @@ class TimeDelta(TimePeriod):
 
     def __init__(self, past=None, future=None, kws_past=None, kws_future=None):
 
+        import pandas as pd
         past = 0 if past is None else past
         future = 0 if future is None else future
 
@@ -194,24 +258,33 @@ class TimeDelta(TimePeriod):
     @abstractmethod
     def __contains__(self, dt):
         "Check whether the datetime is in "
-        reference = getattr(self, "reference", datetime.datetime.fromtimestamp(time.time()))
-        start = reference - abs(self.past)
-        end = reference + abs(self.future)
-        return start <= dt <= end
+        reference = getattr(self, "reference", None) or self.session.clock.now()
+        reference = to_epoch_ns(reference)
+        start = reference - abs(timedelta_to_ns(self.past))
+        end = reference + abs(timedelta_to_ns(self.future))
+        return start <= to_epoch_ns(dt) <= end
 
     def rollback(self, dt):
         "Get previous interval (including currently ongoing)"
-        start = dt - abs(self.past)
-        start = pd.Timestamp(start)
-        end = pd.Timestamp(dt)
-        return pd.Interval(start, end) 
+        return _to_interval(self._rollback_span(to_epoch_ns(dt)), like=dt)
 
     def rollforward(self, dt):
         "Get next interval (including currently ongoing)"
-        end = dt + abs(self.future)
-        start = pd.Timestamp(dt)
-        end = pd.Timestamp(end)
-        return pd.Interval(start, end)
+        return _to_interval(self._rollforward_span(to_epoch_ns(dt)), like=dt)
+
+    def _rollback_span(self, ns):
+        start = ns - abs(timedelta_to_ns(self.past))
+        return (start, ns, "right")
+
+    def _rollforward_span(self, ns):
+        end = ns + abs(timedelta_to_ns(self.future))
+        return (ns, end, "right")
+
+    def _occurrences_ns(self, start, end):
+        # The reference is floating thus
+        # any time could be in the period
+        import numpy as np
+        return _clip_occurrences(np.array([start]), np.array([end]), start, end)
 
     def __eq__(self, other):
         "Test whether self and other are essentially the same periods"
@@ -232,7 +305,102 @@ class TimeDelta(TimePeriod):
     def __repr__(self):
         return f"TimeDelta(past={repr(self.past)}, future={repr(self.future)})"
 
-def all_overlap(times:List[pd.Interval]):
+# Intervals are handled internally as spans: (start, end, closed)
+# where start and end are nanoseconds from the epoch (in wall 
+# clock time) and closed is as in pd.Interval. These are turned
+# to pd.Interval only when returned to the user.
+
+_MIN_NS = -9223372036854775807 # pd.Timestamp.min.value
+_MAX_NS = 9223372036854775807 # pd.Timestamp.max.value
+_STEP_NS = 1_000 # datetime.datetime.resolution
+
+@lru_cache(maxsize=1024)
+def _naive_timestamp(ns:int) -> 'pd.Timestamp':
+    # Creating timestamps is relatively expensive and
+    # the period bounds (ie. today 10:00) repeat
+    import pandas as pd
+    return pd.Timestamp(ns)
+
+def _to_timestamp(ns:int, like=None) -> 'pd.Timestamp':
+    "Turn nanoseconds from epoch to timestamp (with the timezone of like)"
+    import pandas as pd
+    tzinfo = getattr(like, "tzinfo", None)
+    if tzinfo is None:
+        return _naive_timestamp(ns)
+    offset = timedelta_to_ns(like.utcoffset())
+    return pd.Timestamp(ns - offset, tz=tzinfo)
+
+def _to_interval(span:tuple, like=None) -> 'pd.Interval':
+    "Turn span to pd.Interval"
+    import pandas as pd
+    start, end, closed = span
+    return pd.Interval(_to_timestamp(start, like), _to_timestamp(end, like), closed=closed)
+
+def _to_span(interval:'pd.Interval') -> tuple:
+    "Turn pd.Interval to span"
+    return (to_epoch_ns(interval.left), to_epoch_ns(interval.right), interval.closed)
+
+def _in_span(ns:int, span:tuple) -> bool:
+    start, end, closed = span
+    if closed == "both":
+        return start <= ns <= end
+    elif closed == "right":
+        return start < ns <= end
+    elif closed == "left":
+        return start <= ns < end
+    return start < ns < end
+
+def _spans_overlap(a:tuple, b:tuple) -> bool:
+    "Same as pd.Interval.overlaps but for spans"
+    a_start, a_end, a_closed = a
+    b_start, b_end, b_closed = b
+    # Equality is okay if both endpoints are closed (overlap at a point)
+    if a_closed in ("left", "both") and b_closed in ("right", "both"):
+        overlaps_start = a_start <= b_end
+    else:
+        overlaps_start = a_start < b_end
+    if b_closed in ("left", "both") and a_closed in ("right", "both"):
+        overlaps_end = b_start <= a_end
+    else:
+        overlaps_end = b_start < a_end
+    return overlaps_start and overlaps_end
+
+def _step(ns:int, delta:int) -> int:
+    "Offset nanoseconds (stays within the bounds of pd.Timestamp)"
+    ns = ns + delta
+    if not _MIN_NS <= ns <= _MAX_NS:
+        raise OverflowError("Time period rolled out of the supported range")
+    return ns
+
+def _clip_occurrences(starts:'np.ndarray', ends:'np.ndarray', start:int, end:int):
+    "Get the intervals overlapping the range (clipped to the range)"
+    import numpy as np
+    mask = (ends >= start) & (starts <= end)
+    return np.maximum(starts[mask], start), np.minimum(ends[mask], end)
+
+def _sweep_occurrences(occurrences:List[tuple], min_count:int):
+    """Combine intervals of multiple periods to the 
+    regions where at least min_count of them are active"""
+    import numpy as np
+    starts = np.concatenate([occ[0] for occ in occurrences])
+    ends = np.concatenate([occ[1] for occ in occurrences]) + 1 # As half open
+    if not len(starts):
+        return starts, ends
+
+    times = np.concatenate([starts, ends])
+    changes = np.concatenate([np.ones(len(starts), dtype=np.int64), np.full(len(ends), -1, dtype=np.int64)])
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    counts = np.cumsum(changes[order])
+
+    # The state after all the changes at the same time
+    is_last = np.append(times[1:] != times[:-1], True)
+    times = times[is_last]
+    is_active = counts[is_last] >= min_count
+    was_active = np.insert(is_active[:-1], 0, False)
+    return times[is_active & ~was_active], times[~is_active & was_active] - 1
+
+def all_overlap(times:'List[pd.Interval]'):
     return all(a.overlaps(b) for a, b in itertools.combinations(times, 2))
 
 def get_overlapping(times):
@@ -241,6 +409,7 @@ def get_overlapping(times):
     # B:     <------>
     # C:         <------>
     # Out:       <-->
+    import pandas as pd
     starts = [interval.left for interval in times]
     ends = [interval.right for interval in times]
 
@@ -248,7 +417,28 @@ def get_overlapping(times):
     end = min(ends)
     return pd.Interval(start, end)
 
+def _all_overlap(spans:List[tuple]):
+    return all(_spans_overlap(a, b) for a, b in itertools.combinations(spans, 2))
+
+def _get_overlapping(spans:List[tuple]):
+    start = max(span[0] for span in spans)
+    end = min(span[1] for span in spans)
+    return (start, end, "right")
+
 class All(TimePeriod):
+    """Intersection of time periods.
+
+    The intersection is searched by sweeping the 
+    boundaries of the periods: the cursor jumps to
+    the latest start (or earliest end when rolling 
+    back) of the sub-intervals until they overlap.
+    If none is found within the horizon, an empty
+    interval at the bounds of the time is returned.
+    """
+
+    # Limits for searching the intersection
+    max_iterations = 2_000
+    horizon = datetime.timedelta(days=366 * 100)
 
     def __init__(self, *args):
         if any(not isinstance(arg, TimePeriod) for arg in args):
@@ -258,46 +448,76 @@ class All(TimePeriod):
         self.periods = args
 
     def rollback(self, dt):
-        intervals = [
-            period.rollback(dt)
-            for period in self.periods
-        ]
+        return _to_interval(self._rollback_span(to_epoch_ns(dt)), like=dt)
+
+    def rollforward(self, dt):
+        return _to_interval(self._rollforward_span(to_epoch_ns(dt)), like=dt)
+
+    def _rollback_span(self, ns):
+        horizon = ns - timedelta_to_ns(self.horizon)
+        cursor = ns
+        for _ in range(self.max_iterations):
+            spans = [
+                period._rollback_span(cursor)
+                for period in self.periods
+            ]
+            if _all_overlap(spans):
+                # Example:
+                # A:    <-------------->
+                # B:     <------>
+                # C:         <------>
+                # Out:       <-->
+                return _get_overlapping(spans)
 
-        if all_overlap(intervals):
-            # Example:
-            # A:    <-------------->
-            # B:     <------>
-            # C:         <------>
-            # Out:       <-->
-            return get_overlapping(intervals)
-        else:
             # A:         <---------------->
             # B:            <--->     <--->
             # C:         <------->
-            # Try from:             <-|
+            # Try from:         |
+            # (the intersection cannot end after the earliest end)
+            prev_cursor = min(span[1] for span in spans)
+            if prev_cursor >= cursor:
+                # No progress, stepping before the latest start
+                prev_cursor = max(span[0] for span in spans) - _STEP_NS
+            if prev_cursor < max(horizon, _MIN_NS):
+                break
+            cursor = prev_cursor
+        # Not found
+        return (_MIN_NS, _MIN_NS, "right")
+
+    def _rollforward_span(self, ns):
+        horizon = ns + timedelta_to_ns(self.horizon)
+        cursor = ns
+        for _ in range(self.max_iterations):
+            spans = [
+                period._rollforward_span(cursor)
+                for period in self.periods
+            ]
+            if _all_overlap(spans):
+                # Example:
+                # A:    <-------------->
+                # B:     <------>
+                # C:         <------>
+                # Out:       <-->
+                return _get_overlapping(spans)
 
-            starts = [interval.left for interval in intervals]
-            return self.rollback(max(starts) - datetime.datetime.resolution)
-
-    def rollforward(self, dt):
-        intervals = [
-            period.rollforward(dt)
-            for period in self.periods
-        ]
-        if all_overlap(intervals):
-            # Example:
-            # A:    <-------------->
-            # B:     <------>
-            # C:         <------>
-            # Out:       <-->
-            return get_overlapping(intervals)
-        else:
             # A:          <---------------->
             # B:            <--->     <--->
             # C:                  <------->
-            # Try from:         |->
-            ends = [interval.right for interval in intervals]
-            return self.rollforward(min(ends) + datetime.datetime.resolution)
+            # Try from:           |
+            # (the intersection cannot start before the latest start)
+            next_cursor = max(span[0] for span in spans)
+            if next_cursor <= cursor:
+                # No progress, stepping after the earliest end
+                next_cursor = min(span[1] for span in spans) + _STEP_NS
+            if next_cursor > min(horizon, _MAX_NS):
+                break
+            cursor = next_cursor
+        # Not found
+        return (_MAX_NS, _MAX_NS, "right")
+
+    def _occurrences_ns(self, start, end):
+        occurrences = [period._occurrences_ns(start, end) for period in self.periods]
+        return _sweep_occurrences(occurrences, min_count=len(self.periods))
 
     def __eq__(self, other):
         # self | other
@@ -308,6 +528,16 @@ class All(TimePeriod):
             return False
 
 class Any(TimePeriod):
+    """Union of time periods.
+
+    The union is swept from the first (or last when 
+    rolling back) sub-interval by jumping to its end
+    (or start) as long as another sub-interval 
+    continues from there.
+    """
+
+    # Limit for extending the union
+    max_iterations = 10_000
 
     def __init__(self, *args):
         if any(not isinstance(arg, TimePeriod) for arg in args):
@@ -317,8 +547,14 @@ class Any(TimePeriod):
         self.periods = args
 
     def rollback(self, dt):
-        intervals = [
-            period.rollback(dt)
+        return _to_interval(self._rollback_span(to_epoch_ns(dt)), like=dt)
+
+    def rollforward(self, dt):
+        return _to_interval(self._rollforward_span(to_epoch_ns(dt)), like=dt)
+
+    def _rollback_span(self, ns):
+        spans = [
+            period._rollback_span(ns)
             for period in self.periods
         ]
 
@@ -332,61 +568,50 @@ class Any(TimePeriod):
         # A:    <-->   
         # B:     <--->     <--->
         # C:     <------>
-        # Out:  <------->
+        # Out:            <---->
 
         # Example:
         # A:    <-->   
         # B:    <--->     <--->
         # C:        <----->
         # Out:  <------------->
-        starts = [interval.left for interval in intervals]
-        ends = [interval.right for interval in intervals]
-
-        start = min(starts)
-        end = max(ends)
-
-        next_intervals = [
-            period.rollback(start - datetime.datetime.resolution)
+        end = max(span[1] for span in spans)
+        start = end
+        for _ in range(self.max_iterations):
+            # Sub-intervals that continue the union
+            starts = [span[0] for span in spans if span[1] >= start]
+            if not starts or min(starts) >= start:
+                break
+            start = min(starts)
+            spans = [
+                period._rollback_span(start)
+                for period in self.periods
+            ]
+        return (start, end, "right")
+
+    def _rollforward_span(self, ns):
+        spans = [
+            period._rollforward_span(ns)
             for period in self.periods
         ]
-        if any(pd.Interval(start, end).overlaps(interval) for interval in next_intervals):
-            # Example:
-            # A:    <-->   
-            # B:    <--->     <--->
-            # C:        <----->
-            # Out:  <---------|--->
-            extended = self.rollback(start - datetime.datetime.resolution)
-            start = extended.left
 
-        return pd.Interval(start, end)
-
-    def rollforward(self, dt):
-        intervals = [
-            period.rollforward(dt)
-            for period in self.periods
-        ]
-
-        starts = [interval.left for interval in intervals]
-        ends = [interval.right for interval in intervals]
-
-        start = min(starts)
-        end = max(ends)
-
-        next_intervals = [
-            period.rollforward(end + datetime.datetime.resolution)
-            for period in self.periods
-        ]
-
-        if any(pd.Interval(start, end).overlaps(interval) for interval in next_intervals):
-            # Example:
-            # A:    <-->   
-            # B:    <--->     <--->
-            # C:        <----->
-            # Out:  <---------|--->
-            extended = self.rollforward(end + datetime.datetime.resolution)
-            end = extended.right
-
-        return pd.Interval(start, end)
+        start = min(span[0] for span in spans)
+        end = start
+        for _ in range(self.max_iterations):
+            # Sub-intervals that continue the union
+            ends = [span[1] for span in spans if span[0] <= end]
+            if not ends or max(ends) <= end:
+                break
+            end = max(ends)
+            spans = [
+                period._rollforward_span(end)
+                for period in self.periods
+            ]
+        return (start, end, "right")
+
+    def _occurrences_ns(self, start, end):
+        occurrences = [period._occurrences_ns(start, end) for period in self.periods]
+        return _sweep_occurrences(occurrences, min_count=1)
 
     def __eq__(self, other):
         # self | other
@@ -404,20 +629,33 @@ class StaticInterval(TimePeriod):
         self.end = end if end is not None else self.max
 
     def rollback(self, dt):
-        dt = pd.Timestamp(dt)
-        start = pd.Timestamp(self.start)
-        if start > dt:
-            # The actual interval is in the future
-            return pd.Interval(self.min, self.min)
-        return pd.Interval(start, dt)
+        return _to_interval(self._rollback_span(to_epoch_ns(dt)), like=dt)
 
     def rollforward(self, dt):
-        dt = pd.Timestamp(dt)
-        end = pd.Timestamp(self.end)
-        if end < dt:
+        return _to_interval(self._rollforward_span(to_epoch_ns(dt)), like=dt)
+
+    def _rollback_span(self, ns):
+        import pandas as pd
+        start = to_epoch_ns(pd.Timestamp(self.start))
+        if start > ns:
+            # The actual interval is in the future
+            return (_MIN_NS, _MIN_NS, "right")
+        return (start, ns, "right")
+
+    def _rollforward_span(self, ns):
+        import pandas as pd
+        end = to_epoch_ns(pd.Timestamp(self.end))
+        if end < ns:
             # The actual interval is already gone
-            return pd.Interval(self.max, self.max, closed="both")
-        return pd.Interval(dt, end, closed="both")
+            return (_MAX_NS, _MAX_NS, "both")
+        return (ns, end, "both")
+
+    def _occurrences_ns(self, start, end):
+        import numpy as np
+        import pandas as pd
+        starts = np.array([to_epoch_ns(pd.Timestamp(self.start))])
+        ends = np.array([to_epoch_ns(pd.Timestamp(self.end))])
+        return _clip_occurrences(starts, ends, start, end)
 
     @property
     def is_max_interval(self):
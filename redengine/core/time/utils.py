@@ -1,3 +1,10 @@
+import datetime
+
+# Epoch (1970-01-01, Thursday) as ordinal and weekday
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+EPOCH_WEEKDAY = _EPOCH.weekday()
+
 
 # Conversions
 def to_dict(dt):
@@ -16,6 +23,49 @@ def to_nanoseconds(day=0, hour=0, minute=0, second=0, microsecond=0, nanosecond=
     "Turn time components to nanoseconds"
     return nanosecond + microsecond * 1_000 + second * int(1e+9) + minute * int(6e+10) + hour * int(3.6e+12) + day * int(8.64e+13)
 
+DAY_NS = to_nanoseconds(day=1)
+
+def to_epoch_ns(dt) -> int:
+    """Turn datetime (or pd.Timestamp) to nanoseconds
+    from the epoch in the wall clock time of the datetime"""
+    if dt.tzinfo is None:
+        value = getattr(dt, "value", None)
+        if value is not None:
+            # pd.Timestamp, already nanoseconds
+            return value
+    days = dt.toordinal() - _EPOCH_ORDINAL
+    seconds = ((days * 24 + dt.hour) * 60 + dt.minute) * 60 + dt.second
+    return seconds * 1_000_000_000 + dt.microsecond * 1_000 + getattr(dt, "nanosecond", 0)
+
+def timedelta_to_ns(delta) -> int:
+    "Turn timedelta (or pd.Timedelta) to nanoseconds"
+    value = getattr(delta, "value", None)
+    if value is not None:
+        # pd.Timedelta
+        return value
+    seconds = delta.days * 86_400 + delta.seconds
+    return seconds * 1_000_000_000 + delta.microseconds * 1_000
+
+def epoch_ns_to_datetime(ns:int) -> datetime.datetime:
+    "Turn nanoseconds from the epoch to naive datetime (nanoseconds are truncated)"
+    return _EPOCH + datetime.timedelta(microseconds=ns // 1_000)
+
+def epoch_ns_to_date(ns:int) -> datetime.date:
+    "Turn nanoseconds from the epoch to date"
+    return datetime.date.fromordinal(_EPOCH_ORDINAL + ns // DAY_NS)
+
+# Lengths of months in a common year (see days_in_month)
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def is_leap_year(year:int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+def days_in_month(year:int, month:int) -> int:
+    "Get number of days in a month (same as calendar.monthrange(year, month)[1])"
+    if month == 2 and is_leap_year(year):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
 def timedelta_to_dict(dt, days_in_year=365, days_in_month=30, units=None):
     
     total_seconds = dt.total_seconds()
@@ -0,0 +1,16 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from redengine.core import Task
+
+# Task of the worker process (set by the initializer of the pool)
+_task = None
+
+def _init_worker(task:'Task'):
+    "Set the task of the worker process (pickled once per worker)"
+    global _task
+    _task = task
+
+def _execute_item(params:dict):
+    "Run a map item in a worker process"
+    return _task.execute(**params)
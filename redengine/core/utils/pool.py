@@ -0,0 +1,117 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+
+class PoolRun:
+    """Run of a task in a thread pool.
+
+    Mimics ``threading.Thread`` so the scheduler
+    can check and wait the run as a thread task."""
+
+    def __init__(self, future:Future=None):
+        self.future = future
+        self.started = False
+        self.waited = None # Seconds waited for a thread
+
+    def is_alive(self) -> bool:
+        return self.future is not None and not self.future.done()
+
+    def join(self, timeout=None):
+        wait([self.future], timeout=timeout)
+
+    @property
+    def is_queued(self) -> bool:
+        "Whether the run is waiting for a free thread"
+        return not self.started and not self.future.done()
+
+
+class ThreadPool:
+    """Bounded pool of threads for thread tasks.
+
+    At most ``size`` runs are executed at the same
+    time and at most ``queue_size`` runs wait for
+    a free thread. The pool is saturated when both
+    are full and then no more runs should be submitted.
+
+    Parameters
+    ----------
+    size : int
+        Number of threads.
+    queue_size : int
+        Number of runs allowed to wait for a thread.
+    """
+
+    def __init__(self, size:int, queue_size:int=0):
+        self.size = size
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="redengine-task")
+        self._lock = threading.Lock()
+        self._n_running = 0
+        self._n_queued = 0
+        self._n_started = 0
+        self._n_saturated = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def is_saturated(self) -> bool:
+        "Whether all the threads and the queue are taken"
+        with self._lock:
+            is_saturated = self._n_running + self._n_queued >= self.size + self.queue_size
+            if is_saturated:
+                self._n_saturated += 1
+            return is_saturated
+
+    def submit(self, func:Callable, *args, **kwargs) -> PoolRun:
+        "Run the function in the pool (when a thread is free)"
+        submitted = time.monotonic()
+        pool_run = PoolRun()
+
+        def run():
+            waited = time.monotonic() - submitted
+            with self._lock:
+                self._n_queued -= 1
+                self._n_running += 1
+                self._n_started += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            pool_run.waited = waited
+            pool_run.started = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._n_running -= 1
+
+        with self._lock:
+            self._n_queued += 1
+        try:
+            pool_run.future = self._executor.submit(run)
+        except:
+            with self._lock:
+                self._n_queued -= 1
+            raise
+        return pool_run
+
+    @property
+    def metrics(self) -> dict:
+        """dict: Numbers of running and queued runs,
+        how many times the pool was found saturated and
+        the mean and max time (seconds) the runs waited
+        for a thread"""
+        with self._lock:
+            return {
+                "size": self.size,
+                "queue_size": self.queue_size,
+                "running": self._n_running,
+                "queued": self._n_queued,
+                "started": self._n_started,
+                "saturated": self._n_saturated,
+                "wait_mean": self._wait_total / self._n_started if self._n_started else 0.0,
+                "wait_max": self._wait_max,
+            }
+
+    def shutdown(self, wait:bool=True):
+        "Shut down the threads (when they are free)"
+        self._executor.shutdown(wait=wait)
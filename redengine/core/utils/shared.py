@@ -0,0 +1,199 @@
+import os
+import mmap
+import glob
+import hashlib
+import atexit
+import pickle
+import tempfile
+import weakref
+from typing import Any, Dict, List, Optional, Tuple
+
+# Prefix of the files. The files are named after the
+# main process so it can remove leftovers at exit.
+_FILE_PREFIX = "redengine-shared-"
+
+def _get_dir() -> str:
+    "Get directory for the files (in memory if possible)"
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+def _remove(path:str):
+    try:
+        os.remove(path)
+    except OSError:
+        # Already removed or (on Windows) still mapped
+        pass
+
+@atexit.register
+def _remove_leftovers():
+    "Remove the files created for this process that were not released"
+    for path in glob.glob(os.path.join(_get_dir(), f"{_FILE_PREFIX}{os.getpid()}-*")):
+        _remove(path)
+
+def get_size(value) -> Optional[int]:
+    """Get size of the data of the value in bytes
+    or None if the value is not supported"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    module = type(value).__module__.split(".")[0]
+    if module == "numpy" and hasattr(value, "nbytes"):
+        return value.nbytes
+    elif module == "pandas" and hasattr(value, "memory_usage"):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+    return None
+
+
+class SharedValue:
+    """Handle to a value in shared memory.
+
+    The value is pickled (protocol 5) to a memory-mapped
+    file (in ``/dev/shm`` if available) and only the
+    handle is passed between the processes. The data
+    buffers of NumPy arrays and pandas objects are
+    stored out-of-band thus loading them is zero-copy:
+    the loaded arrays are views to the mapped file
+    (copy-on-write). Other values are unpickled from
+    the mapped file.
+
+    The handle in the main process owns the file:
+    the file is removed when the owning handle is
+    released or garbage collected. Copies (ie. pickled
+    to child processes) do not remove the file.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file.
+    layout : list of tuple
+        Offsets and sizes of the pickled data
+        (first) and the out-of-band buffers.
+    """
+
+    def __init__(self, path:str, layout:List[Tuple[int, int]]):
+        self.path = path
+        self.layout = layout
+        self._finalizer = None
+
+    @classmethod
+    def create(cls, value:Any, dir:Optional[str]=None) -> 'SharedValue':
+        """Write the value to shared memory (or to 
+        a file in given directory)"""
+        buffers = []
+        data = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+
+        # Named after the main process that owns it
+        owner = os.getppid() if _is_child_process() else os.getpid()
+        fd, path = tempfile.mkstemp(prefix=f"{_FILE_PREFIX}{owner}-", dir=dir if dir is not None else _get_dir())
+        layout = []
+        offset = 0
+        try:
+            with open(fd, "wb") as file:
+                for buff in [data, *buffers]:
+                    view = buff.raw() if isinstance(buff, pickle.PickleBuffer) else memoryview(buff)
+                    file.write(view)
+                    layout.append((offset, view.nbytes))
+                    offset += view.nbytes
+        except:
+            _remove(path)
+            raise
+        return cls(path, layout)
+
+    def load(self, readonly:bool=False) -> Any:
+        """Read the value (zero-copy for array data). 
+        If readonly, the arrays cannot be modified. Else
+        they are copy-on-write (the changes are not 
+        written to the shared memory)."""
+        with open(self.path, "rb") as file:
+            access = mmap.ACCESS_READ if readonly else mmap.ACCESS_COPY
+            buff = memoryview(mmap.mmap(file.fileno(), 0, access=access))
+        (data_start, data_size), *buffers = self.layout
+        return pickle.loads(
+            buff[data_start:data_start+data_size],
+            buffers=[buff[start:start+size] for start, size in buffers]
+        )
+
+    def own(self):
+        """Take the ownership of the file (the file is
+        removed when this handle is garbage collected)"""
+        if self._finalizer is None:
+            self._finalizer = weakref.finalize(self, _remove_owned, self.path, os.getpid())
+
+    def release(self):
+        "Remove the file (if owned). Loaded values remain usable."
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def __getstate__(self):
+        # Copies do not own the file
+        return {"path": self.path, "layout": self.layout, "_finalizer": None}
+
+    @property
+    def nbytes(self) -> int:
+        "int: Size of the file in bytes"
+        return sum(size for _, size in self.layout)
+
+    def __repr__(self):
+        return f"SharedValue(path={self.path!r}, size={self.nbytes})"
+
+def _remove_owned(path, pid):
+    # Forked child processes have the finalizer as well
+    if os.getpid() == pid:
+        _remove(path)
+
+def _is_child_process() -> bool:
+    import multiprocessing
+    return multiprocessing.parent_process() is not None
+
+# Values staged to shared memory as {id(value): SharedValue}.
+# Removed when the value is garbage collected.
+_staged: Dict[int, SharedValue] = {}
+# Bytes (cannot be weakly referenced) staged to shared 
+# memory by their content. Removed when the handle
+# is no longer used.
+_staged_content: 'weakref.WeakValueDictionary[Tuple[int, bytes], SharedValue]' = weakref.WeakValueDictionary()
+
+def stage_value(value:Any) -> SharedValue:
+    """Put the value to shared memory once (and return
+    the same handle as long as the value exists).
+
+    The value is staged once per object thus modifying
+    it in place is not reflected to the shared memory.
+    Bytes are staged once per content (as long as the 
+    handle is used). Other values that cannot be weakly
+    referenced (bytearray) are staged every time."""
+    if isinstance(value, bytes):
+        key = (len(value), hashlib.blake2b(value, digest_size=16).digest())
+        handle = _staged_content.get(key)
+        if handle is None:
+            handle = SharedValue.create(value)
+            handle.own()
+            _staged_content[key] = handle
+        return handle
+
+    key = id(value)
+    handle = _staged.get(key)
+    if handle is not None:
+        return handle
+    handle = SharedValue.create(value)
+    handle.own()
+    try:
+        weakref.finalize(value, _staged.pop, key, None)
+    except TypeError:
+        # Not weakly referenceable thus cannot be cached
+        # (id may be reused after it's collected)
+        return handle
+    _staged[key] = handle
+    return handle
+
+def share_value(value:Any, threshold:Optional[int]) -> Any:
+    """Put the value to shared memory if it is
+    at least threshold bytes (None to never).
+    Returns the value or its SharedValue"""
+    if threshold is None:
+        return value
+    size = get_size(value)
+    if size is None or size < threshold:
+        return value
+    return SharedValue.create(value)
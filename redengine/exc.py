@@ -15,4 +15,26 @@ class TaskTerminationException(Exception):
     This should only be raised by threaded
     tasks to signal that they did indeed
     listen the thread_please_terminate event
-    and ended as a result of that"""
\ No newline at end of file
+    and ended as a result of that"""
+
+class MapError(Exception):
+    """Some of the parameter sets of a mapped
+    task failed.
+
+    Parameters
+    ----------
+    errors : dict
+        Exceptions of the failed items as
+        {index of the item: exception}.
+    n_items : int
+        Number of the items.
+    """
+
+    def __init__(self, errors:dict, n_items:int):
+        self.errors = errors
+        self.n_items = n_items
+        lines = [f"{len(errors)} of {n_items} map items failed:"]
+        lines += [f"  item {index}: {exc!r}" for index, exc in list(errors.items())[:10]]
+        if len(errors) > 10:
+            lines.append(f"  ... and {len(errors) - 10} more")
+        super().__init__("\n".join(lines))
@@ -13,6 +13,11 @@ class FuncParam:
         name : str
             Name of the parameter, by default
             the name of the function.
+        cache : str, timedelta, optional
+            How long the value is reused: "cycle"
+            (once per scheduler cycle) or time to 
+            live. By default not cached. See 
+            :py:attr:`redengine.args.FuncArg.cache`.
 
     Examples
     --------
@@ -33,14 +38,17 @@ class FuncParam:
         ... # Send email list
 
     """
-    def __init__(self, name=None, session=None):
+    def __init__(self, name=None, session=None, cache=None):
         self.name = name
         self.session = session
+        self.cache = cache
 
     def __call__(self, func: Callable):
         session = FuncArg.session if self.session is None else self.session
         name = self._get_name(func)
-        session.parameters[name] = FuncArg(func)
+        arg = FuncArg(func)
+        arg.cache = self.cache
+        session.parameters[name] = arg
         return func
 
     def _get_name(self, func):
@@ -1,7 +1,7 @@
 
 from typing import Callable, Dict, Pattern, Union
 
-from ..utils import ParserError, CondParser
+from ..utils import ParserError, CondParser, ParserIndex
 from redengine.core.condition.base import PARSERS, BaseCondition
 from redengine.session import Session
 
@@ -25,20 +25,12 @@ def parse_condition_item(s:str, session=None) -> BaseCondition:
     # TODO: Don't use global
     session = Session.session if session is None else session
 
-    for statement, parser in session.get_cond_parsers().items():
-        if isinstance(statement, Pattern):
-            res = statement.fullmatch(s)
-            if res:
-                args = ()
-                kwargs = res.groupdict()
-                break
-        else:
-            if s == statement:
-                args = (s,)
-                kwargs = {}
-                break
-    else:
+    parsers = session.get_cond_parsers()
+    match = ParserIndex.get(parsers).match(s)
+    if match is None:
         raise ParserError(f"Could not find parser for string {repr(s)}.")
+    statement, kwargs = match
+    parser = parsers[statement]
 
     if isinstance(parser, BaseCondition):
         return parser
@@ -39,11 +39,13 @@ parse_condition_string = InstructionParser(
             "symbol": "&",
             "func": _parse_all,
             "side": "both",
+            "nary": True,
         },
         {
             "symbol": "|",
             "func": _parse_any,
             "side": "both",
+            "nary": True,
         },
     ]
 )
\ No newline at end of file
@@ -27,11 +27,13 @@ parse_time_string = InstructionParser(
             "symbol": "&",
             "func": _parse_all,
             "side": "both",
+            "nary": True,
         },
         {
             "symbol": "|",
             "func": _parse_any,
             "side": "both",
+            "nary": True,
         },
     ]
 )
\ No newline at end of file
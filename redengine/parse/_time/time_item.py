@@ -1,7 +1,7 @@
 
 from typing import Pattern
 
-from ..utils import ParserError
+from ..utils import ParserError, ParserIndex
 from redengine.core.time.base import PARSERS, TimePeriod
 from redengine.session import Session
 
@@ -10,21 +10,12 @@ def parse_time_item(s:str, session=None):
     if session is None:
         # Old way
         session = Session.session
-    parsers = session._time_parsers
-    for statement, parser in parsers.items():
-        if isinstance(statement, Pattern):
-            res = statement.fullmatch(s)
-            if res:
-                args = ()
-                kwargs = res.groupdict()
-                break
-        else:
-            if s == statement:
-                args = (s,)
-                kwargs = {}
-                break
-    else:
+    parsers = session.get_time_parsers()
+    match = ParserIndex.get(parsers).match(s)
+    if match is None:
         raise ParserError(f"Could not find parser for string {repr(s)}.")
+    statement, kwargs = match
+    parser = parsers[statement]
 
     if isinstance(parser, TimePeriod):
         return parser
@@ -1,11 +1,22 @@
 
 from redengine.core.condition.base import CLS_CONDITIONS, BaseCondition
 from redengine.conditions import true, false
+from redengine.session import Session
 from ._condition import parse_condition_string
 from .utils import ParserPicker
 
-def _parse_condition_string(s:str, **kwargs) -> BaseCondition:
-    cond = parse_condition_string(s, **kwargs)
+def _parse_condition_string(s:str, session=None, cache=None, **kwargs) -> BaseCondition:
+    session = Session.session if session is None else session
+    if cache is None:
+        cache = getattr(session, "_parse_cache", None)
+    if cache is None:
+        cond = parse_condition_string(s, session=session, **kwargs)
+    else:
+        parsers = session.get_cond_parsers()
+        cond = cache.get("condition", s, parsers)
+        if cond is None:
+            cond = parse_condition_string(s, session=session, **kwargs)
+            cache.set("condition", s, parsers, cond)
     cond._str = s
     return cond
 
@@ -2,10 +2,21 @@
 #from redengine.core.time.base import CLS
 from ._time import parse_time_string
 
+from redengine.session import Session
 from .utils import ParserPicker
 
-def _parse_time_string(s:str, **kwargs):
-    time = parse_time_string(s, **kwargs)
+def _parse_time_string(s:str, session=None, cache=None, **kwargs):
+    session = Session.session if session is None else session
+    if cache is None:
+        cache = getattr(session, "_parse_cache", None)
+    if cache is None:
+        time = parse_time_string(s, session=session, **kwargs)
+    else:
+        parsers = session.get_time_parsers()
+        time = cache.get("time", s, parsers)
+        if time is None:
+            time = parse_time_string(s, session=session, **kwargs)
+            cache.set("time", s, parsers, time)
     time._str = s
     return time
 
@@ -1,4 +1,6 @@
 from .parser import ParserPicker
 from .utils import _get_session
 from .exception import ParserError
-from .cond import CondParser
\ No newline at end of file
+from .cond import CondParser
+from .index import ParserIndex
+from .cache import ParseCache
\ No newline at end of file
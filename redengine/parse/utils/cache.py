@@ -0,0 +1,172 @@
+import hashlib
+import os
+import pickle
+import time
+from functools import partial
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict, Optional, Tuple, Union
+
+class ParseCache:
+    """Persistent cache of parsed conditions and time periods.
+
+    The parse results are stored as pickled bytes and
+    addressed by the hash of the parsed string and the
+    fingerprint of the registered parsers. If parsers
+    are added or changed, the old results are no longer
+    found. The results not used in ``max_age`` seconds
+    are pruned on save and at most ``max_entries`` of
+    the most recently used results are kept.
+
+    Parameters
+    ----------
+    path : path-like, optional
+        File where the cache is stored. If None,
+        the cache is only kept in memory.
+    max_age : float
+        Seconds a result is kept since it was
+        last used.
+    max_entries : int
+        Maximum number of results stored.
+    """
+
+    version = 2
+
+    def __init__(self, path:Optional[Union[str, Path]], max_age:float=30*24*60*60, max_entries:int=10_000):
+        self.path = Path(path) if path is not None else None
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[bytes, float]] = {} # key: (data, last used)
+        self._fingerprints = {}
+        self._modified = False
+
+    def load(self):
+        "Load the cache from the disk"
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "rb") as f:
+                content = pickle.load(f)
+        except FileNotFoundError:
+            return
+        except Exception:
+            # Corrupted or incompatible, starting from empty
+            return
+        if isinstance(content, dict) and content.get("version") == self.version:
+            self._entries = content["entries"]
+
+    def save(self):
+        "Write the results to the disk (pruning the stale ones)"
+        if self.path is None:
+            return
+        entries = self._prune()
+        if not self._modified and len(entries) == len(self._entries):
+            return
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": self.version, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self._entries = entries
+        self._modified = False
+
+    def _prune(self) -> Dict[str, Tuple[bytes, float]]:
+        "Get the entries that are recently used"
+        oldest = time.time() - self.max_age
+        entries = [(key, val) for key, val in self._entries.items() if val[1] >= oldest]
+        if len(entries) > self.max_entries:
+            entries = sorted(entries, key=lambda item: item[1])[-self.max_entries:]
+        return dict(entries)
+
+    def get(self, kind:str, s:str, parsers:dict) -> Optional[Any]:
+        """Get a fresh copy of a parse result.
+        Returns None if not found."""
+        key = self._get_key(kind, s, parsers)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        data = entry[0]
+        try:
+            obj = pickle.loads(data)
+        except Exception:
+            # Ie. the function of a FuncCond no longer exists
+            del self._entries[key]
+            self._modified = True
+            return None
+        self._entries[key] = (data, time.time())
+        self._modified = True
+        return obj
+
+    def set(self, kind:str, s:str, parsers:dict, obj:Any):
+        "Store a parse result (if it can be cached)"
+        if not _is_cacheable(obj):
+            return
+        try:
+            data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            return
+        key = self._get_key(kind, s, parsers)
+        self._entries[key] = (data, time.time())
+        self._modified = True
+
+    def _get_key(self, kind:str, s:str, parsers:dict) -> str:
+        fingerprint = self.get_fingerprint(parsers)
+        content = f"{kind}\0{fingerprint}\0{s}".encode("utf-8")
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def get_fingerprint(self, parsers:dict) -> str:
+        "Get fingerprint of the registered parsers"
+        version = getattr(parsers, "version", None)
+        cached = self._fingerprints.get(id(parsers))
+        if version is not None and cached is not None and cached[0] == version:
+            return cached[1]
+
+        h = hashlib.blake2b(digest_size=16)
+        for statement, parser in parsers.items():
+            if hasattr(statement, "pattern"):
+                statement = f"{statement.pattern}/{statement.flags}"
+            h.update(f"{statement}\0{_describe(parser)}\n".encode("utf-8"))
+        fingerprint = h.hexdigest()
+        if version is not None:
+            self._fingerprints[id(parsers)] = (version, fingerprint)
+        return fingerprint
+
+def _describe(obj) -> str:
+    "Describe parser in a way that is stable between processes"
+    if isinstance(obj, partial):
+        kwargs = ', '.join(f"{key}={_describe(val)}" for key, val in sorted(obj.keywords.items()))
+        args = ', '.join(_describe(arg) for arg in obj.args)
+        return f"partial({_describe(obj.func)}, {args}, {kwargs})"
+    elif callable(obj):
+        func = getattr(obj, "__func__", obj) # Unbound if method
+        owner = getattr(obj, "__self__", None)
+        if not hasattr(func, "__qualname__"):
+            # Instance (ie. CondParser)
+            func = type(func)
+        descr = f"{func.__module__}.{func.__qualname__}"
+        code = getattr(func, "__code__", None)
+        if code is not None and ("<lambda>" in descr or "<locals>" in descr):
+            # Not unique by name
+            descr += f"@{code.co_firstlineno}:{_digest_code(code)}"
+        wrapped = getattr(owner, "func", None) or getattr(obj, "func", None)
+        if wrapped is not None and wrapped is not obj:
+            # Ie. FuncCond, TaskCond
+            descr += f"[{_describe(wrapped)}]"
+        return descr
+    elif isinstance(obj, (str, int, float, bool, type(None))):
+        return repr(obj)
+    return f"{type(obj).__module__}.{type(obj).__qualname__}"
+
+def _digest_code(code:CodeType) -> str:
+    "Hash the code of a function"
+    h = hashlib.blake2b(code.co_code, digest_size=8)
+    for const in code.co_consts:
+        # Nested functions are code objects (repr has the address)
+        h.update((_digest_code(const) if isinstance(const, CodeType) else repr(const)).encode("utf-8"))
+    h.update(repr(code.co_names).encode("utf-8"))
+    return h.hexdigest()
+
+def _is_cacheable(obj) -> bool:
+    "Check the parsed object (and its subconditions) allow caching"
+    if not getattr(obj, "_cacheable", True):
+        return False
+    return all(_is_cacheable(sub) for sub in getattr(obj, "subconditions", ()))
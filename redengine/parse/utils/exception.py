@@ -1,3 +1,14 @@
-
 class ParserError(Exception):
-    pass
\ No newline at end of file
+    """Error in parsing a string.
+
+    Parameters
+    ----------
+    *args : tuple
+        Passed to Exception.
+    position : int, optional
+        Position in the string where
+        parsing failed.
+    """
+    def __init__(self, *args, position:int=None):
+        super().__init__(*args)
+        self.position = position
@@ -0,0 +1,121 @@
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# Regex flags that can be applied as scoped inline flags (ie. "(?i:...)")
+_INLINE_FLAGS = {
+    re.IGNORECASE: "i",
+    re.MULTILINE: "m",
+    re.DOTALL: "s",
+    re.VERBOSE: "x",
+}
+
+# Finds escaped characters (kept as is), named groups
+# and named backreferences (renamed)
+_REGEX_GROUP_NAMES = re.compile(r"(\\.)|\(\?P<(\w+)>|\(\?P=(\w+)\)")
+
+
+class ParserIndex:
+    """Index of string parsers.
+
+    Compiles the statements (strings and regex patterns)
+    of the parsers to one regex in which each statement
+    is an alternative. Resolving the parser for a string
+    is then done in one pass (instead of trying each
+    statement one by one). The first registered statement
+    that matches has the priority, as in the linear scan.
+
+    Parameters
+    ----------
+    parsers : dict
+        Parsers to index (statement --> parser).
+    """
+
+    def __init__(self, parsers:dict):
+        self.parsers = parsers
+        self.statements = list(parsers)
+        try:
+            self._regex, self._groups = self._compile(self.statements)
+        except re.error:
+            # A statement cannot be embedded (ie. numbered
+            # backreferences). Falling back to linear scan.
+            self._regex, self._groups = None, None
+
+    @classmethod
+    def get(cls, parsers:dict) -> 'ParserIndex':
+        """Get the index of the parsers. The index is
+        cached to the parser registry (if possible) and
+        rebuilt only if parsers are modified."""
+        index = getattr(parsers, "_index", None)
+        if index is None:
+            index = cls(parsers)
+            if hasattr(parsers, "_index"):
+                parsers._index = index
+        return index
+
+    def match(self, s:str) -> Optional[Tuple[object, dict]]:
+        """Find the statement that matches the string.
+
+        Returns
+        -------
+        tuple, None
+            Matched statement and the named groups
+            of the match. None if none matched.
+        """
+        if self._regex is None:
+            return self._match_linear(s)
+
+        res = self._regex.fullmatch(s)
+        if res is None:
+            return None
+        statement, groups = self._groups[res.lastgroup]
+        kwargs = {name: res.group(alias) for alias, name in groups}
+        return statement, kwargs
+
+    def _match_linear(self, s:str):
+        for statement in self.statements:
+            if isinstance(statement, Pattern):
+                res = statement.fullmatch(s)
+                if res:
+                    return statement, res.groupdict()
+            elif s == statement:
+                return statement, {}
+        return None
+
+    @staticmethod
+    def _compile(statements:list) -> Tuple[Pattern, Dict[str, tuple]]:
+        alternatives = []
+        groups = {}
+        for i, statement in enumerate(statements):
+            prefix = f"_p{i}"
+            if isinstance(statement, Pattern):
+                renamed = []
+                def rename(res, prefix=prefix, renamed=renamed):
+                    escaped, group, backref = res.groups()
+                    if escaped is not None:
+                        if escaped[1].isdigit():
+                            # Numbered backreferences would point
+                            # to wrong groups in the combined regex
+                            raise re.error(f"Cannot index numbered backreference {escaped}")
+                        return escaped
+                    elif group is not None:
+                        renamed.append((f"{prefix}_{group}", group))
+                        return f"(?P<{prefix}_{group}>"
+                    else:
+                        return f"(?P={prefix}_{backref})"
+                regex = _REGEX_GROUP_NAMES.sub(rename, statement.pattern)
+                flags = ''.join(
+                    char for flag, char in _INLINE_FLAGS.items()
+                    if statement.flags & flag
+                )
+                if flags:
+                    # Newline closes a possible trailing comment (re.VERBOSE)
+                    regex = f"(?{flags}:{regex}\n)" if "x" in flags else f"(?{flags}:{regex})"
+                # Fails here if the statement cannot be combined
+                re.compile(regex)
+                alternatives.append(f"(?P<{prefix}>{regex})")
+                groups[prefix] = (statement, tuple(renamed))
+            else:
+                alternatives.append(f"(?P<{prefix}>{re.escape(statement)})")
+                groups[prefix] = (statement, ())
+        regex = re.compile('|'.join(alternatives)) if alternatives else re.compile(r"(?!)")
+        return regex, groups
@@ -1,14 +1,36 @@
-
-from functools import partial
 import re
 
 from typing import Callable, Dict, List
 
-from redengine.pybox.string.parse import ClosureParser
-from redengine.pybox.container.visitor import Visitor
+from .exception import ParserError
 
 
 class InstructionParser:
+    """Parser for logical expressions of items.
+
+    The string is tokenized once and the tree is built
+    with precedence climbing. Operators earlier in
+    ``operators`` bind tighter than the later ones.
+
+    Parameters
+    ----------
+    item_parser : Callable
+        Function to parse an item (ie. a condition
+        or a time period) between the operators.
+    operators : list of dict
+        Operators. Each operator is a dict with keys:
+
+        - ``symbol``: Character of the operator.
+        - ``func``: Function to apply to the operands.
+        - ``side``: Side of the operands: ``'both'``
+          for binary, ``'right'`` for prefix and
+          ``'left'`` for postfix operators.
+        - ``nary`` (optional): If True, the function
+          of a binary operator is called once with all
+          the operands of a chain (ie. ``a & b & c``).
+          Otherwise the chain is folded from the right
+          (ie. ``func(a, func(b, c))``).
+    """
 
     def __init__(self, item_parser:Callable, operators:List[Dict[str, Callable]]):
         self.item_parser = item_parser
@@ -16,6 +38,14 @@ class InstructionParser:
         self.operators = operators
         self.symbols = set([oper["symbol"] for oper in operators])
 
+        # Binding powers (higher binds tighter)
+        self._opers = {
+            oper["symbol"]: (len(operators) - i, oper)
+            for i, oper in enumerate(operators)
+        }
+        symbols = ''.join(re.escape(symbol) for symbol in self.symbols)
+        self._regex = re.compile(r'[()' + symbols + ']')
+
     def __call__(self, s:str, **kwargs):
         """Parse a string to condition. Allows logical operators.
 
@@ -27,130 +57,119 @@ class InstructionParser:
             ")" : closing closure
 
         These characters cannot be found in
-        individual condition parsing (ie. 
+        individual condition parsing (ie.
         in the names of tasks).
         """
-        p = ClosureParser()
-        v = Visitor(visit_types=(list,))
-
-        # 1. Split closures
-        l = p.to_list(s)
-
-        # 2. Split operations
-        v.assign_elements(l, self._split_operations)
-        
-        # 2a. Remove extra tuples
-        v.apply(l, _flatten_tuples)
-        
-        v.assign_elements(l, partial(self._parse, **kwargs))
-        
-        e = v.reduce(l, self._assemble) 
-        return e
-
-    def _parse(self, __s:tuple, **kwargs):
-        s = __s
-        def parse_string(s):
-            s = s.strip()
-            if s in ("&", "|", "~"):
-                return s
-            else:
-                return self.item_parser(s, **kwargs)
-
-        if isinstance(s, str):
-            return parse_string(s)
-        else:
-            return tuple(parse_string(e) for e in s)
-
-    def _assemble(self, *s:tuple):
-
-        v = Visitor(visit_types=(list, tuple))
-        s = v.flatten(s)
-
-        #s = self._assemble_not(s)
-        #s = self._assemble_and(s)
-        #s = self._assemble_or(s)
-
-        for operator in self.operators:
-            oper_str = operator["symbol"]
-            oper_func = operator["func"]
-            oper_side = operator["side"]
-            s = self._assemble_oper(s, oper_str=oper_str, oper_func=oper_func, side=oper_side)
-        
-        # TODO: Clean this mess (but be careful)
-
-        return s[0] if isinstance(s, tuple) else s
-
-    def _assemble_oper(self, s:list, oper_str:str, oper_func:Callable, side="both"):
-        s = list(reversed(s))
-        while self._contains_operator(s, oper_str):
-            pos = self._index(s, [oper_str])
-
-            # Set the comparison object to "|" in the list
-            
-            if side == "both":
-                obj = oper_func(s[pos+1], s[pos-1])
-                s[pos] = obj
-                # NOTE: We have reversed the "s" thus we also put the arguments to 
-
-                # Remove lhs and rhs of the comparison as they are embedded in comparison object
-                del s[pos-1]
-                del s[pos+1-1] # We -1 because we already removed one element thus pos is misaligned
-            elif side == "right":
-                obj = oper_func(s[pos-1])
-                s[pos-1] = obj
-                del s[pos]
-            elif side == "left":
-                obj = oper_func(s[pos+1])
-                s[pos+1] = obj
-                del s[pos]
-
-        return tuple(reversed(s))
+        tokens = self._tokenize(s)
+        state = _State(s, tokens)
+
+        expr = self._parse_expr(state, 0, kwargs)
+        token = state.peek()
+        if token is not None:
+            kind, value, pos = token
+            raise ParserError(f"Unexpected {repr(value)} at position {pos} in {repr(s)}", position=pos)
+        return expr
+
+    def _tokenize(self, s:str) -> list:
+        "Turn the string to list of (kind, value, position)"
+        tokens = []
+        start = 0
+        for res in self._regex.finditer(s):
+            self._add_item(tokens, s, start, res.start())
+            symbol = res.group()
+            kind = symbol if symbol in "()" else "oper"
+            tokens.append((kind, symbol, res.start()))
+            start = res.end()
+        self._add_item(tokens, s, start, len(s))
+        return tokens
 
     @staticmethod
-    def _contains_operator(s:list, oper_str:str):
-        for e in s:
-            if isinstance(e, str) and e in (oper_str,):
-                return True
-        return False
-
-    @staticmethod
-    def _index(s:list, items:list):
-        "Get "
-        for i, e in enumerate(s):
-            if isinstance(e, str) and e in items:
-                return i
-        raise KeyError
-
-    def _split_operations(self, s:str):
-        # The following are considered as reserved operators
-        #   "&" : and operator
-        #   "|" : or operator
-        #   "~" : not operator
-        symbols = ''.join(self.symbols)
-        regex = r'([' + symbols + '])'
-        s = s.strip()
-        if bool(re.search(regex, s)):
-            l = re.split(regex, s)
-            l = [elem for elem in l if elem.strip()]
-            if len(l) == 1:
-                # Has only the 
-                return l[0]
-
-            return tuple(l)
+    def _add_item(tokens:list, s:str, start:int, end:int):
+        item = s[start:end]
+        stripped = item.lstrip()
+        if stripped:
+            pos = start + len(item) - len(stripped)
+            tokens.append(("item", stripped.rstrip(), pos))
+
+    def _parse_expr(self, state:'_State', min_power:int, kwargs:dict):
+        "Parse an expression that has only operators binding tighter than min_power"
+        s = state.string
+        token = state.next()
+        if token is None:
+            raise ParserError(f"Expected an expression at position {len(s)} in {repr(s)}", position=len(s))
+        kind, value, pos = token
+
+        # Prefix (or the operand)
+        if kind == "item":
+            try:
+                left = self.item_parser(value, **kwargs)
+            except ParserError as exc:
+                if getattr(exc, "position", None) is None:
+                    exc.position = pos
+                raise
+        elif kind == "(":
+            left = self._parse_expr(state, 0, kwargs)
+            closing = state.next()
+            if closing is None or closing[0] != ")":
+                raise ParserError(f"Unclosed '(' at position {pos} in {repr(s)}", position=pos)
+        elif kind == "oper" and self._opers[value][1]["side"] == "right":
+            power, oper = self._opers[value]
+            operand = self._parse_expr(state, power, kwargs)
+            left = oper["func"](operand)
         else:
-            return s
-
+            raise ParserError(f"Expected an expression at position {pos} in {repr(s)}", position=pos)
+
+        # Infix & postfix
+        while True:
+            token = state.peek()
+            if token is None:
+                break
+            kind, value, pos = token
+            if kind != "oper":
+                if kind == ")":
+                    break
+                raise ParserError(f"Expected an operator at position {pos} in {repr(s)}", position=pos)
+
+            power, oper = self._opers[value]
+            side = oper["side"]
+            if power < min_power or side == "right":
+                break
+            state.next()
+
+            if side == "left":
+                left = oper["func"](left)
+                continue
+
+            # Binary: collect the chain of the same operator
+            # (the operands bind tighter than the operator)
+            operands = [left, self._parse_expr(state, power + 1, kwargs)]
+            while state.peek() is not None and state.peek()[:2] == ("oper", value):
+                state.next()
+                operands.append(self._parse_expr(state, power + 1, kwargs))
+
+            func = oper["func"]
+            if oper.get("nary", False):
+                left = func(*operands)
+            else:
+                left = operands[-1]
+                for operand in reversed(operands[:-1]):
+                    left = func(operand, left)
+        return left
 
-def _flatten_tuples(cont):
 
-    for i, item in enumerate(cont):
-        if isinstance(item, tuple):
-            cont.pop(i)
-            for j, tpl_item in enumerate(item):
-                cont.insert(i+j, tpl_item)
-    
-    return cont
+class _State:
+    "Position in the tokens"
 
+    def __init__(self, string:str, tokens:list):
+        self.string = string
+        self.tokens = tokens
+        self.pos = 0
 
-# Conditions
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
 
+    def next(self):
+        token = self.peek()
+        if token is not None:
+            self.pos += 1
+        return token
@@ -5,14 +5,14 @@ Utilities for getting information
 about the scehuler/task/parameters etc.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import datetime
 import logging
 from multiprocessing import cpu_count
 from pathlib import Path
 import warnings
-import pandas as pd
 
-from pydantic import BaseModel, PrivateAttr, validator
+from pydantic import BaseModel, PrivateAttr, root_validator, validator
 from redengine.log.defaults import create_default_handler
 from typing import TYPE_CHECKING, Callable, ClassVar, Iterable, Dict, List, Optional, Set, Tuple, Type, Union, Any
 from itertools import chain
@@ -21,6 +21,7 @@ from redbird.logging import RepoHandler
 from redengine._base import RedBase
 
 if TYPE_CHECKING:
+    import pandas as pd
     from redengine.core.log import TaskAdapter
     from redengine.parse import StaticParser
     from redengine.core import (
@@ -49,6 +50,7 @@ class Config(BaseModel):
     silence_task_prerun: bool = False # Whether to silence errors occurred in setting a task to run
     silence_cond_check: bool = False # Whether to silence errors occurred in checking conditions
     cycle_sleep: int = None
+    freeze_time: bool = True # Whether the current time is taken once per scheduler cycle (see Clock)
     debug: bool = False
 
     max_process_count = cpu_count()
@@ -56,9 +58,33 @@ class Config(BaseModel):
     restarting: str = 'replace'
     instant_shutdown: bool = False
 
+    thread_pool_size: Optional[int] = None # Threads to run the thread tasks (None: new thread for each run)
+    thread_queue_size: int = 0 # Runs of thread tasks allowed to wait for a free thread in the pool
+
+    materialize_workers: Optional[int] = None # Threads to materialize the arguments of a task concurrently (None: one by one)
+    shared_memory_threshold: Optional[int] = 10 * 1024 ** 2 # Size (bytes) of arrays, DataFrames and bytes passed from/to process tasks via shared memory (None to disable)
+
+    returns_max_count: Optional[int] = None # Max number of return values kept in memory (see Returns)
+    returns_max_size: Optional[int] = None # Max total size (bytes) of return values kept in memory
+    returns_spill_dir: Optional[Path] = None # Directory to spill evicted return values to (else dropped)
+
+    batch_max_runtime: Optional[datetime.timedelta] = None # Batchable process tasks that usually run shorter are run in the same process (None: no batching)
+    batch_max_size: int = 10 # Max number of tasks in a batch
+
     timeout: datetime.timedelta = datetime.timedelta(minutes=30)
     shut_cond: Optional['BaseCondition'] = None
 
+    parse_cache: Optional[Path] = None # File to persist parsed conditions and periods (loaded when first needed, saved on scheduler startup and shutdown)
+
+    @root_validator(pre=True)
+    def _setup_conditions(cls, values):
+        # The conditions are loaded lazily
+        # and the type of shut_cond with them
+        if values.get("shut_cond") is not None:
+            from redengine._setup import _setup_defaults
+            _setup_defaults()
+        return values
+
     @validator('shut_cond', pre=True)
     def parse_shut_cond(cls, value):
         from redengine.parse import parse_condition
@@ -67,9 +93,10 @@ class Config(BaseModel):
             return AlwaysFalse()
         return parse_condition(value)
 
-    @validator('timeout')
+    @validator('timeout', 'batch_max_runtime')
     def parse_timeout(cls, value):
         if isinstance(value, str):
+            import pandas as pd
             return pd.Timedelta(value).to_pytimedelta()
         elif isinstance(value, (float, int)):
             return datetime.timedelta(milliseconds=value * 1000)
@@ -84,6 +111,151 @@ class Hooks(BaseModel):
     scheduler_cycle: List[Callable] = []
     scheduler_shutdown: List[Callable] = []
 
+class Parsers(dict):
+    """Registry of string parsers (statement --> parser).
+
+    Works like a dictionary but keeps track of
+    modifications so that the parsing index
+    (see :py:class:`redengine.parse.utils.ParserIndex`)
+    can be rebuilt lazily when parsers are added.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.version = 0
+        self._index = None
+
+    def _modified(self):
+        self.version += 1
+        self._index = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._modified()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._modified()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._modified()
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._modified()
+        return value
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._modified()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._modified()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._modified()
+
+    def copy(self):
+        return type(self)(self)
+
+    def __reduce__(self):
+        # The index is not pickled (rebuilt when needed)
+        return (type(self), (dict(self),))
+
+class TaskSet(set):
+    """Set of tasks that is indexed by the names
+    of the tasks (for fast lookups by name).
+
+    Works like a set but keeps the index up to
+    date when tasks are added or removed. The
+    tasks reindex the set if they are renamed.
+    """
+
+    def __init__(self, tasks=()):
+        super().__init__(tasks)
+        self._reindex()
+
+    def get_by_name(self, name:str) -> Optional['Task']:
+        "Get task by its name (or None if not found)"
+        return self._names.get(name)
+
+    def _reindex(self):
+        names = {}
+        for task in self:
+            names.setdefault(task.name, task)
+        self._names = names
+
+    def _unindex(self, task):
+        if self._names.get(task.name) is task:
+            del self._names[task.name]
+            if len(self._names) != len(self):
+                # Other task with the same name
+                self._reindex()
+
+    def add(self, task):
+        super().add(task)
+        self._names.setdefault(task.name, task)
+
+    def remove(self, task):
+        super().remove(task)
+        self._unindex(task)
+
+    def discard(self, task):
+        if task in self:
+            self.remove(task)
+
+    def pop(self):
+        task = super().pop()
+        self._unindex(task)
+        return task
+
+    def clear(self):
+        super().clear()
+        self._names = {}
+
+    def update(self, *others):
+        tasks = [task for other in others for task in other]
+        super().update(tasks)
+        for task in tasks:
+            self._names.setdefault(task.name, task)
+
+    def difference_update(self, *others):
+        super().difference_update(*others)
+        self._reindex()
+
+    def intersection_update(self, *others):
+        super().intersection_update(*others)
+        self._reindex()
+
+    def symmetric_difference_update(self, other):
+        super().symmetric_difference_update(other)
+        self._reindex()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __isub__(self, other):
+        self.difference_update(other)
+        return self
+
+    def __iand__(self, other):
+        self.intersection_update(other)
+        return self
+
+    def __ixor__(self, other):
+        self.symmetric_difference_update(other)
+        return self
+
+    def __reduce__(self):
+        # The index is not shared with copies
+        return (type(self), (list(self),))
+
 class Session(RedBase):
     """Collection of the scheduler objects.
 
@@ -129,13 +301,12 @@ class Session(RedBase):
     class Config:
         arbitrary_types_allowed = True
 
-    tasks: Set['Task']
     hooks: Hooks
     parameters: 'Parameters'
     _scheduler: 'Scheduler'
 
-    _time_parsers: ClassVar[Dict] = {}
-    _cls_cond_parsers: ClassVar[Dict] = {} # Default condition parsers
+    _time_parsers: ClassVar[Parsers] = Parsers()
+    _cls_cond_parsers: ClassVar[Parsers] = Parsers() # Default condition parsers
 
     def _get_parameters(self, value):
         from redengine.core import Parameters
@@ -156,27 +327,100 @@ class Session(RedBase):
             raise TypeError("Invalid config type")
 
     def __init__(self, config=None, parameters=None, delete_existing_loggers=False):
-        from redengine.core import Scheduler
+        from redengine.core.clock import Clock
+        from redengine.core.parameters import Returns
         self.config = self._get_config(config)
         self.parameters = self._get_parameters(parameters)
-        self.scheduler = Scheduler(self)
+        self._scheduler = None # Created when needed (see scheduler)
         self.tasks = set()
+        self.clock = Clock()
         self.hooks = Hooks()
-        self.returns = self._get_parameters(None)
-        self._cond_parsers = self._cls_cond_parsers.copy()
+        self.returns = Returns(session=self)
+        self._cond_parsers = None # Copied from the defaults when needed (see get_cond_parsers)
         self._cond_cache: Dict = {} # Cached by CondParser to speed up expensive conditions
         self._cond_states = {} # Used by FuncConds to relay condiiton states to conditions
+        self._parse_cache_file = None # Loaded when needed (see _parse_cache)
+        self._materialize_pool = None # Created when needed (see _get_materialize_pool)
         if delete_existing_loggers:
             self.delete_task_loggers()
 
+    @property
+    def tasks(self) -> TaskSet:
+        "TaskSet: Tasks of the session"
+        return self._tasks
+
+    @tasks.setter
+    def tasks(self, tasks:Iterable['Task']):
+        self._tasks = tasks if isinstance(tasks, TaskSet) else TaskSet(tasks)
+
+    @property
+    def scheduler(self) -> 'Scheduler':
+        "Scheduler of the session"
+        if self._scheduler is None:
+            from redengine.core import Scheduler
+            self._scheduler = Scheduler(self)
+        return self._scheduler
+
+    @scheduler.setter
+    def scheduler(self, value:'Scheduler'):
+        self._scheduler = value
+
+    @property
+    def _parse_cache(self) -> Optional['ParseCache']:
+        "ParseCache: Persistent cache of parse results (follows Config.parse_cache)"
+        path = self.config.parse_cache
+        path = Path(path) if path is not None else None
+        cache = self._parse_cache_file
+        if (cache is None and path is not None) or (cache is not None and cache.path != path):
+            if cache is not None:
+                cache.save()
+            cache = self._get_parse_cache(path)
+            self._parse_cache_file = cache
+        return cache
+
+    def _get_parse_cache(self, path):
+        if path is None:
+            return None
+        from redengine.parse.utils import ParseCache
+        cache = ParseCache(path)
+        cache.load()
+        return cache
+
+    def _save_parse_cache(self):
+        "Write the parse cache to the disk (if in use)"
+        cache = self._parse_cache
+        if cache is not None:
+            cache.save()
+
+    def _get_materialize_pool(self) -> Optional[ThreadPoolExecutor]:
+        """Get the threads to materialize the arguments
+        of the tasks (None if materialized one by one).
+
+        The pool is created when first needed and 
+        recreated if its size is changed in the config."""
+        workers = self.config.materialize_workers
+        pool = self._materialize_pool
+        if workers is None or workers <= 1:
+            return None
+        if pool is None or pool._max_workers != workers:
+            if pool is not None:
+                pool.shutdown(wait=False)
+            pool = self._materialize_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="redengine-params")
+        return pool
+
+    def _close_materialize_pool(self):
+        "Shut down the threads materializing the arguments"
+        if self._materialize_pool is not None:
+            self._materialize_pool.shutdown(wait=False)
+            self._materialize_pool = None
+
     def __getitem__(self, task:Union['Task', str]):
         "Get a task from the session"
         task_name = task.name if not isinstance(task, str) else task
-        for task in self.tasks:
-            if task.name == task_name:
-                return task
-        else:
+        task = self.tasks.get_by_name(task_name)
+        if task is None:
             raise KeyError(f"Task '{task_name}' not found")
+        return task
 
     def __contains__(self, task: Union['Task', str]):
         "Check if task is in session"
@@ -288,6 +532,71 @@ class Session(RedBase):
                 "Level is set to INFO to make sure the task logs get logged. ", UserWarning)
             task_logger.setLevel(logging.INFO)
 
+    def forecast(self, start=None, end=None) -> 'pd.DataFrame':
+        """Predict when the tasks will start.
+
+        The start conditions are analysed without running
+        them. Time periods (ie. ``daily``, ``every 10 minutes``
+        or ``time of day between 10:00 and 12:00``) and task
+        dependencies (ie. ``after task 'other'``) are
+        supported. The tasks are assumed to start as soon
+        as their conditions allow and to succeed.
+
+        Parameters
+        ----------
+        start : datetime-like, optional
+            Start of the forecast, by default now.
+        end : datetime-like, optional
+            End of the forecast, by default a day
+            after start.
+
+        Returns
+        -------
+        pd.DataFrame
+            Predicted starts with columns ``task``,
+            ``start``, ``status`` and ``reason``. Status
+            is "predicted", "continuous" (the condition
+            keeps holding after the start thus the task
+            is restarted repeatedly from the start) or
+            "unknown" (the start condition could not be
+            analysed, reason tells why).
+        """
+        from redengine.core.forecast import forecast
+        return forecast(self, start=start, end=end)
+
+    def simulate(self, start, end, runtimes=None, **kwargs) -> 'pd.DataFrame':
+        """Run the scheduler against a virtual clock.
+
+        The tasks are not executed but they are set
+        running and finished after runtimes sampled
+        from their logs. The clock jumps to the next
+        moment something could happen thus days of
+        scheduling can be simulated in seconds. Note
+        that the statuses and the logs of the tasks
+        are modified.
+
+        Parameters
+        ----------
+        start : datetime-like
+            Start of the simulation.
+        end : datetime-like
+            End of the simulation.
+        runtimes : dict, optional
+            Runtimes of the tasks (task name to seconds,
+            timedelta or list of them to sample from).
+            By default sampled from the logs.
+        **kwargs : dict
+            See :py:class:`redengine.core.simulation.Simulator`.
+
+        Returns
+        -------
+        pd.DataFrame
+            Simulated runs with columns ``task``, ``start``,
+            ``end`` and ``action``.
+        """
+        from redengine.core.simulation import Simulator
+        return Simulator(self, start=start, end=end, runtimes=runtimes, **kwargs)()
+
     def get_tasks(self) -> list:
         """Get session tasks as list.
 
@@ -304,8 +613,19 @@ class Session(RedBase):
 
     def get_cond_parsers(self):
         "Used by the actual string condition parser"
+        if self._cond_parsers is None:
+            # The conditions register their parsers when loaded
+            from redengine._setup import _setup_defaults
+            _setup_defaults()
+            self._cond_parsers = self._cls_cond_parsers.copy()
         return self._cond_parsers
 
+    def get_time_parsers(self):
+        "Used by the actual string time period parser"
+        from redengine._setup import _setup_defaults
+        _setup_defaults()
+        return self._time_parsers
+
     def add_task(self, task: 'Task'):
         "Add the task to the session"
         if_exists = self.config.task_pre_exist
@@ -321,13 +641,112 @@ class Session(RedBase):
         else:
             self.tasks.add(task)
 
+    def add_tasks(self, specs:Iterable[dict], task_class:Type['Task']=None) -> List['Task']:
+        """Create multiple tasks at once.
+
+        Faster than creating the tasks one by one: 
+        the names are checked at once, each distinct
+        condition is parsed only once (the tasks get
+        copies from a shared parse cache) and the tasks
+        are added to the session at once. If any of
+        the tasks cannot be created, none of them
+        are added to the session (and the tasks they
+        would replace are kept). Note that the tasks
+        are still validated one by one.
+
+        Existing names are handled as in
+        :py:meth:`add_task` (config ``task_pre_exist``
+        'raise', 'ignore' or 'replace'). Other options
+        are not supported.
+
+        Parameters
+        ----------
+        specs : iterable of dict
+            Arguments of the tasks. The class of a task
+            can be given with key ``task_class``.
+        task_class : type, optional
+            Class of the tasks that do not specify it, 
+            by default :py:class:`redengine.tasks.FuncTask`.
+
+        Returns
+        -------
+        list of Task
+            The created tasks.
+
+        Examples
+        --------
+        >>> from redengine import session
+        >>> from redengine.tasks import CommandTask
+        >>> session.add_tasks([
+        ...     {"func": do_things, "name": "things", "start_cond": "daily"},
+        ...     {"command": "echo hello", "name": "hello", "start_cond": "hourly", "task_class": CommandTask},
+        ... ]) # doctest: +SKIP
+        """
+        from redengine.parse.utils import ParseCache
+        from redengine.parse import parse_condition
+        if task_class is None:
+            from redengine.tasks import FuncTask
+            task_class = FuncTask
+        on_exists = self.config.task_pre_exist
+        if on_exists not in ("raise", "ignore", "replace"):
+            raise ValueError(f"Adding tasks at once does not support task_pre_exist={on_exists!r}")
+        specs = [dict(spec) for spec in specs]
+
+        if on_exists == "raise":
+            names = set()
+            for spec in specs:
+                name = spec.get("name")
+                if name is None:
+                    # Default name, checked when registering
+                    continue
+                if name in names or name in self:
+                    raise KeyError(f"Task '{name}' already exists")
+                names.add(name)
+
+        # Replaced tasks are restored if the creation fails
+        replaced = []
+        if on_exists == "replace":
+            names = {spec.get("name") for spec in specs}
+            replaced = [self.tasks.get_by_name(name) for name in names if name in self]
+            self.tasks.difference_update(replaced)
+
+        # Each distinct condition is parsed once (the tasks get copies
+        # from the persistent cache or from one shared by the batch)
+        cache = self._parse_cache
+        if cache is None:
+            cache = ParseCache(None)
+        tasks = []
+        try:
+            for spec in specs:
+                cls = spec.pop("task_class", task_class)
+                for key in ("start_cond", "end_cond"):
+                    if isinstance(spec.get(key), str):
+                        spec[key] = parse_condition(spec[key], session=self, cache=cache)
+                tasks.append(cls(session=self, _register=False, **spec))
+            added = self._get_added_tasks(tasks, on_exists)
+        except Exception:
+            self.tasks.update(replaced)
+            raise
+
+        self.tasks.update(added)
+        return tasks
+
+    def _get_added_tasks(self, tasks:List['Task'], on_exists:str) -> List['Task']:
+        "Get the tasks to add to the session (resolving existing names)"
+        added = {}
+        for task in tasks:
+            name = task.name
+            if name in added or name in self:
+                if on_exists == "raise":
+                    raise KeyError(f"Task '{name}' already exists")
+                elif on_exists == "ignore":
+                    continue
+            added[name] = task
+        return list(added.values())
+
     def task_exists(self, task: 'Task'):
         task_name = task.name if not isinstance(task, str) else task
-        for task in self.tasks:
-            if task.name == task_name:
-                return True
-        else:
-            return False
+        return self.tasks.get_by_name(task_name) is not None
 
     def get_repo(self):
         "Get log repo where the task logs are stored"
@@ -406,12 +825,14 @@ class Session(RedBase):
         # NOTE: When a process task is executed, it will pickle
         # the task.session. Therefore removing unpicklable here.
         state = self.__dict__.copy()
-        state["tasks"] = set()
+        state["_tasks"] = TaskSet()
         state["_cond_cache"] = None
         state["_cond_parsers"] = None
+        state["_parse_cache_file"] = None
+        state["_materialize_pool"] = None
         state["session"] = None
         #state["parameters"] = None
-        state['scheduler'] = None
+        state['_scheduler'] = None
         return state
 
     @property
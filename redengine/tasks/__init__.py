@@ -1,4 +1,5 @@
 from .func import FuncTask
 from .code import CodeTask
 from .command import CommandTask
-from . import maintain
\ No newline at end of file
+from . import maintain
+from .discover import discover_tasks
@@ -1,6 +1,16 @@
 
+import marshal
+import functools
+from types import CodeType
+from typing import Optional, Tuple
+
 from redengine.core import Task
 
+@functools.lru_cache(maxsize=1024)
+def _compile(source:str) -> CodeType:
+    "Compile the source (once per source)"
+    return compile(source, "<string>", "exec")
+
 class CodeTask(Task):
     """Task to run a piece of Python code
 
@@ -14,6 +24,14 @@ class CodeTask(Task):
         Piece of Python code to execute. Variable ``return_value``
         is used as the return value of this task if set. Parameters
         are passed to the code as locals.
+    setup : str, optional
+        Piece of Python code to set up the globals of 
+        the code (ie. imports).
+    persistent : bool
+        Whether to run the setup only once and keep 
+        the globals between the runs. Note that if the
+        execution is 'process', the globals are kept
+        only during the run. By default False.
     **kwargs : dict
         See :class:`redengine.core.Task`
 
@@ -44,15 +62,84 @@ class CodeTask(Task):
         ...
         return_value = baz
         ''', parameters={'foo': 'a value', 'bar': 'a value'})
+
+    Example with heavy imports done only once:
+
+    .. code-block:: python
+
+        CodeTask('''
+        return_value = pd.DataFrame({'foo': [foo]})
+        ''', setup="import pandas as pd", persistent=True, parameters={'foo': 'a value'})
+
+    Notes
+    -----
+    The code is compiled only once (or when it is changed).
+    The compiled code is passed to child processes thus 
+    the code is not compiled again if the execution 
+    is 'process'.
     """
     output_variable: str = 'return_value'
     code: str
+    setup: Optional[str]
+    persistent: bool = False
+
+    _compiled: Optional[tuple] = None # ((code, setup), (code object, setup code object))
+    _namespace: Optional[tuple] = None # (setup code object, globals)
 
     def execute(self, **params):
+        code, _ = self.get_compiled()
         loc = params
-        glob = {}
-        exec(self.code, glob, loc)
+        glob = self.get_namespace()
+        exec(code, glob, loc)
         return loc.get(self.output_variable, None)
 
+    def get_compiled(self) -> Tuple[CodeType, Optional[CodeType]]:
+        "Get the compiled code and setup (compiled if changed)"
+        sources = (self.code, self.setup)
+        if self._compiled is None or self._compiled[0] != sources:
+            self._compiled = (sources, tuple(
+                _compile(source) if source is not None else None
+                for source in sources
+            ))
+        return self._compiled[1]
+
+    def get_namespace(self) -> dict:
+        "Get globals for the code (set up if needed)"
+        _, setup = self.get_compiled()
+        if self.persistent and self._namespace is not None and self._namespace[0] is setup:
+            return self._namespace[1]
+        glob = {}
+        if setup is not None:
+            exec(setup, glob)
+        if self.persistent:
+            self._namespace = (setup, glob)
+        return glob
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        priv_attrs = state['__private_attribute_values__']
+        priv_attrs['_namespace'] = None
+        try:
+            codes = self.get_compiled()
+        except SyntaxError:
+            # Raised when run
+            priv_attrs['_compiled'] = None
+        else:
+            # Code objects are not picklable
+            priv_attrs['_compiled'] = (self._compiled[0], tuple(
+                marshal.dumps(code) if code is not None else None
+                for code in codes
+            ))
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if self._compiled is not None:
+            sources, codes = self._compiled
+            self._compiled = (sources, tuple(
+                marshal.loads(code) if code is not None else None
+                for code in codes
+            ))
+
     def get_default_name(self, **kwargs):
         raise ValueError("CodeTask must have name defined")
\ No newline at end of file
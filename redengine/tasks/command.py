@@ -1,5 +1,11 @@
 
+import time
+import queue
+import logging
 import subprocess
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
 from typing import List, Literal, Optional, Union
 
 from pydantic import Field, validator
@@ -8,6 +14,103 @@ from redengine.core.parameters.parameters import Parameters
 from redengine.core.task import Task
 
 
+# Max number of output chunks waiting to be processed.
+# The command is blocked if more is written (backpressure).
+_OUTPUT_QUEUE_SIZE = 1024
+# Max size of a chunk (a line or part of a long line)
+_OUTPUT_CHUNK_SIZE = 64 * 1024
+_OUTPUT_END = object()
+
+class _Tail:
+    "Last max_size bytes (or characters) of an output stream"
+
+    def __init__(self, max_size:Optional[int]=None):
+        self.max_size = max_size
+        self.chunks = deque()
+        self.size = 0
+
+    def append(self, chunk):
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        if self.max_size is None:
+            return
+        while len(self.chunks) > 1 and self.size - len(self.chunks[0]) >= self.max_size:
+            self.size -= len(self.chunks.popleft())
+        if self.size > self.max_size:
+            # Only part of the first chunk fits
+            excess = self.size - self.max_size
+            self.chunks[0] = self.chunks[0][excess:]
+            self.size -= excess
+
+    def get(self, empty):
+        return empty.join(self.chunks)
+
+def _read_output(stream, name:str, output:queue.Queue):
+    "Read the stream of the command to the queue chunk by chunk"
+    try:
+        while True:
+            chunk = stream.readline(_OUTPUT_CHUNK_SIZE)
+            if not chunk:
+                break
+            output.put((name, chunk))
+    finally:
+        stream.close()
+        output.put((name, _OUTPUT_END))
+
+class _CommandTerminated(BaseException):
+    "The command was terminated by the scheduler (which logs it)"
+
+class _CommandProcess:
+    """Command run directly by the scheduler process.
+
+    Mimics ``multiprocessing.Process`` so the scheduler
+    can check, terminate and join it as a process task.
+    The command is started and waited by a thread
+    (``waitpid``) thus no Python process is spawned."""
+
+    def __init__(self, thread:threading.Thread):
+        self._thread = thread
+        self._lock = threading.Lock()
+        self.pipe: Optional[subprocess.Popen] = None
+        self.terminated = False
+
+    def attach(self, pipe:subprocess.Popen):
+        "Set the started command (killed if already terminated)"
+        with self._lock:
+            self.pipe = pipe
+            if self.terminated:
+                pipe.kill()
+
+    def start(self):
+        self._thread.start()
+
+    def is_alive(self) -> bool:
+        return self._thread.is_alive()
+
+    def terminate(self):
+        with self._lock:
+            self.terminated = True
+            if self.pipe is not None and self.pipe.poll() is None:
+                self.pipe.terminate()
+
+    def kill(self):
+        with self._lock:
+            self.terminated = True
+            if self.pipe is not None and self.pipe.poll() is None:
+                self.pipe.kill()
+
+    def join(self, timeout=None):
+        self._thread.join(timeout)
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.pipe.pid if self.pipe is not None else None
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        return self.pipe.returncode if self.pipe is not None else None
+
+
 class CommandTask(Task):
     """Task that executes a command from 
     shell/terminal.
@@ -22,6 +125,33 @@ class CommandTask(Task):
         If true, the command will be executed through the shell.
     kwds_popen : dict, optional
         Keyword arguments to be passed to subprocess.Popen
+    native : bool, optional
+        If true and execution is 'process', the scheduler
+        starts the command directly instead of starting
+        a Python process that runs the command. Timeouts
+        and terminations kill the command. By default False.
+    output_level : int, str, optional
+        Logging level to forward the output (stdout and
+        stderr) of the command line by line to the logger
+        ``output_logger``. By default the output is not
+        logged.
+    output_sample : int
+        Forward only every n-th line of the output to
+        the logger. By default all lines.
+    output_logger : str
+        Name of the logger the output is forwarded to.
+        By default ``redengine.command``.
+    output_file : str, optional
+        Path to a file the whole output is written to.
+        The file is rotated when it reaches
+        ``output_file_max_bytes`` and ``output_file_backups``
+        rotated files are kept.
+    output_tail : int, optional
+        Number of last bytes (or characters if text mode)
+        of stdout and of stderr kept in memory. The tail of
+        stdout is the return value and the tail of stderr
+        is in the error message. By default all output
+        is kept.
     **kwargs : dict
         See :py:class:`redengine.core.Task`
 
@@ -34,12 +164,25 @@ class CommandTask(Task):
     Or list of commands:
 
     >>> task = CommandTask(["python", "-m", "pip", "install", "redengine"], name="my_cmd_task_2")
+
+    Or run without an intermediate Python process:
+
+    >>> task = CommandTask("python -m pip install redengine", name="my_cmd_task_3", execution="process", native=True)
     """
 
     command: Union[str, List[str]]
     shell: bool = False
     cwd: Optional[str]
     kwds_popen: dict = {}
+    native: bool = False
+
+    output_level: Optional[int]
+    output_sample: int = 1
+    output_logger: str = "redengine.command"
+    output_file: Optional[str]
+    output_file_max_bytes: int = 10 * 1024 ** 2
+    output_file_backups: int = 3
+    output_tail: Optional[int]
     argform: Optional[Literal['-', '--', 'short', 'long']] = Field(description="Whether the arguments are turned as short or long form command line arguments")
 
     def get_kwargs_popen(self) -> dict:
@@ -63,6 +206,21 @@ class CommandTask(Task):
             None: '--',
         }[value]
 
+    @validator('output_level', pre=True)
+    def parse_output_level(cls, value):
+        if isinstance(value, str):
+            level = logging.getLevelName(value.upper())
+            if not isinstance(level, int):
+                raise ValueError(f"Invalid logging level: {value}")
+            return level
+        return value
+
+    @validator('output_sample')
+    def parse_output_sample(cls, value):
+        if value < 1:
+            raise ValueError("output_sample must be at least 1")
+        return value
+
     def execute(self, **parameters):
         """Run the command."""
         command = self.command
@@ -78,13 +236,16 @@ class CommandTask(Task):
 
         # https://stackoverflow.com/a/5469427/13696660
         pipe = subprocess.Popen(command, **self.get_kwargs_popen())
-        try:
-            outs, errs = pipe.communicate(timeout=self.timeout)
-        except subprocess.TimeoutExpired:
-            # https://docs.python.org/3.3/library/subprocess.html#subprocess.Popen.communicate
-            pipe.kill()
-            outs, errs = pipe.communicate()
-            raise
+        process = self._process if isinstance(self._process, _CommandProcess) else None
+        if process is not None:
+            # Run natively: the scheduler handles timeouts
+            process.attach(pipe)
+            outs, errs = self.communicate(pipe)
+            if process.terminated:
+                raise _CommandTerminated
+        else:
+            timeout = self.timeout.total_seconds() if self.timeout is not None else None
+            outs, errs = self.communicate(pipe, timeout=timeout)
         
         return_code = pipe.returncode
         if return_code != 0:
@@ -93,6 +254,119 @@ class CommandTask(Task):
             raise OSError(f"Failed running command ({return_code}): \n{errs}")
         return outs
 
+    def communicate(self, pipe:subprocess.Popen, timeout:Optional[float]=None):
+        """Stream the output of the command till it exits.
+
+        The output is forwarded to the logger and to the
+        output file while the command runs and only the
+        tails of stdout and stderr are kept in memory.
+        Reading the output is blocked (thus also the command)
+        if the logging does not keep up.
+
+        Returns
+        -------
+        tuple
+            Tails of stdout and stderr (None if not piped)
+        """
+        if pipe.stdin is not None:
+            pipe.stdin.close()
+        streams = {
+            name: stream
+            for name, stream in (("stdout", pipe.stdout), ("stderr", pipe.stderr))
+            if stream is not None
+        }
+        tails = {name: _Tail(self.output_tail) for name in streams}
+        empty = "" if getattr(pipe, "text_mode", False) else b""
+
+        output = queue.Queue(maxsize=_OUTPUT_QUEUE_SIZE)
+        for name, stream in streams.items():
+            threading.Thread(target=_read_output, args=(stream, name, output), daemon=True).start()
+
+        logger = logging.getLogger(self.output_logger) if self.output_level is not None else None
+        handler = None
+        if self.output_file is not None:
+            handler = RotatingFileHandler(
+                self.output_file, 
+                maxBytes=self.output_file_max_bytes, 
+                backupCount=self.output_file_backups, 
+                encoding="utf-8"
+            )
+            handler.terminator = ""
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        timeouted = False
+        n_lines = 0
+        n_open = len(streams)
+        try:
+            while n_open:
+                wait = None
+                if deadline is not None and not timeouted:
+                    wait = deadline - time.monotonic()
+                    if wait <= 0:
+                        # https://docs.python.org/3.3/library/subprocess.html#subprocess.Popen.communicate
+                        pipe.kill()
+                        timeouted = True
+                        wait = None
+                try:
+                    name, chunk = output.get(timeout=wait)
+                except queue.Empty:
+                    continue
+                if chunk is _OUTPUT_END:
+                    n_open -= 1
+                    continue
+
+                tails[name].append(chunk)
+                if logger is None and handler is None:
+                    continue
+                text = chunk.decode("utf-8", errors="replace") if isinstance(chunk, bytes) else chunk
+                if handler is not None:
+                    handler.emit(logging.makeLogRecord({"msg": text, "args": None}))
+                if logger is not None:
+                    n_lines += 1
+                    if (n_lines - 1) % self.output_sample == 0:
+                        logger.log(self.output_level, text.rstrip("\r\n"), extra={"task_name": self.name, "stream": name})
+        finally:
+            if handler is not None:
+                handler.close()
+        pipe.wait()
+
+        outs = tails["stdout"].get(empty) if "stdout" in tails else None
+        errs = tails["stderr"].get(empty) if "stderr" in tails else None
+        if timeouted:
+            raise subprocess.TimeoutExpired(pipe.args, timeout, output=outs, stderr=errs)
+        return outs, errs
+
+    def run_as_process(self, params:Parameters, daemon=None, log_queue=None):
+        """Create a new process and run the task on that.
+        If native, the command is the process."""
+        if not self.native:
+            return super().run_as_process(params=params, daemon=daemon, log_queue=log_queue)
+
+        params = params.pre_materialize(task=self)
+        direct_params = self.parameters.pre_materialize(task=self)
+
+        event_is_running = threading.Event()
+        self._process = _CommandProcess(
+            threading.Thread(target=self._run_as_native, args=(params, direct_params, event_is_running), daemon=True)
+        )
+        self.last_run = self._get_clock().now() # Needed for termination
+        self._process.start()
+        event_is_running.wait() # Wait until the task is confirmed to run
+
+    def _run_as_native(self, params:Parameters, direct_params:Parameters, event=None):
+        """Run the command and wait for it to finish. This method
+        should only be run by the thread of the command."""
+        self.log_running()
+        event.set()
+        try:
+            self._run_as_main(params=params, direct_params=direct_params, execution="thread")
+        except _CommandTerminated:
+            # Scheduler logs the termination
+            pass
+        except:
+            # Task crashed before actually running the execute.
+            self.log_failure()
+
     def postfilter_params(self, params: Parameters):
         # Only allows the task specific parameters
         # for simplicity
@@ -0,0 +1,112 @@
+import ast
+import warnings
+from pathlib import Path
+from typing import Iterator, List, Union
+
+from redengine._base import RedBase
+from .func import FuncTask
+
+def _is_task_decorator(node:ast.expr) -> bool:
+    "Whether the decorator is ``@FuncTask(...)`` (or ``@tasks.FuncTask(...)``)"
+    if not isinstance(node, ast.Call):
+        return False
+    func = node.func
+    if isinstance(func, ast.Name):
+        return func.id == "FuncTask"
+    elif isinstance(func, ast.Attribute):
+        return func.attr == "FuncTask"
+    return False
+
+def find_task_definitions(path:Path) -> Iterator[dict]:
+    """Find the tasks defined in a Python file
+    without executing it.
+
+    Yields the arguments of the ``@FuncTask(...)``
+    decorators of the functions in the module level.
+    The arguments must be literals (strings, numbers
+    etc.)."""
+    tree = ast.parse(Path(path).read_text(), filename=str(path))
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            continue
+        for decorator in node.decorator_list:
+            if not _is_task_decorator(decorator):
+                continue
+            try:
+                if decorator.args:
+                    raise ValueError("Positional arguments are not supported")
+                kwargs = {
+                    kw.arg: ast.literal_eval(kw.value)
+                    for kw in decorator.keywords
+                }
+                if None in kwargs:
+                    raise ValueError("Unpacked arguments are not supported")
+            except ValueError:
+                warnings.warn(
+                    f"Task '{node.name}' in {path}:{decorator.lineno} has non-literal arguments "
+                    "and cannot be discovered without importing the file. Skipping."
+                )
+                continue
+            yield {"func_name": node.name, "path": path, **kwargs}
+
+def discover_tasks(path:Union[str, Path], pattern:str="**/*.py", session=None, **kwargs) -> List[FuncTask]:
+    """Create the tasks of the Python files in a
+    directory without importing the files.
+
+    The files are parsed for functions decorated with
+    ``@FuncTask(...)`` and a delayed task is created
+    for each. A file is imported only when one of its
+    tasks is run and it is imported again only if
+    the file is modified.
+
+    Parameters
+    ----------
+    path : path-like
+        Directory to search the task files from.
+    pattern : str
+        Glob pattern of the task files, by default
+        all Python files in the directory and its
+        subdirectories.
+    session : redengine.Session, optional
+        Session to add the tasks to, by default
+        the default session.
+    **kwargs : dict
+        Default arguments of the tasks. The arguments
+        in the decorators override these.
+
+    Returns
+    -------
+    list of FuncTask
+        The created tasks.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        # Content of tasks/reports.py
+        from redengine.tasks import FuncTask
+
+        @FuncTask(start_cond="daily", execution="process")
+        def report():
+            ...
+
+    >>> from redengine.tasks import discover_tasks
+    >>> discover_tasks("tasks/") # doctest: +SKIP
+    [FuncTask(name='tasks.reports:report', ...)]
+
+    Warnings
+    --------
+    The arguments of the decorators must be literals
+    (ie. ``start_cond="daily"``) as the files are not
+    executed. Tasks with other arguments are skipped
+    with a warning.
+    """
+    if session is None:
+        session = RedBase.session
+    specs = [
+        {**kwargs, **spec}
+        for file in sorted(Path(path).glob(pattern))
+        if file.is_file()
+        for spec in find_task_definitions(file)
+    ]
+    return session.add_tasks(specs, task_class=FuncTask)
@@ -3,8 +3,10 @@ from os import stat_result
 import sys
 import inspect
 import importlib
+import threading
 from pathlib import Path
-from typing import Callable, List, Optional
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
 import warnings
 
 from pydantic import Field, validator
@@ -15,7 +17,43 @@ from redengine.core.parameters import Parameters
 from redengine.pybox.pkg import find_package_root
 
 
-def get_module(path, pkg_path=None):
+# Imported task modules as {absolute path: ((mtime, size), module)}
+_module_cache: Dict[Path, Tuple[tuple, ModuleType]] = {}
+_module_lock = threading.RLock()
+_loading = threading.local()
+
+def _is_loading() -> bool:
+    "Whether a task module is being imported by get_module (in this thread)"
+    return getattr(_loading, "depth", 0) > 0
+
+def get_module(path, pkg_path=None, cache=True):
+    """Import a module from a file.
+
+    If cache is True, the module is imported only once
+    and again only if the file is modified (its mtime 
+    or size changed). While the module is executed, 
+    ``@FuncTask(...)`` decorators in it do not create 
+    tasks (the task is the one importing the module)."""
+    path = Path(path)
+    if not cache:
+        return _exec_module(path, pkg_path=pkg_path)
+
+    key = path.absolute()
+    with _module_lock:
+        try:
+            stat = key.stat()
+        except OSError:
+            # Fails in importing
+            return _exec_module(path, pkg_path=pkg_path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = _module_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        task_module = _exec_module(path, pkg_path=pkg_path)
+        _module_cache[key] = (version, task_module)
+        return task_module
+
+def _exec_module(path, pkg_path=None):
     if pkg_path:
         name = '.'.join(
             path
@@ -28,10 +66,13 @@ def get_module(path, pkg_path=None):
     spec = importlib.util.spec_from_file_location(name, path.absolute())
     task_module = importlib.util.module_from_spec(spec)
 
+    _loading.depth = getattr(_loading, "depth", 0) + 1
     try:
         spec.loader.exec_module(task_module)
     except Exception as exc:
         raise ImportError(f"Importing the file '{path}' failed.") from exc
+    finally:
+        _loading.depth -= 1
     return task_module
 
 def to_import_path(src:stat_result):
@@ -197,6 +238,10 @@ class FuncTask(Task):
     def __call__(self, *args, **kwargs):
         if not hasattr(self, "func"):
             func = args[0]
+            if _is_loading():
+                # The module is imported by a task (ie. discovered 
+                # with discover_tasks) thus the task exists already
+                return func
             super().__init__(func=func, **self._delayed_kwargs)
             self._set_descr()
             self._delayed_kwargs = {}
@@ -210,8 +255,9 @@ class FuncTask(Task):
 
     def _set_descr(self):
         "Set description from func doc if desc missing"
-        if self.description is None and hasattr(self.func, "__doc__"):
-            self.description = self.func.__doc__
+        doc = getattr(self.func, "__doc__", None)
+        if self.description is None and doc is not None:
+            self.description = doc
 
     def execute(self, **params):
         "Run the actual, given, task"
@@ -219,13 +265,15 @@ class FuncTask(Task):
         output = func(**params)
         return output
 
-    def get_func(self, cache=True):
+    def get_func(self, cache=None):
+        if cache is None:
+            cache = self.cache
         if self.func is None:
             # Add dir of self.path to sys.path so importing from that dir works
             pkg_path = find_package_root(self.path)
             root = str(Path(self.path).parent.absolute()) if not pkg_path else str(pkg_path)
 
-            # _task_func is cached to faster performance
+            # The module is executed only if the file has changed
             with TempSysPath([root] + self.sys_paths):
                 task_module = get_module(self.path, pkg_path=pkg_path)
             task_func = getattr(task_module, self.func_name)
@@ -251,13 +299,6 @@ class FuncTask(Task):
         else:
             return f'{module_name}:{func_name}'
 
-    def process_finish(self, *args, **kwargs):
-        if self.is_delayed():
-            # Deleting the _func so it is refreshed
-            # next time the task is run.
-            self._func = None
-        super().process_finish(*args, **kwargs)
-
     def is_delayed(self):
         return self.func is None
         
@@ -24,6 +24,7 @@ from redengine.conditions import (
 
 from redengine.time import (
     TimeDelta,
+    Cron,
 
     TimeOfMinute,
     TimeOfHour,
@@ -63,6 +64,7 @@ cases_time = [
     # Time delta
     pytest.param("every 1 hours", TaskExecutable(period=TimeDelta("1 hours")), id="every hour"),
     pytest.param("every 1 days 1 hours 30 minutes 30 seconds", TaskExecutable(period=TimeDelta("1 days 1 hours 30 minutes 30 seconds")), id="every hour 30 mins 30 seconds"),
+    pytest.param("cron '*/5 9-17 * * 1-5'", TaskExecutable(period=Cron("*/5 9-17 * * 1-5")), id="cron"),
 
     # IsTimeOf...
     pytest.param("time of hour between 45:00 and 50:00",       IsPeriod(period=TimeOfHour("45:00", "50:00")), id="time of hour between"),
@@ -189,14 +191,36 @@ def test_back_to_string(cond_str, expected):
 @pytest.mark.parametrize("cond_str,exc",
     [
         pytest.param("this is not valid", ParserError, id="Invalid condition"),
-        pytest.param("true &", IndexError, id="AND, missing right"),
-        pytest.param("true |", IndexError, id="OR, missing right"),
-        pytest.param("& true", IndexError, id="AND, missing left"),
-        pytest.param("| true", IndexError, id="OR, missing left"),
+        pytest.param("true &", ParserError, id="AND, missing right"),
+        pytest.param("true |", ParserError, id="OR, missing right"),
+        pytest.param("& true", ParserError, id="AND, missing left"),
+        pytest.param("| true", ParserError, id="OR, missing left"),
 
         pytest.param("after tasks missing quotes", ParserError, id="Malformed after tasks"),
+        pytest.param("(true & false", ParserError, id="Unclosed"),
+        pytest.param("true & false)", ParserError, id="Unopened"),
+        pytest.param("true (false)", ParserError, id="Missing operator"),
     ]
 )
 def test_failure(cond_str, exc):
     with pytest.raises(exc):
-        parse_condition(cond_str)
\ No newline at end of file
+        parse_condition(cond_str)
+
+@pytest.mark.parametrize("cond_str,position",
+    [
+        pytest.param("true & this is not valid", 7, id="Invalid condition"),
+        pytest.param("true &", 6, id="AND, missing right"),
+        pytest.param("| true", 0, id="OR, missing left"),
+        pytest.param("(true & false", 0, id="Unclosed"),
+        pytest.param("true & false)", 12, id="Unopened"),
+    ]
+)
+def test_failure_position(cond_str, position):
+    with pytest.raises(ParserError) as exc_info:
+        parse_condition(cond_str)
+    assert exc_info.value.position == position
+
+def test_long_expression():
+    n = 2000
+    cond = parse_condition(" & ".join(["true"] * n) + " | " + " | ".join(["~false"] * n))
+    assert cond == Any(All(*[AlwaysTrue()] * n), *[Not(AlwaysFalse())] * n)
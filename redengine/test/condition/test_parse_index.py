@@ -0,0 +1,56 @@
+import re
+
+import pytest
+
+from redengine.session import Parsers
+from redengine.parse.utils import ParserIndex
+from redengine.parse import parse_condition
+from redengine.conditions import FuncCond
+
+def test_priority():
+    parsers = Parsers({
+        re.compile(r"is (?P<thing>.+)"): "first",
+        "is foo": "second",
+        re.compile(r"is (?P<thing>foo|bar) again"): "third",
+    })
+    index = ParserIndex.get(parsers)
+    statement, kwargs = index.match("is foo")
+    assert parsers[statement] == "first"
+    assert kwargs == {"thing": "foo"}
+
+    assert index.match("not foo") is None
+
+def test_same_group_names():
+    parsers = Parsers({
+        re.compile(r"task '(?P<task>.+)' has run"): "run",
+        re.compile(r"task '(?P<task>.+)' has (?P<action>failed|succeeded)"): "action",
+        re.compile(r"(?i:loud) (?P<task>.+)"): "loud",
+    })
+    index = ParserIndex.get(parsers)
+    assert index.match("task 'x' has failed") == (list(parsers)[1], {"task": "x", "action": "failed"})
+    assert index.match("task 'x' has run") == (list(parsers)[0], {"task": "x"})
+    assert index.match("LOUD x") == (list(parsers)[2], {"task": "x"})
+
+def test_rebuild_lazily():
+    parsers = Parsers({"is foo": "foo"})
+    index = ParserIndex.get(parsers)
+    assert ParserIndex.get(parsers) is index
+    assert index.match("is bar") is None
+
+    parsers["is bar"] = "bar"
+    new_index = ParserIndex.get(parsers)
+    assert new_index is not index
+    assert new_index.match("is bar") == ("is bar", {})
+
+def test_fallback_linear():
+    parsers = Parsers({
+        re.compile(r"(?P<x>a)\1"): "backref",
+    })
+    index = ParserIndex.get(parsers)
+    assert index._regex is None
+    assert index.match("aa") == (list(parsers)[0], {"x": "a"})
+
+def test_func_cond(session):
+    cond = FuncCond(lambda: True, syntax=re.compile(r"is foo (?P<place>.+)"), session=session)
+    cond = parse_condition("is foo home & daily")
+    assert cond[0].kwargs == {"place": "home"}
@@ -0,0 +1,117 @@
+import os
+import time
+from collections import Counter
+
+import pytest
+
+from redengine.conditions import AlwaysTrue, SchedulerCycles
+from redengine.tasks import FuncTask
+
+def get_pid():
+    return os.getpid()
+
+def fail():
+    raise RuntimeError("Oops")
+
+def run_slow():
+    time.sleep(10)
+
+def test_runtime_history(session):
+    session.config.batch_max_runtime = 1
+    session.config.max_process_count = 10
+    tasks = [
+        FuncTask(get_pid, name=f"task {i}", start_cond=AlwaysTrue(), execution="process", batchable=True)
+        for i in range(3)
+    ]
+    assert not any(session.scheduler.is_batchable(task) for task in tasks)
+    session.config.shut_cond = SchedulerCycles() >= 1
+    session.start()
+
+    # First run has no history thus run separately
+    assert len({session.returns[task] for task in tasks}) == 3
+    assert all(task._mean_runtime is not None for task in tasks)
+    assert all(session.scheduler.is_batchable(task) for task in tasks)
+
+    session.config.shut_cond = SchedulerCycles() >= 1
+    session.start()
+    assert len({session.returns[task] for task in tasks}) == 1
+    for task in tasks:
+        assert 2 == task.logger.filter_by(action="run").count()
+        assert 2 == task.logger.filter_by(action="success").count()
+
+@pytest.mark.parametrize("batchable,max_runtime,mean_runtime", [
+    pytest.param(False, 1, 0.01, id="not batchable"),
+    pytest.param(True, None, 0.01, id="batching disabled"),
+    pytest.param(True, 1, 2, id="too long"),
+])
+def test_not_batched(session, batchable, max_runtime, mean_runtime):
+    session.config.batch_max_runtime = max_runtime
+    session.config.max_process_count = 10
+    tasks = [
+        FuncTask(get_pid, name=f"task {i}", start_cond=AlwaysTrue(), execution="process", batchable=batchable)
+        for i in range(2)
+    ]
+    for task in tasks:
+        task._mean_runtime = mean_runtime
+    session.config.shut_cond = SchedulerCycles() >= 1
+    session.start()
+    assert len({session.returns[task] for task in tasks}) == 2
+
+def test_max_size(session):
+    session.config.batch_max_runtime = 1
+    session.config.max_process_count = 10
+    session.config.batch_max_size = 2
+    tasks = [
+        FuncTask(get_pid, name=f"task {i}", start_cond=AlwaysTrue(), execution="process", batchable=True)
+        for i in range(5)
+    ]
+    for task in tasks:
+        task._mean_runtime = 0.01
+    session.config.shut_cond = SchedulerCycles() >= 1
+    session.start()
+    pids = Counter(session.returns[task] for task in tasks)
+    assert sorted(pids.values()) == [1, 2, 2]
+
+def test_fail(session):
+    session.config.batch_max_runtime = 1
+    session.config.max_process_count = 10
+    task_fail = FuncTask(fail, name="failing", start_cond=AlwaysTrue(), execution="process", batchable=True, priority=1)
+    task_success = FuncTask(get_pid, name="succeeding", start_cond=AlwaysTrue(), execution="process", batchable=True)
+    task_fail._mean_runtime = 0.01
+    task_success._mean_runtime = 0.01
+    session.config.shut_cond = SchedulerCycles() >= 1
+    session.start()
+
+    assert task_fail.status == "fail"
+    assert task_success.status == "success"
+    assert 1 == task_fail.logger.filter_by(action="fail").count()
+    assert session.returns[task_success] != os.getpid()
+
+def test_terminate(session):
+    session.config.batch_max_runtime = 1
+    session.config.max_process_count = 10
+    task_slow = FuncTask(run_slow, name="slow", execution="process", batchable=True, priority=1)
+    task_other = FuncTask(get_pid, name="other", execution="process", batchable=True)
+    session.scheduler.run_batch([task_slow, task_other])
+    assert task_slow.is_alive()
+    assert task_other.is_alive()
+
+    session.scheduler.terminate_task(task_slow, reason="timeout")
+    assert not task_other.is_alive()
+    assert task_slow.status == "terminate"
+    # Did not get to run
+    assert task_other.status == "terminate"
+    assert 1 == task_other.logger.filter_by(action="run").count()
+    assert 0 == task_other.logger.filter_by(action="success").count()
+
+def test_not_blocking(session):
+    session.config.batch_max_runtime = 1
+    task_slow = FuncTask(run_slow, name="slow", execution="process", batchable=True, priority=1)
+    task_other = FuncTask(get_pid, name="other", execution="process", batchable=True)
+    start = time.perf_counter()
+    session.scheduler.run_batch([task_slow, task_other])
+    assert time.perf_counter() - start < 5
+    # Both are logged running at launch
+    assert task_slow.status == "run"
+    assert task_other.status == "run"
+    session.scheduler.terminate_task(task_slow)
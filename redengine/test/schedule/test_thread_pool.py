@@ -0,0 +1,84 @@
+import threading
+import time
+
+from redengine.conditions import AlwaysTrue, SchedulerCycles
+from redengine.tasks import FuncTask
+
+def run_slow():
+    time.sleep(0.2)
+    return threading.current_thread().name
+
+def run_slow_terminable(_thread_terminate_):
+    _thread_terminate_.wait(5)
+
+def test_bounded(session):
+    session.config.thread_pool_size = 2
+    session.config.thread_queue_size = 1
+    tasks = [
+        FuncTask(run_slow, name=f"task {i}", start_cond=AlwaysTrue(), execution="thread")
+        for i in range(5)
+    ]
+    session.config.shut_cond = SchedulerCycles() >= 1
+    session.start()
+
+    # Only size + queue tasks were started
+    n_runs = sum(task.logger.filter_by(action="run").count() for task in tasks)
+    n_success = sum(task.logger.filter_by(action="success").count() for task in tasks)
+    assert 3 == n_runs
+    assert 3 == n_success
+    assert all(session.returns[task].startswith("redengine-task") for task in tasks if task.status == "success")
+
+    pool = session.scheduler._thread_pool
+    assert pool is None # Shut down
+
+def test_saturation_metrics(session):
+    session.config.thread_pool_size = 1
+    task_1 = FuncTask(run_slow, name="task 1", execution="thread")
+    task_2 = FuncTask(run_slow, name="task 2", execution="thread")
+
+    task_1()
+    assert not session.scheduler.has_free_threads()
+
+    # Queue is allowed
+    session.config.thread_queue_size = 1
+    pool = session.scheduler.get_thread_pool()
+    task_1()
+    task_2()
+    assert task_2._thread.is_queued
+    assert not session.scheduler.has_free_threads()
+    task_2._thread.join()
+
+    assert task_1.status == "success"
+    assert task_2.status == "success"
+    metrics = pool.metrics
+    assert metrics["running"] == 0 and metrics["queued"] == 0
+    assert metrics["started"] == 2
+    assert metrics["saturated"] == 1
+    assert metrics["wait_max"] >= 0.1
+    assert task_2._thread.waited == metrics["wait_max"]
+
+def test_terminate_queued(session):
+    session.config.thread_pool_size = 1
+    session.config.thread_queue_size = 1
+    task_1 = FuncTask(run_slow_terminable, name="task 1", execution="thread")
+    task_2 = FuncTask(run_slow, name="task 2", execution="thread")
+
+    task_1()
+    task_2()
+    session.scheduler.terminate_task(task_2)
+    session.scheduler.terminate_task(task_1)
+    task_2._thread.join()
+
+    assert task_1.status == "success"
+    assert task_2.status == "terminate"
+    assert 0 == task_2.logger.filter_by(action="success").count()
+
+def test_resize(session):
+    session.config.thread_pool_size = 1
+    pool = session.scheduler.get_thread_pool()
+    assert session.scheduler.get_thread_pool() is pool
+    session.config.thread_pool_size = 3
+    assert session.scheduler.get_thread_pool().size == 3
+    session.config.thread_pool_size = None
+    assert session.scheduler.get_thread_pool() is None
+    pool.shutdown()
@@ -1,4 +1,6 @@
 
+import time
+
 import pytest
 
 from redengine.args import Private, Return
@@ -76,4 +78,66 @@ def test_unpicklable(session, execution):
 
     assert task.status is None
     session.start()
-    assert "success" == task.status
\ No newline at end of file
+    assert "success" == task.status
+
+
+@pytest.fixture
+def get_x_counted():
+    "Function returning 'x' that counts its calls (to attr calls)"
+    def get_x_counted():
+        get_x_counted.calls += 1
+        return "x"
+    get_x_counted.calls = 0
+    return get_x_counted
+
+@pytest.mark.parametrize("execution", ["main", "thread", "process"])
+def test_cache_cycle(session, execution, get_x_counted):
+    arg = FuncArg(get_x_counted)
+    arg.cache = "cycle"
+    session.parameters["myparam"] = arg
+    for i in range(3):
+        FuncTask(func_x_with_arg, execution=execution, name=f"task {i}", start_cond="true")
+
+    session.config.shut_cond = SchedulerCycles() >= 2
+    session.start()
+    for task in session.tasks:
+        assert task.status == "success"
+    # Computed once per cycle
+    assert get_x_counted.calls == 2
+
+def test_cache_ttl(session, get_x_counted):
+    arg = FuncArg(get_x_counted)
+    arg.cache = 60
+    assert arg.get_value() == "x"
+    assert arg.get_value() == "x"
+    assert get_x_counted.calls == 1
+
+    arg.cache = 0
+    arg.get_value()
+    arg.get_value()
+    assert get_x_counted.calls == 3
+
+    with pytest.raises(ValueError):
+        arg.cache = "always"
+
+def get_slow():
+    time.sleep(0.2)
+    return "x"
+
+def test_concurrent(session):
+    session.config.materialize_workers = 4
+    task = FuncTask(func_x_with_arg, execution="main", name="a task")
+    params = parameters.Parameters(a=FuncArg(get_slow), b=FuncArg(get_slow), c=Arg("c"), d="x")
+    session.parameters["c"] = "x"
+
+    start = time.perf_counter()
+    durations = {}
+    assert params.materialize(task=task, durations=durations) == {"a": "x", "b": "x", "c": "x", "d": "x"}
+    assert time.perf_counter() - start < 0.35
+    assert set(durations) == {"a", "b", "c"}
+    assert durations["a"] >= 0.2 and durations["b"] >= 0.2
+
+    # The pool is reused
+    pool = session._get_materialize_pool()
+    params.materialize(task=task)
+    assert session._get_materialize_pool() is pool
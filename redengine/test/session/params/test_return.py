@@ -82,4 +82,79 @@ def test_default(session, execution):
     session.config.shut_cond = TaskStarted(task="a task") >= 1
     session.start()
 
-    assert "success" == task.status
\ No newline at end of file
+    assert "success" == task.status
+
+
+def func_array_with_return():
+    import numpy as np
+    return np.arange(1000)
+
+def func_array_with_arg(myparam):
+    import numpy as np
+    assert isinstance(myparam, np.ndarray)
+    assert (myparam == np.arange(1000)).all()
+
+def test_shared_memory(session):
+    from redengine.core.utils.shared import SharedValue
+    from redengine.args.builtin import SharedArg
+    import numpy as np
+    session.config.shared_memory_threshold = 100
+
+    task_return = FuncTask(
+        func_array_with_return, 
+        name="return task",
+        start_cond="~has started",
+        execution="process",
+        force_run=True
+    )
+    task = FuncTask(
+        func_array_with_arg, 
+        name="a task",
+        start_cond="after task 'return task'",
+        parameters={"myparam": Return('return task')},
+        execution="process"
+    )
+    session.config.shut_cond = TaskStarted(task="a task") >= 1
+    session.start()
+
+    assert "success" == task_return.status
+    assert "success" == task.status
+
+    # Only the handle was passed from the child
+    assert isinstance(session.returns._get_raw(task_return), SharedValue)
+    assert isinstance(Return('return task').stage(task=task), SharedArg)
+    assert (session.returns[task_return] == np.arange(1000)).all()
+    value = Return('return task').get_value(task=task)
+    assert (value == np.arange(1000)).all()
+
+def test_shared_value():
+    import os
+    import pickle
+    import numpy as np
+    import pandas as pd
+    from redengine.core.utils.shared import SharedValue, share_value
+
+    assert share_value(np.arange(10), threshold=None) is not None
+    assert not isinstance(share_value(np.arange(10), threshold=1000), SharedValue)
+    assert not isinstance(share_value({"a": 1}, threshold=0), SharedValue)
+
+    df = pd.DataFrame({"a": np.arange(1000), "b": ["x"] * 1000})
+    shared = share_value(df, threshold=1000)
+    assert isinstance(shared, SharedValue)
+    shared.own()
+    assert shared.load().equals(df)
+
+    # Copies do not remove the file
+    copy = pickle.loads(pickle.dumps(shared))
+    del copy
+    assert os.path.exists(shared.path)
+
+    shared = SharedValue.create(np.arange(1000))
+    shared.own()
+    arr = shared.load()
+    arr[0] = 5 # Copy-on-write
+    assert shared.load()[0] == 0
+
+    shared.release()
+    assert not os.path.exists(shared.path)
+    assert arr[1] == 1
@@ -0,0 +1,86 @@
+import gc
+import os
+
+import numpy as np
+import pytest
+
+from redengine.args import Shared
+from redengine.args.builtin import SharedArg, SimpleArg
+from redengine.conditions import TaskStarted
+from redengine.core import Parameters
+from redengine.tasks import FuncTask
+
+def func_with_lookup(lookup):
+    assert (lookup == np.arange(1000)).all()
+
+@pytest.mark.parametrize("execution", ["main", "thread", "process"])
+def test_shared_arg(session, execution):
+    session.parameters["lookup"] = Shared(np.arange(1000))
+    task = FuncTask(func_with_lookup, name="a task", execution=execution, force_run=True)
+
+    session.config.shut_cond = TaskStarted(task="a task") >= 1
+    session.start()
+    assert task.status == "success"
+
+def test_stage():
+    arg = Shared(np.arange(1000))
+    staged = arg.stage()
+    assert isinstance(staged, SharedArg)
+    assert arg.stage()._value is staged._value
+
+    value = staged.get_value()
+    assert not value.flags.writeable
+    assert (value == np.arange(1000)).all()
+
+    # New value is staged again
+    arg.value = np.arange(5)
+    assert (arg.stage().get_value() == np.arange(5)).all()
+
+def test_share():
+    big = np.ones(1000)
+    params = Parameters(big=big, small=np.ones(2), staged=SimpleArg(big), other="x")
+    shared_params = params.share(threshold=1000)
+    assert isinstance(shared_params._params["big"], SharedArg)
+    assert isinstance(shared_params._params["staged"], SharedArg)
+    assert shared_params._params["small"] is params._params["small"]
+    assert shared_params["other"] == "x"
+    assert (shared_params["big"] == big).all()
+
+    # Staged once per value
+    handle = shared_params._params["big"]._value
+    assert params.share(threshold=1000)._params["big"]._value is handle
+    path = handle.path
+
+    # Removed when the value is not used
+    del big, params, shared_params, handle
+    gc.collect()
+    assert not os.path.exists(path)
+
+def test_share_bytes():
+    params = Parameters(data=b"x" * 1000)
+    handle = params.share(threshold=1000)._params["data"]._value
+    # Staged once per content
+    assert Parameters(data=b"x" * 1000).share(threshold=1000)._params["data"]._value is handle
+    assert Parameters(data=b"y" * 1000).share(threshold=1000)._params["data"]._value is not handle
+
+    path = handle.path
+    del handle
+    gc.collect()
+    assert not os.path.exists(path)
+
+def func_read_only(data, lookup):
+    assert data == b"x" * 1000
+    assert not lookup.flags.writeable
+
+def test_process_staged(session):
+    session.config.shared_memory_threshold = 1000
+    task = FuncTask(
+        func_read_only, name="a task", execution="process", force_run=True,
+        parameters={"data": b"x" * 1000, "lookup": np.arange(1000)}
+    )
+    session.config.shut_cond = TaskStarted(task="a task") >= 1
+    session.start()
+    assert task.status == "success"
+    # Kept till the next launch
+    assert len(task._staged) == 2
+    assert all(os.path.exists(handle.path) for handle in task._staged)
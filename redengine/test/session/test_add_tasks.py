@@ -0,0 +1,104 @@
+import pytest
+
+from redengine.conditions import TaskExecutable
+from redengine.parse._condition import parse_condition_string
+from redengine.tasks import FuncTask, CommandTask
+
+def do_things():
+    ...
+
+def test_add_tasks(session):
+    tasks = session.add_tasks([
+        {"func": do_things, "name": "task 1", "start_cond": "daily", "execution": "main"},
+        {"func": do_things, "name": "task 2", "start_cond": "daily", "execution": "main"},
+        {"command": "echo hello", "name": "task 3", "task_class": CommandTask},
+    ])
+    assert [task.name for task in tasks] == ["task 1", "task 2", "task 3"]
+    assert session.tasks == set(tasks)
+    assert isinstance(session["task 1"], FuncTask)
+    assert isinstance(session["task 3"], CommandTask)
+
+    # The conditions are parsed once but not shared between the tasks
+    cond1, cond2 = session["task 1"].start_cond, session["task 2"].start_cond
+    assert cond1.period == cond2.period
+    assert cond1 is not cond2
+    assert isinstance(cond1, TaskExecutable)
+    assert session._parse_cache is None
+
+@pytest.mark.parametrize("names", [
+    pytest.param(["task 1", "task 1"], id="duplicate in batch"),
+    pytest.param(["task 2", "existing"], id="duplicate in session"),
+])
+def test_add_tasks_duplicate(session, names):
+    existing = FuncTask(do_things, name="existing", execution="main")
+    with pytest.raises(KeyError):
+        session.add_tasks([{"func": do_things, "name": name, "execution": "main"} for name in names])
+    assert session.tasks == {existing}
+
+def test_add_tasks_rollback(session):
+    with pytest.raises(Exception):
+        session.add_tasks([
+            {"func": do_things, "name": "task 1", "execution": "main"},
+            {"func": do_things, "name": "task 2", "start_cond": "not a condition", "execution": "main"},
+        ])
+    assert session.tasks == set()
+
+def test_add_tasks_replace(session):
+    session.config.task_pre_exist = "replace"
+    existing = FuncTask(do_things, name="task 1", execution="main")
+    other = FuncTask(do_things, name="other", execution="main")
+    tasks = session.add_tasks([
+        {"func": do_things, "name": "task 1", "execution": "main"},
+        {"func": do_things, "name": "task 2", "execution": "main"},
+    ])
+    assert session.tasks == {other, *tasks}
+    assert session["task 1"] is tasks[0]
+    assert session["task 1"] is not existing
+
+def test_add_tasks_replace_rollback(session):
+    session.config.task_pre_exist = "replace"
+    existing = FuncTask(do_things, name="task 1", execution="main")
+    with pytest.raises(Exception):
+        session.add_tasks([
+            {"func": do_things, "name": "task 1", "execution": "main"},
+            {"func": do_things, "name": "task 2", "start_cond": "not a condition", "execution": "main"},
+        ])
+    assert session.tasks == {existing}
+    assert session["task 1"] is existing
+
+def test_add_tasks_ignore(session):
+    session.config.task_pre_exist = "ignore"
+    existing = FuncTask(do_things, name="existing", execution="main")
+    session.add_tasks([
+        {"func": do_things, "name": "existing", "execution": "main"},
+        {"func": do_things, "name": "task", "execution": "main"},
+        {"func": do_things, "name": "task", "execution": "main"},
+    ])
+    assert sorted(task.name for task in session.tasks) == ["existing", "task"]
+    assert session["existing"] is existing
+
+def test_add_tasks_unsupported(session):
+    session.config.task_pre_exist = "rename"
+    existing = FuncTask(do_things, name="existing", execution="main")
+    with pytest.raises(ValueError):
+        session.add_tasks([{"func": do_things, "name": "existing", "execution": "main"}])
+    assert session.tasks == {existing}
+
+def test_add_tasks_parse_once(session, monkeypatch):
+    parsed = []
+    orig = parse_condition_string
+    def parse(s, **kwargs):
+        parsed.append(s)
+        return orig(s, **kwargs)
+    monkeypatch.setattr("redengine.parse.condition.parse_condition_string", parse)
+    session.add_tasks([
+        {"func": do_things, "name": f"task {i}", "start_cond": "daily", "end_cond": "true", "execution": "main"}
+        for i in range(5)
+    ])
+    assert parsed == ["daily", "true"]
+
+def test_rename(session):
+    task = FuncTask(do_things, name="old", execution="main")
+    task.name = "new"
+    assert session["new"] is task
+    assert not session.task_exists("old")
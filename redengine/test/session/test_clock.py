@@ -0,0 +1,69 @@
+import pickle
+import threading
+import time
+
+import pandas as pd
+
+from redengine.conditions import FuncCond
+from redengine.core.clock import Clock
+from redengine.tasks import FuncTask
+
+def test_freeze():
+    clock = Clock()
+    assert not clock.is_frozen
+    with clock.frozen():
+        assert clock.is_frozen
+        now = clock.now()
+        time.sleep(0.001)
+        assert clock.now() is now
+        assert abs(clock.time() - now.timestamp()) < 1e-6
+        assert clock.timestamp() == pd.Timestamp(now)
+        assert clock.timestamp() is clock.timestamp()
+
+        # Other threads see the actual time
+        results = []
+        thread = threading.Thread(target=lambda: results.append(clock.now()))
+        thread.start()
+        thread.join()
+        assert results[0] > now
+
+        with clock.unfrozen():
+            assert not clock.is_frozen
+            assert clock.now() > now
+        # Frozen again to new time
+        assert clock.is_frozen
+        assert clock.now() > now
+
+        # Frozen state is not passed to child processes
+        assert not pickle.loads(pickle.dumps(clock)).is_frozen
+    assert not clock.is_frozen
+    assert clock.now() > now
+
+def test_scheduler_cycle(session):
+    times = []
+    def check_time():
+        times.append(session.clock.now())
+        return False
+
+    for i in range(3):
+        FuncTask(lambda: None, name=f"task {i}", start_cond=FuncCond(check_time), execution="main")
+
+    session.config.shut_cond = FuncCond(lambda: len(times) >= 3)
+    session.start()
+    assert len(set(times)) == 1
+    assert not session.clock.is_frozen
+
+def test_scheduler_cycle_not_frozen(session):
+    times = []
+    def check_time():
+        times.append(session.clock.now())
+        time.sleep(0.001)
+        return False
+
+    for i in range(3):
+        FuncTask(lambda: None, name=f"task {i}", start_cond=FuncCond(check_time), execution="main")
+
+    session.config.freeze_time = False
+    session.config.shut_cond = FuncCond(lambda: len(times) >= 3)
+    session.start()
+    assert len(set(times)) == 3
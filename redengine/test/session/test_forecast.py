@@ -0,0 +1,71 @@
+import datetime
+
+import pandas as pd
+
+from redengine.conditions import FuncCond
+from redengine.tasks import FuncTask
+
+def to_list(df, task):
+    return df.loc[df["task"] == task, "start"].tolist()
+
+def test_forecast_periods(session):
+    FuncTask(lambda: None, name="daily", start_cond="daily between 10:00 and 12:00", execution="main")
+    FuncTask(lambda: None, name="hourly", start_cond="hourly & time of day between 10:00 and 13:00", execution="main")
+    FuncTask(lambda: None, name="every", start_cond="every 6 hours", execution="main")
+    FuncTask(lambda: None, name="weekly", start_cond="weekly on Monday", execution="main")
+    FuncTask(lambda: None, name="disabled", start_cond="daily", execution="main", disabled=True)
+
+    df = session.forecast("2022-01-01 11:00", "2022-01-03 00:00")
+    assert list(df.columns) == ["task", "start", "status", "reason"]
+    assert (df["status"] == "predicted").all()
+    assert df["start"].is_monotonic_increasing
+    assert to_list(df, "daily") == [pd.Timestamp("2022-01-01 11:00"), pd.Timestamp("2022-01-02 10:00")]
+    assert to_list(df, "hourly") == [
+        pd.Timestamp("2022-01-01 11:00"), pd.Timestamp("2022-01-01 12:00"), pd.Timestamp("2022-01-01 13:00"),
+        pd.Timestamp("2022-01-02 10:00"), pd.Timestamp("2022-01-02 11:00"), pd.Timestamp("2022-01-02 12:00"), pd.Timestamp("2022-01-02 13:00"),
+    ]
+    assert to_list(df, "every") == list(pd.date_range("2022-01-01 11:00", "2022-01-03 00:00", freq="6h"))
+    assert to_list(df, "weekly") == [pd.Timestamp("2022-01-03 00:00")]
+    assert to_list(df, "disabled") == []
+
+def test_forecast_last_run(session):
+    task = FuncTask(lambda: None, name="daily", start_cond="daily", execution="main")
+    task.last_run = datetime.datetime(2022, 1, 1, 9, 0)
+    task = FuncTask(lambda: None, name="every", start_cond="every 2 hours", execution="main")
+    task.last_run = datetime.datetime(2022, 1, 1, 9, 30)
+
+    df = session.forecast("2022-01-01 10:00", "2022-01-02 14:00")
+    assert to_list(df, "daily") == [pd.Timestamp("2022-01-02 00:00")]
+    assert to_list(df, "every")[:2] == [pd.Timestamp("2022-01-01 11:30"), pd.Timestamp("2022-01-01 13:30")]
+
+def test_forecast_dependencies(session):
+    FuncTask(lambda: None, name="a", start_cond="daily after 10:00", execution="main")
+    FuncTask(lambda: None, name="b", start_cond="after task 'a'", execution="main")
+    FuncTask(lambda: None, name="c", start_cond="after task 'b' & time of day after 12:00", execution="main")
+    FuncTask(lambda: None, name="d", start_cond="after task 'a' failed", execution="main")
+
+    df = session.forecast("2022-01-01 00:00", "2022-01-02 23:00")
+    days = [pd.Timestamp("2022-01-01"), pd.Timestamp("2022-01-02")]
+    assert to_list(df, "a") == [day + pd.Timedelta("10:00:00") for day in days]
+    assert to_list(df, "b") == [day + pd.Timedelta("10:00:00") for day in days]
+    assert to_list(df, "c") == [day + pd.Timedelta("12:00:00") for day in days]
+    assert to_list(df, "d") == []
+
+def test_forecast_unknown(session):
+    FuncTask(lambda: None, name="func", start_cond=FuncCond(lambda: True) & FuncCond(lambda: False), execution="main")
+    FuncTask(lambda: None, name="depends unknown", start_cond="after task 'func'", execution="main")
+    FuncTask(lambda: None, name="loop a", start_cond="after task 'loop b'", execution="main")
+    FuncTask(lambda: None, name="loop b", start_cond="after task 'loop a'", execution="main")
+
+    df = session.forecast("2022-01-01 00:00", "2022-01-02 00:00")
+    assert len(df) == 4
+    assert (df["status"] == "unknown").all()
+    assert df["start"].isna().all()
+    assert df["reason"].notna().all()
+
+def test_forecast_continuous(session):
+    FuncTask(lambda: None, name="during", start_cond="time of day between 10:00 and 12:00", execution="main")
+
+    df = session.forecast("2022-01-01 00:00", "2022-01-03 00:00")
+    assert to_list(df, "during") == [pd.Timestamp("2022-01-01 10:00"), pd.Timestamp("2022-01-02 10:00")]
+    assert (df["status"] == "continuous").all()
@@ -0,0 +1,124 @@
+import re
+import time
+
+import pytest
+
+from redengine import Session
+from redengine.parse import parse_condition, parse_time
+from redengine.parse import _condition, _time
+from redengine.parse.utils import ParseCache
+from redengine.conditions import FuncCond, TaskExecutable, TaskCond, IsPeriod, All, SchedulerCycles
+from redengine.tasks import FuncTask
+from redengine.time import TimeOfDay
+
+def is_foo(place):
+    return True
+
+def do_nothing():
+    pass
+
+def create_tasks(session):
+    return [
+        FuncTask(do_nothing, name="daily", start_cond="daily & time of day between 10:00 and 12:00", execution="main", session=session),
+        FuncTask(do_nothing, name="hourly", start_cond="hourly", execution="main", session=session),
+    ]
+
+def test_cold_start(tmpdir, monkeypatch):
+    path = tmpdir / "parse_cache.pkl"
+    session = Session(config={"parse_cache": path, "shut_cond": SchedulerCycles() >= 1})
+    session.set_as_default()
+    tasks = create_tasks(session)
+    period = parse_time("time of day between 10:00 and 12:00")
+    session.start()
+    # Written by the scheduler
+    assert path.isfile()
+
+    # Parsing should be skipped
+    def fail(*args, **kwargs):
+        raise AssertionError("Parsed again")
+    monkeypatch.setattr("redengine.parse.condition.parse_condition_string", fail)
+    monkeypatch.setattr("redengine.parse.time.parse_time_string", fail)
+
+    session = Session(config={"parse_cache": path})
+    session.set_as_default()
+    cached_tasks = create_tasks(session)
+    for task, cached_task in zip(tasks, cached_tasks):
+        assert type(cached_task.start_cond) is type(task.start_cond)
+        assert str(cached_task.start_cond) == str(task.start_cond)
+    assert str(cached_tasks[0].start_cond) == "daily & time of day between 10:00 and 12:00"
+    assert cached_tasks[0].start_cond is not parse_condition("daily & time of day between 10:00 and 12:00")
+
+    assert parse_time("time of day between 10:00 and 12:00") == period
+
+def test_set_after_creation(tmpdir):
+    path = tmpdir / "parse_cache.pkl"
+    session = Session(config={"shut_cond": SchedulerCycles() >= 1})
+    session.set_as_default()
+    assert session._parse_cache is None
+
+    session.config.parse_cache = path
+    create_tasks(session)
+    session.start()
+    assert path.isfile()
+
+    session = Session(config={"parse_cache": path})
+    cache = session._parse_cache
+    assert cache.get("condition", "hourly", session.get_cond_parsers()) is not None
+
+def test_invalidate(tmpdir):
+    path = tmpdir / "parse_cache.pkl"
+    session = Session(config={"parse_cache": path})
+    session.set_as_default()
+    parse_condition("daily")
+    key = session._parse_cache._get_key("condition", "daily", session.get_cond_parsers())
+    session._parse_cache.save()
+
+    session = Session(config={"parse_cache": path})
+    session.set_as_default()
+    FuncCond(is_foo, syntax=re.compile(r"is foo at (?P<place>.+)"), session=session)
+    assert session._parse_cache._get_key("condition", "daily", session.get_cond_parsers()) != key
+
+    cond = parse_condition("is foo at home")
+    assert cond.kwargs == {"place": "home"}
+    session._parse_cache.save()
+    # Old results are kept until they are stale
+    assert set(session._parse_cache._entries) == {
+        key,
+        session._parse_cache._get_key("condition", "is foo at home", session.get_cond_parsers())
+    }
+
+def test_prune(tmpdir):
+    path = tmpdir / "parse_cache.pkl"
+    cache = ParseCache(path, max_age=60, max_entries=2)
+    parsers = {}
+    for s in ("a", "b", "c", "d"):
+        cache.set("condition", s, parsers, TimeOfDay("10:00", "12:00"))
+
+    # Stale
+    key = cache._get_key("condition", "a", parsers)
+    cache._entries[key] = (cache._entries[key][0], time.time() - 120)
+
+    cache.save()
+    assert set(cache._entries) == {cache._get_key("condition", s, parsers) for s in ("c", "d")}
+
+    cache = ParseCache(path)
+    cache.load()
+    assert cache.get("condition", "a", parsers) is None
+    assert cache.get("condition", "b", parsers) is None
+    assert cache.get("condition", "d", parsers) == TimeOfDay("10:00", "12:00")
+
+def test_lambda_parsers():
+    cache = ParseCache(None)
+    is_true, is_false = (lambda: True), (lambda: False)
+    assert cache.get_fingerprint({"is ok": is_true}) != cache.get_fingerprint({"is ok": is_false})
+    assert cache.get_fingerprint({"is ok": is_true}) == cache.get_fingerprint({"is ok": is_true})
+
+def test_not_cached(tmpdir):
+    path = tmpdir / "parse_cache.pkl"
+    session = Session(config={"parse_cache": path})
+    session.set_as_default()
+    cond = TaskCond(syntax="is bar", session=session)
+    cond(is_foo)
+    parse_condition("is bar & daily")
+    key = session._parse_cache._get_key("condition", "is bar & daily", session.get_cond_parsers())
+    assert key not in session._parse_cache._entries
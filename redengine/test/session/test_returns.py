@@ -0,0 +1,90 @@
+import numpy as np
+
+from redengine.args import Return
+from redengine.tasks import FuncTask
+from redengine.core.utils.shared import SharedValue
+
+def do_things():
+    ...
+
+def use_return(value=Return("task 0")):
+    ...
+
+def create_tasks(n):
+    return [FuncTask(do_things, name=f"task {i}", execution="main") for i in range(n)]
+
+def test_unbounded(session):
+    tasks = create_tasks(5)
+    for task in tasks:
+        task._handle_return(np.zeros(100))
+    assert len(session.returns) == 5
+    assert session.returns.metrics["size"] == 5 * 800
+    assert session.returns.metrics["evictions"] == 0
+
+def test_max_count(session):
+    session.config.returns_max_count = 2
+    tasks = create_tasks(4)
+    for i, task in enumerate(tasks):
+        task._handle_return(i)
+    assert dict(session.returns) == {tasks[2]: 2, tasks[3]: 3}
+    assert session.returns.metrics["evictions"] == 2
+
+    # Access updates recency
+    session.returns[tasks[2]]
+    tasks[0]._handle_return("new")
+    assert dict(session.returns) == {tasks[2]: 2, tasks[0]: "new"}
+
+def test_max_size_referenced(session):
+    session.config.returns_max_size = 2000
+    tasks = create_tasks(3)
+    # Task 0 is used by another task
+    FuncTask(use_return, name="user", execution="main")
+
+    for task in tasks:
+        task._handle_return(np.zeros(100))
+    assert set(session.returns) == {tasks[0], tasks[2]}
+    assert session.returns.metrics["size"] == 1600
+    assert session.returns.metrics["evictions"] == 1
+
+def test_spill(session, tmpdir):
+    session.config.returns_max_count = 1
+    session.config.returns_spill_dir = str(tmpdir)
+    tasks = create_tasks(2)
+    tasks[0]._handle_return(np.arange(100))
+    tasks[1]._handle_return({"a": 1})
+    assert session.returns.metrics == {
+        "count": 2, "count_in_memory": 1, "size": session.returns.metrics["size"],
+        "evictions": 1, "spills": 1, "reloads": 0,
+    }
+    assert len(tmpdir.listdir()) == 1
+
+    # Read back (and the other spilled)
+    assert (session.returns[tasks[0]] == np.arange(100)).all()
+    assert session.returns[tasks[1]] == {"a": 1}
+    metrics = session.returns.metrics
+    assert metrics["reloads"] == 2
+    assert metrics["spills"] == 3
+    assert len(tmpdir.listdir()) == 1
+
+    session.returns.clear()
+    import gc; gc.collect()
+    assert len(tmpdir.listdir()) == 0
+
+def test_shared(session, tmpdir):
+    session.config.returns_max_size = 1000
+    session.config.returns_spill_dir = str(tmpdir)
+    tasks = create_tasks(2)
+    shared = SharedValue.create(np.arange(100))
+    tasks[0]._handle_return(shared)
+
+    # The value is read from the shared memory
+    assert (session.returns[tasks[0]] == np.arange(100)).all()
+    assert (dict(session.returns)[tasks[0]] == np.arange(100)).all()
+    assert session.returns._get_raw(tasks[0]) is shared
+    assert session.returns.metrics["size"] == shared.nbytes
+
+    # Moved to the disk when over the budget
+    tasks[1]._handle_return(np.zeros(100))
+    assert session.returns.metrics["spills"] == 1
+    assert len(tmpdir.listdir()) == 1
+    assert (session.returns[tasks[0]] == np.arange(100)).all()
@@ -0,0 +1,113 @@
+import datetime
+
+import pandas as pd
+
+from redengine.core.clock import Clock, VirtualClock
+from redengine.conditions import FuncCond
+from redengine.tasks import FuncTask
+
+def to_list(df, task, column="start"):
+    return df.loc[df["task"] == task, column].tolist()
+
+def do_nothing():
+    ...
+
+def test_virtual_clock():
+    clock = VirtualClock("2022-01-01 10:00")
+    assert clock.now() == datetime.datetime(2022, 1, 1, 10, 0)
+    assert clock.time() == datetime.datetime(2022, 1, 1, 10, 0).timestamp()
+
+    clock.sleep(60)
+    assert clock.now() == datetime.datetime(2022, 1, 1, 10, 1)
+    clock.advance(datetime.timedelta(hours=1))
+    assert clock.now() == datetime.datetime(2022, 1, 1, 11, 1)
+    clock.set("2022-01-02")
+    assert clock.now() == datetime.datetime(2022, 1, 2)
+
+def test_simulate(session):
+    FuncTask(do_nothing, name="daily", start_cond="daily between 10:00 and 12:00", execution="process")
+    FuncTask(do_nothing, name="after", start_cond="after task 'daily'", execution="process")
+    FuncTask(do_nothing, name="main", start_cond="hourly & time of day between 10:00 and 11:30", execution="main", priority=1)
+
+    df = session.simulate(
+        "2022-01-01 00:00", "2022-01-03 00:00",
+        runtimes={"daily": 600, "main": "5 minutes"}
+    )
+    assert list(df.columns) == ["task", "start", "end", "action"]
+    assert (df["action"] == "success").all()
+
+    # Main task blocks the scheduler
+    assert to_list(df, "main") == [
+        pd.Timestamp("2022-01-01 10:00"), pd.Timestamp("2022-01-01 11:00"),
+        pd.Timestamp("2022-01-02 10:00"), pd.Timestamp("2022-01-02 11:00")
+    ]
+    assert to_list(df, "daily") == [pd.Timestamp("2022-01-01 10:05"), pd.Timestamp("2022-01-02 10:05")]
+    assert to_list(df, "daily", "end") == [pd.Timestamp("2022-01-01 10:15"), pd.Timestamp("2022-01-02 10:15")]
+    assert to_list(df, "after") == [pd.Timestamp("2022-01-01 10:15"), pd.Timestamp("2022-01-02 10:15")]
+
+    # The real clock and logs are left intact
+    assert isinstance(session.clock, Clock) and not isinstance(session.clock, VirtualClock)
+    assert session["daily"].last_success is None
+    assert list(session["daily"].logger.get_records()) == []
+
+def test_simulate_every(session):
+    FuncTask(do_nothing, name="every", start_cond="every 2 hours", execution="process")
+
+    df = session.simulate("2022-01-01 00:00", "2022-01-01 06:00", runtimes={"every": 600})
+    # Measured from the finish
+    assert to_list(df, "every") == [
+        pd.Timestamp("2022-01-01 00:00"),
+        pd.Timestamp("2022-01-01 02:10:00.000001"),
+        pd.Timestamp("2022-01-01 04:20:00.000002")
+    ]
+
+def test_simulate_capacity(session):
+    session.config.max_process_count = 0 # Allows one process
+    FuncTask(do_nothing, name="a", start_cond="daily", execution="process", priority=2)
+    FuncTask(do_nothing, name="b", start_cond="daily", execution="process", priority=1)
+
+    df = session.simulate("2022-01-01 00:00", "2022-01-01 23:00", runtimes={"a": 1200, "b": 1200})
+    assert to_list(df, "a") == [pd.Timestamp("2022-01-01 00:00")]
+    assert to_list(df, "b") == [pd.Timestamp("2022-01-01 00:20")]
+
+def test_simulate_timeout(session):
+    session.config.timeout = datetime.timedelta(minutes=10)
+    FuncTask(do_nothing, name="slow", start_cond="daily", execution="process")
+
+    df = session.simulate("2022-01-01 00:00", "2022-01-01 23:00", runtimes={"slow": 3600})
+    assert to_list(df, "slow", "action") == ["terminate"]
+    assert to_list(df, "slow", "end") == [pd.Timestamp("2022-01-01 00:10")]
+
+def test_simulate_history(session):
+    task = FuncTask(do_nothing, name="task", start_cond="hourly", execution="process")
+    for _ in range(3):
+        task.log_running()
+        task.log_failure()
+
+    df = session.simulate("2022-01-01 00:00", "2022-01-01 02:59")
+    assert to_list(df, "task") == [
+        pd.Timestamp("2022-01-01 00:00"), pd.Timestamp("2022-01-01 01:00"), pd.Timestamp("2022-01-01 02:00")
+    ]
+    assert to_list(df, "task", "action") == ["fail", "fail", "fail"]
+
+def test_simulate_isolated(session):
+    task = FuncTask(do_nothing, name="task", start_cond="hourly", execution="process")
+    task.log_running()
+    task.log_success()
+    records = [record.dict() for record in task.logger.get_records()]
+    state = {"status": task.status, "last_run": task.last_run, "last_success": task.last_success}
+
+    df = session.simulate("2022-01-01 00:00", "2022-01-01 02:59", runtimes={"task": 60})
+    assert len(to_list(df, "task")) == 3
+
+    assert [record.dict() for record in task.logger.get_records()] == records
+    assert {"status": task.status, "last_run": task.last_run, "last_success": task.last_success} == state
+    assert task.status == "success"
+
+def test_simulate_unknown(session):
+    FuncTask(do_nothing, name="func", start_cond=FuncCond(lambda: True), execution="main")
+
+    df = session.simulate("2022-01-01 00:00", "2022-01-01 00:10", runtimes={"func": 60}, step=datetime.timedelta(minutes=5))
+    assert to_list(df, "func") == [
+        pd.Timestamp("2022-01-01 00:00"), pd.Timestamp("2022-01-01 00:06")
+    ]
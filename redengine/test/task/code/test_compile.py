@@ -0,0 +1,64 @@
+import pickle
+from types import CodeType
+
+import pytest
+
+from redengine.tasks import CodeTask
+from redengine.conditions import TaskStarted
+
+def test_compile_once(session):
+    task = CodeTask(code="return_value = x * 2", name="mytask", execution="main", parameters={"x": 2})
+    task()
+    code, setup = task.get_compiled()
+    assert isinstance(code, CodeType)
+    assert setup is None
+
+    task()
+    assert task.get_compiled()[0] is code
+    assert session.returns[task] == 4
+
+    # Changing the code invalidates
+    task.code = "return_value = x * 3"
+    assert task.get_compiled()[0] is not code
+    task()
+    assert session.returns[task] == 6
+
+@pytest.mark.parametrize("persistent,expected", [
+    pytest.param(True, [0, 1, 2], id="persistent"),
+    pytest.param(False, [0, 0, 0], id="not persistent"),
+])
+def test_namespace(session, persistent, expected):
+    task = CodeTask(
+        code="return_value = next(counter)", setup="import itertools\ncounter = itertools.count()",
+        name="mytask", execution="main", persistent=persistent
+    )
+    values = []
+    for _ in range(3):
+        task()
+        values.append(session.returns[task])
+    assert values == expected
+
+    # Changing the setup resets the namespace
+    task.setup = "counter = iter([10])"
+    task()
+    assert session.returns[task] == 10
+
+def test_pickle(session):
+    task = CodeTask(code="return_value = 'myvalue'", setup="import os", name="mytask", execution="process")
+    pick_task = pickle.loads(pickle.dumps(task))
+
+    # Not compiled again
+    (sources, (code, setup)) = pick_task._compiled
+    assert sources == ("return_value = 'myvalue'", "import os")
+    assert isinstance(code, CodeType) and isinstance(setup, CodeType)
+    assert pick_task.get_compiled() == (code, setup)
+    assert pick_task.execute() == "myvalue"
+
+@pytest.mark.parametrize('execution', ['main', 'thread', 'process'])
+def test_syntax_error(session, execution):
+    task = CodeTask(code="return_value = (", name="mytask", execution=execution)
+    task.force_run = True
+
+    session.config.shut_cond = TaskStarted(task='mytask') >= 1
+    session.start()
+    assert task.status == 'fail'
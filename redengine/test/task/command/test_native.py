@@ -0,0 +1,70 @@
+import datetime
+import logging
+import os
+import platform
+
+import pytest
+
+from redbird.logging import RepoHandler
+from redbird.repos import MemoryRepo
+
+from redengine.log.log_record import LogRecord
+from redengine.conditions import AlwaysTrue, SchedulerStarted, TaskStarted
+from redengine.time import TimeDelta
+from redengine.tasks import CommandTask
+
+from task_helpers import wait_till_task_finish
+
+pytestmark = pytest.mark.skipif(platform.system() == "Windows", reason="Uses POSIX shell commands")
+
+def test_success(session):
+    task = CommandTask(command="echo $$", shell=True, name="a task", execution="process", native=True)
+
+    task()
+    wait_till_task_finish(task)
+
+    assert "success" == task.status
+    pid = task._process.pid
+    # The command itself is the process
+    assert int(session.returns[task]) == pid
+    assert pid != os.getpid()
+    assert 0 == task._process.exitcode
+
+def test_fail(session):
+    task_logger = logging.getLogger(session.config.task_logger_basename)
+    task_logger.handlers = [
+        RepoHandler(repo=MemoryRepo(model=LogRecord))
+    ]
+    task = CommandTask(command="echo oops >&2; exit 3", shell=True, name="a task", execution="process", native=True)
+
+    task()
+    wait_till_task_finish(task)
+
+    assert "fail" == task.status
+    records = list(map(lambda e: e.dict(exclude={'created'}), session.get_task_log()))
+    assert ["run", "fail"] == [rec["action"] for rec in records]
+    assert records[-1]["exc_text"].strip().endswith("OSError: Failed running command (3): \noops")
+
+def test_timeout(session):
+    task = CommandTask(command=["sleep", "10"], name="slow task", start_cond=AlwaysTrue(), execution="process", native=True)
+
+    session.config.shut_cond = (TaskStarted(task="slow task") >= 2) | ~SchedulerStarted(period=TimeDelta("5 seconds"))
+    session.config.timeout = 0.1
+    start = datetime.datetime.now()
+    session.start()
+
+    assert datetime.datetime.now() - start < datetime.timedelta(seconds=5)
+    logger = task.logger
+    assert 2 == logger.filter_by(action="run").count()
+    assert 2 == logger.filter_by(action="terminate").count()
+    assert 0 == logger.filter_by(action="fail").count()
+    assert task._process.exitcode < 0
+
+def test_terminate_before_start(session):
+    task = CommandTask(command=["sleep", "10"], name="slow task", execution="process", native=True)
+    task()
+    session.scheduler.terminate_task(task, reason="test")
+
+    assert not task.is_alive()
+    assert "terminate" == task.status
+    assert 1 == task.logger.filter_by(action="terminate").count()
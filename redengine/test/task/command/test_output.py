@@ -0,0 +1,74 @@
+import logging
+import platform
+import sys
+
+import pytest
+
+from redengine.tasks import CommandTask
+from redengine.tasks.command import _Tail
+
+is_windows = platform.system() == "Windows"
+
+def print_lines(n, stream="stdout"):
+    return [sys.executable, "-c", f"import sys\nfor i in range({n}): print('line', i, file=sys.{stream})"]
+
+@pytest.mark.skipif(is_windows, reason="Line endings differ")
+def test_tail(session):
+    task = CommandTask(command=print_lines(1000), name="a task", execution="main", output_tail=18)
+    task()
+    assert "success" == task.status
+    assert session.returns[task] == b"line 998\nline 999\n"
+
+@pytest.mark.skipif(is_windows, reason="Line endings differ")
+def test_tail_error(session):
+    cmd = print_lines(1000, stream="stderr")
+    cmd[-1] += "\nsys.exit(1)"
+    task = CommandTask(command=cmd, name="a task", execution="main", output_tail=9)
+    with pytest.raises(OSError) as exc:
+        task.execute()
+    assert str(exc.value) == "Failed running command (1): \nline 999\n"
+
+def test_text_mode(session):
+    task = CommandTask(command=print_lines(3), name="a task", execution="main", kwds_popen={"text": True})
+    task()
+    assert session.returns[task] == "line 0\nline 1\nline 2\n"
+
+def test_log(session, caplog):
+    task = CommandTask(command=print_lines(10), name="a task", execution="main", output_level="INFO", output_sample=3)
+    with caplog.at_level(logging.INFO, logger="redengine.command"):
+        task()
+    records = [rec for rec in caplog.records if rec.name == "redengine.command"]
+    assert ["line 0", "line 3", "line 6", "line 9"] == [rec.getMessage() for rec in records]
+    assert all(rec.task_name == "a task" and rec.stream == "stdout" for rec in records)
+    assert all(rec.levelno == logging.INFO for rec in records)
+
+def test_file(session, tmpdir):
+    file = tmpdir.join("output.log")
+    task = CommandTask(
+        command=print_lines(100), name="a task", execution="main", 
+        output_file=str(file), output_file_max_bytes=200, output_file_backups=2, output_tail=0
+    )
+    task()
+    assert session.returns[task] == b""
+    assert file.read().replace("\r", "").endswith("line 99\n")
+    assert tmpdir.join("output.log.1").exists()
+    assert tmpdir.join("output.log.2").exists()
+    assert not tmpdir.join("output.log.3").exists()
+
+def test_timeout(session):
+    task = CommandTask(command=[sys.executable, "-c", "import time; print('started', flush=True); time.sleep(10)"], name="a task", execution="main", timeout=0.2)
+    task()
+    assert "fail" == task.status
+
+@pytest.mark.parametrize("max_size,chunks,expected", [
+    pytest.param(None, [b"ab", b"cd"], b"abcd", id="unlimited"),
+    pytest.param(3, [b"ab", b"cd"], b"bcd", id="partial chunk"),
+    pytest.param(4, [b"ab", b"cd", b"ef"], b"cdef", id="whole chunks"),
+    pytest.param(0, [b"ab"], b"", id="empty"),
+])
+def test_tail_buffer(max_size, chunks, expected):
+    tail = _Tail(max_size)
+    for chunk in chunks:
+        tail.append(chunk)
+    assert tail.get(b"") == expected
+    assert tail.size == len(expected)
@@ -0,0 +1,107 @@
+import sys
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from redengine.tasks import discover_tasks
+from redengine.tasks.func import get_module
+
+def test_discover(tmpdir, session):
+    task_dir = tmpdir.mkdir("mytasks")
+    task_dir.join("myfile.py").write(dedent("""
+    from redengine.tasks import FuncTask
+    import redengine
+
+    raise RuntimeError("Should not be imported")
+
+    @FuncTask(name="my task", start_cond="daily", execution="main")
+    def myfunc():
+        ...
+
+    @redengine.tasks.FuncTask(parameters={"x": 1})
+    def another():
+        ...
+
+    def not_task():
+        ...
+    """))
+    task_dir.mkdir("sub").join("other.py").write(dedent("""
+    @FuncTask(start_cond="hourly", execution="main", daemon=None)
+    def myfunc():
+        ...
+    """))
+
+    with tmpdir.as_cwd():
+        tasks = discover_tasks("mytasks", execution="thread")
+    assert [task.name for task in tasks] == ["my task", "mytasks.myfile:another", "mytasks.sub.other:myfunc"]
+    assert all(task.delayed for task in tasks)
+    assert session.tasks == set(tasks)
+
+    task = session["my task"]
+    assert task.func_name == "myfunc"
+    assert task.execution == "main"
+    assert str(task.start_cond) == "daily"
+    assert session["mytasks.myfile:another"].execution == "thread"
+    assert session["mytasks.myfile:another"].parameters.to_dict() == {"x": 1}
+
+def test_discover_non_literal(tmpdir, session):
+    tmpdir.join("myfile.py").write(dedent("""
+    from redengine.conditions import daily
+    @FuncTask(start_cond=daily)
+    def myfunc():
+        ...
+    """))
+    with pytest.warns(UserWarning):
+        tasks = discover_tasks(str(tmpdir))
+    assert tasks == []
+
+def test_run_discovered(tmpdir, session):
+    tmpdir.join("myfile.py").write(dedent("""
+    from redengine.tasks import FuncTask
+    import counter
+    counter.imports += 1
+
+    @FuncTask(name="my task", execution="main")
+    def myfunc():
+        counter.runs += 1
+    """))
+    tmpdir.join("counter.py").write("imports = 0\nruns = 0")
+
+    with tmpdir.as_cwd():
+        sys.path.insert(0, str(tmpdir))
+        try:
+            discover_tasks(".", pattern="myfile.py")
+            import counter
+            assert counter.imports == 0
+
+            task = session["my task"]
+            task()
+            task()
+            # The module is not executed again (and the decorator does not create a task)
+            assert counter.runs == 2
+            assert counter.imports == 1
+            assert session.tasks == {task}
+
+            # Modified file is imported again
+            tmpdir.join("myfile.py").write(tmpdir.join("myfile.py").read() + "\n")
+            task()
+            assert counter.imports == 2
+            assert counter.runs == 3
+        finally:
+            sys.path.remove(str(tmpdir))
+            sys.modules.pop("counter", None)
+
+def test_module_cache(tmpdir):
+    file = tmpdir.join("myfile.py")
+    file.write("value = 1")
+    path = Path(str(file))
+    module = get_module(path)
+    assert module.value == 1
+    assert get_module(path) is module
+    assert get_module(path, cache=False) is not module
+
+    file.write("value = 22")
+    module_2 = get_module(path)
+    assert module_2 is not module
+    assert module_2.value == 22
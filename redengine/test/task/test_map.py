@@ -0,0 +1,134 @@
+import logging
+import os
+import threading
+import time
+
+import pytest
+
+from redengine.args import Return
+from redengine.conditions import AlwaysTrue, TaskStarted, DependSuccess
+from redengine.exc import MapError
+from redengine.tasks import FuncTask
+
+from task_helpers import wait_till_task_finish
+
+def multiply(x, factor=1):
+    return x * factor
+
+def get_pid(x):
+    return os.getpid()
+
+def fail_on_two(x):
+    if x == 2:
+        raise ValueError("Oops")
+    return x
+
+def get_partitions():
+    return [{"x": i} for i in range(5)]
+
+@pytest.mark.parametrize("execution", ["main", "thread", "process"])
+def test_static(session, execution):
+    task = FuncTask(
+        multiply, name="mapped", execution=execution, 
+        map=[{"x": 1}, {"x": 2}, {"x": 3, "factor": 3}], parameters={"factor": 2}
+    )
+    task()
+    wait_till_task_finish(task)
+
+    assert task.status == "success"
+    assert session.returns[task] == [2, 4, 9]
+    assert 1 == task.logger.filter_by(action="run").count()
+    assert 1 == task.logger.filter_by(action="success").count()
+
+@pytest.mark.parametrize("execution", ["main", "thread", "process"])
+def test_from_return(session, execution):
+    upstream = FuncTask(get_partitions, name="upstream", start_cond=AlwaysTrue(), execution="main")
+    task = FuncTask(
+        multiply, name="mapped", execution=execution, parameters={"factor": 10},
+        map=Return("upstream"), start_cond=DependSuccess(depend_task="upstream")
+    )
+    session.config.shut_cond = TaskStarted(task="mapped") >= 1
+    session.start()
+
+    assert task.status == "success"
+    assert session.returns[task] == [0, 10, 20, 30, 40]
+
+def test_process_workers(session):
+    task = FuncTask(get_pid, name="mapped", execution="main", map=[{"x": i} for i in range(4)], map_execution="process", map_workers=2)
+    task()
+    assert task.status == "success"
+    pids = session.returns[task]
+    assert len(pids) == 4
+    assert os.getpid() not in pids
+    assert len(set(pids)) <= 2
+
+def test_process_in_process(session):
+    # Daemon processes cannot have children
+    assert session.config.tasks_as_daemon
+    task = FuncTask(get_pid, name="mapped", execution="process", map=[{"x": i} for i in range(3)], map_execution="process", map_workers=2)
+    task()
+    wait_till_task_finish(task)
+    assert task.status == "success"
+    pids = session.returns[task]
+    assert len(pids) == 3
+    assert os.getpid() not in pids
+
+def test_process_daemon(session):
+    with pytest.raises(ValueError):
+        FuncTask(get_pid, name="mapped", execution="process", map=[{"x": 1}], map_execution="process", daemon=True)
+
+def test_concurrency_cap(session):
+    lock = threading.Lock()
+    running = []
+    max_running = []
+
+    def run(x):
+        with lock:
+            running.append(x)
+            max_running.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(x)
+
+    task = FuncTask(run, name="mapped", execution="main", map=[{"x": i} for i in range(8)], map_workers=2)
+    task()
+    assert task.status == "success"
+    assert max(max_running) == 2
+
+def test_fail(session):
+    task = FuncTask(fail_on_two, name="mapped", execution="main", map=[{"x": i} for i in range(4)])
+    with pytest.raises(MapError) as exc:
+        task.execute_map(task.map)
+    assert list(exc.value.errors) == [2]
+    assert str(exc.value).startswith("1 of 4 map items failed:\n  item 2: ValueError('Oops')")
+
+    task()
+    assert task.status == "fail"
+    assert 1 == task.logger.filter_by(action="fail").count()
+
+def test_log_items(session, caplog):
+    task = FuncTask(fail_on_two, name="mapped", execution="main", map=[{"x": i} for i in range(4)])
+    with caplog.at_level(logging.INFO, logger="redengine.core.task"):
+        task()
+    messages = sorted(record.getMessage() for record in caplog.records if record.name == "redengine.core.task")
+    assert messages == [
+        "Task 'mapped' map item 0 of 4 finished",
+        "Task 'mapped' map item 1 of 4 finished",
+        "Task 'mapped' map item 2 of 4 failed: ValueError('Oops')",
+        "Task 'mapped' map item 3 of 4 finished",
+    ]
+
+def test_invalid_item(session):
+    task = FuncTask(multiply, name="mapped", execution="main", map=[1, 2])
+    with pytest.raises(TypeError):
+        task.execute_map(task.map)
+
+def test_terminate(session):
+    def run(x, _thread_terminate_):
+        _thread_terminate_.wait(0.2)
+
+    task = FuncTask(run, name="mapped", execution="thread", map=[{"x": i} for i in range(100)], map_workers=1)
+    task()
+    session.scheduler.terminate_task(task)
+    wait_till_task_finish(task)
+    assert task.status == "terminate"
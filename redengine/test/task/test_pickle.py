@@ -79,3 +79,41 @@ class TestFunc:
         pick_task = pickle_dump_read(task)
         
         assert pick_task.session is None
+
+def test_launch_payload(session):
+    task = FuncTask(func_on_main_level, execution="process", name="picklable")
+    assert task._payload is not None
+
+    task._mark_running = True
+    pickle_dump_read(task)
+    payload = task._payload
+    task.status = "run"
+    pick_task = pickle_dump_read(task)
+    # Not pickled again
+    assert task._payload is payload
+    assert pick_task.name == "picklable"
+    assert pick_task.status == "run"
+    assert pick_task.session is None
+    assert pick_task._get_clock() is not session.clock
+
+    # Modified task is pickled again
+    task.priority = 5
+    pick_task = pickle_dump_read(task)
+    assert task._payload is not payload
+    assert pick_task.priority == 5
+
+    # Modified in place
+    payload = task._payload
+    task.sys_paths.append("path/to/lib")
+    pick_task = pickle_dump_read(task)
+    assert task._payload is not payload
+    assert [str(path) for path in pick_task.sys_paths] == ["path/to/lib"]
+
+def test_launch_unpicklable(session):
+    def func_nested():
+        pass
+    with pytest.warns(UserWarning):
+        task = FuncTask(func_nested, execution="process", name="unpicklable")
+    task._mark_running = True
+    with pytest.raises(pickle.PicklingError):
+        pickle.dumps(task)
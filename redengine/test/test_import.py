@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import redengine
+
+# Import time of redengine (cumulative, seconds) that should not be exceeded.
+# Importing pandas and the conditions eagerly takes multiple times this.
+IMPORT_TIME_BUDGET = 0.5
+
+def run_python(*args) -> subprocess.CompletedProcess:
+    "Run Python in a fresh interpreter (nothing imported)"
+    env = os.environ.copy()
+    root = str(Path(redengine.__file__).parent.parent)
+    env["PYTHONPATH"] = os.pathsep.join([root, env.get("PYTHONPATH", "")])
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True, env=env)
+
+def test_import_is_lazy():
+    code = "import sys, json, redengine; redengine.session; print(json.dumps(sorted(sys.modules)))"
+    modules = json.loads(run_python("-c", code).stdout)
+    assert "redengine.session" in modules
+    for module in ("pandas", "redengine.conditions", "redengine.tasks", "redengine.time", "redengine.core.task", "redengine.core.time"):
+        assert module not in modules
+
+def test_import_core_time_is_lazy():
+    code = "import sys, json, redengine.core.time.anchor; print(json.dumps(sorted(sys.modules)))"
+    modules = json.loads(run_python("-c", code).stdout)
+    assert "redengine.core.time.anchor" in modules
+    assert "pandas" not in modules
+    assert "numpy" not in modules
+
+def test_import_time():
+    output = run_python("-X", "importtime", "-c", "import redengine").stderr
+    # Format: "import time: self [us] | cumulative | imported package"
+    times = {
+        line.split("|")[-1].strip(): int(line.split("|")[1])
+        for line in output.splitlines()
+        if line.startswith("import time:") and line.split("|")[1].strip().isdigit()
+    }
+    assert times["redengine"] / 1e6 < IMPORT_TIME_BUDGET
+
+def test_lazy_attributes():
+    code = (
+        "import redengine\n"
+        "from redengine import FuncTask, RedEngine, Scheduler\n"
+        "from redengine.parse import parse_condition\n"
+        "print(type(parse_condition('daily')).__name__, redengine.conditions.__name__, type(redengine.session.scheduler).__name__)"
+    )
+    assert run_python("-c", code).stdout.split() == ["TaskExecutable", "redengine.conditions", "Scheduler"]
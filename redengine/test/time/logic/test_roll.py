@@ -5,7 +5,7 @@ import pandas as pd
 from redengine.core.time.base import (
     All, Any
 )
-from redengine.time.interval import TimeOfDay
+from redengine.time.interval import TimeOfMinute, TimeOfDay, TimeOfWeek, TimeOfMonth
 
 @pytest.mark.parametrize(
     "dt,periods,roll_start,roll_end",
@@ -93,4 +93,153 @@ def test_rollback_any(dt, periods, roll_start, roll_end):
 
     interval = time.rollback(dt)
     assert roll_start == interval.left
-    assert roll_end == interval.right
\ No newline at end of file
+    assert roll_end == interval.right
+
+@pytest.mark.parametrize(
+    "dt,periods,roll_start,roll_end",
+    [
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfWeek("Mon", time_point=True),
+                TimeOfMonth("13th", time_point=True),
+            ],
+            pd.Timestamp("2020-01-13 00:00:00"), pd.Timestamp("2020-01-13 23:59:59.999999999"),
+            id="Sparse"),
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfMinute("10", "11"),
+                TimeOfDay("10:00", "10:01"),
+                TimeOfWeek("Fri", time_point=True),
+                TimeOfMonth("13th", time_point=True),
+            ],
+            pd.Timestamp("2020-03-13 10:00:10"), pd.Timestamp("2020-03-13 10:00:11"),
+            id="Very sparse"),
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfDay("10:00", "11:00"),
+                TimeOfDay("12:00", "13:00"),
+            ],
+            pd.Timestamp.max, pd.Timestamp.max,
+            id="Never"),
+    ],
+)
+def test_rollforward_all_sparse(dt, periods, roll_start, roll_end):
+    time = All(*periods)
+
+    interval = time.rollforward(dt)
+    assert roll_start == interval.left
+    assert roll_end == interval.right
+
+@pytest.mark.parametrize(
+    "dt,periods,roll_start,roll_end",
+    [
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfWeek("Fri", time_point=True),
+                TimeOfMonth("13th", time_point=True),
+            ],
+            pd.Timestamp("2019-12-13 00:00:00"), pd.Timestamp("2019-12-13 23:59:59.999999999"),
+            id="Sparse"),
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfMinute("10", "11"),
+                TimeOfDay("10:00", "10:01"),
+                TimeOfWeek("Mon", time_point=True),
+                TimeOfMonth("13th", time_point=True),
+            ],
+            pd.Timestamp("2019-05-13 10:00:10"), pd.Timestamp("2019-05-13 10:00:11"),
+            id="Very sparse"),
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfDay("10:00", "11:00"),
+                TimeOfDay("12:00", "13:00"),
+            ],
+            pd.Timestamp.min, pd.Timestamp.min,
+            id="Never"),
+    ],
+)
+def test_rollback_all_sparse(dt, periods, roll_start, roll_end):
+    time = All(*periods)
+
+    interval = time.rollback(dt)
+    assert roll_start == interval.left
+    assert roll_end == interval.right
+
+@pytest.mark.parametrize(
+    "dt,periods,roll_start,roll_end",
+    [
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfDay("08:00", "09:00"),
+                TimeOfDay("10:00", "11:00"),
+            ],
+            pd.Timestamp("2020-01-01 08:00:00"), pd.Timestamp("2020-01-01 09:00:00"),
+            id="Disjoint"),
+        pytest.param(
+            pd.Timestamp("2020-01-01 07:00:00"),
+            [
+                TimeOfDay("08:00", "09:00"),
+                TimeOfDay("09:00", "10:00"),
+                TimeOfDay("10:00", "11:00"),
+            ],
+            pd.Timestamp("2020-01-01 08:00:00"), pd.Timestamp("2020-01-01 11:00:00"),
+            id="Chained"),
+    ],
+)
+def test_rollforward_any_sweep(dt, periods, roll_start, roll_end):
+    time = Any(*periods)
+
+    interval = time.rollforward(dt)
+    assert roll_start == interval.left
+    assert roll_end == interval.right
+
+@pytest.mark.parametrize(
+    "dt,periods,roll_start,roll_end",
+    [
+        pytest.param(
+            pd.Timestamp("2020-01-01 12:00:00"),
+            [
+                TimeOfDay("08:00", "09:00"),
+                TimeOfDay("10:00", "11:00"),
+            ],
+            pd.Timestamp("2020-01-01 10:00:00"), pd.Timestamp("2020-01-01 11:00:00"),
+            id="Disjoint"),
+        pytest.param(
+            pd.Timestamp("2020-01-01 12:00:00"),
+            [
+                TimeOfDay("08:00", "09:00"),
+                TimeOfDay("09:00", "10:00"),
+                TimeOfDay("10:00", "11:00"),
+            ],
+            pd.Timestamp("2020-01-01 08:00:00"), pd.Timestamp("2020-01-01 11:00:00"),
+            id="Chained"),
+    ],
+)
+def test_rollback_any_sweep(dt, periods, roll_start, roll_end):
+    time = Any(*periods)
+
+    interval = time.rollback(dt)
+    assert roll_start == interval.left
+    assert roll_end == interval.right
+
+def test_roll_nested_sparse():
+    # Used to recurse till RecursionError
+    time = All(
+        All(TimeOfMinute("10", "11"), TimeOfDay("10:00", "10:01")),
+        Any(All(TimeOfWeek("Fri", time_point=True), Any(TimeOfMonth("13th", time_point=True)))),
+    )
+
+    interval = time.rollforward(pd.Timestamp("2020-01-01 07:00:00"))
+    assert pd.Timestamp("2020-03-13 10:00:10") == interval.left
+    assert pd.Timestamp("2020-03-13 10:00:11") == interval.right
+
+    interval = time.rollback(pd.Timestamp("2020-06-01 07:00:00"))
+    assert pd.Timestamp("2020-03-13 10:00:10") == interval.left
+    assert pd.Timestamp("2020-03-13 10:00:11") == interval.right
@@ -0,0 +1,65 @@
+import pytest
+import pandas as pd
+
+from redengine.core.time import TimePeriod
+from redengine.time import Cron
+
+@pytest.mark.parametrize("expression,dt,expected", [
+    pytest.param("*/5 9-17 * * 1-5", "2024-01-08 09:05:30", True, id="in"),
+    pytest.param("*/5 9-17 * * 1-5", "2024-01-08 09:06:00", False, id="wrong minute"),
+    pytest.param("*/5 9-17 * * 1-5", "2024-01-08 18:00:00", False, id="wrong hour"),
+    pytest.param("*/5 9-17 * * 1-5", "2024-01-07 10:00:00", False, id="wrong weekday"),
+    pytest.param("0 12 * * sun", "2024-01-07 12:00:00", True, id="weekday name"),
+    pytest.param("0 12 * * 7", "2024-01-07 12:00:00", True, id="Sunday as 7"),
+    pytest.param("0 0 29 feb *", "2024-02-29 00:00:59", True, id="leap day"),
+    pytest.param("0 0 1,15 * 5", "2024-01-15 00:00", True, id="day of month or weekday (day)"),
+    pytest.param("0 0 1,15 * 5", "2024-01-05 00:00", True, id="day of month or weekday (weekday)"),
+    pytest.param("0 0 1,15 * 5", "2024-01-04 00:00", False, id="day of month or weekday (neither)"),
+    pytest.param("0 0 1 * *", "2024-01-05 00:00", False, id="only day of month"),
+    pytest.param("@hourly", "2024-01-05 13:00", True, id="macro"),
+])
+def test_contains(expression, dt, expected):
+    assert (pd.Timestamp(dt) in Cron(expression)) is expected
+
+def test_roll():
+    period = Cron("*/5 9-17 * * 1-5")
+    # Friday evening to Monday morning
+    assert period.rollforward(pd.Timestamp("2024-01-05 17:56")) == pd.Interval(
+        pd.Timestamp("2024-01-08 09:00"), pd.Timestamp("2024-01-08 09:00:59.999999999"), closed="both"
+    )
+    assert period.rollback(pd.Timestamp("2024-01-08 08:00")) == pd.Interval(
+        pd.Timestamp("2024-01-05 17:55"), pd.Timestamp("2024-01-05 17:55:59.999999999"), closed="both"
+    )
+    # In the period
+    assert period.rollforward(pd.Timestamp("2024-01-08 09:05:30")) == pd.Interval(
+        pd.Timestamp("2024-01-08 09:05:30"), pd.Timestamp("2024-01-08 09:05:59.999999999"), closed="both"
+    )
+    assert period.rollback(pd.Timestamp("2024-01-08 09:05:30")) == pd.Interval(
+        pd.Timestamp("2024-01-08 09:05"), pd.Timestamp("2024-01-08 09:05:30"), closed="both"
+    )
+    # Never
+    assert Cron("0 0 31 2 *").rollforward(pd.Timestamp("2024-01-01")).left == TimePeriod.max
+
+@pytest.mark.parametrize("expression", [
+    "*/5 9-17 * * 1-5", "0 0 29 2 *", "30 4 1,15 * fri", "5/20 * * * *", "0 12 * jan-mar sun",
+])
+def test_occurrences(expression):
+    period = Cron(expression)
+    start, end = pd.Timestamp("2023-12-20 10:02:30"), pd.Timestamp("2024-03-10 13:00:30")
+    starts, ends = period.occurrences(start, end)
+    # Same as the generic (rollforward based) calculation
+    expected_starts, expected_ends = TimePeriod.occurrences(period, start, end)
+    assert (starts == expected_starts).all()
+    assert (ends == expected_ends).all()
+
+@pytest.mark.parametrize("expression", [
+    "* * *", "60 * * * *", "*/0 * * * *", "5-1 * * * *", "x * * * *", "* * 0 * *",
+])
+def test_invalid(expression):
+    with pytest.raises(ValueError):
+        Cron(expression)
+
+def test_equal():
+    assert Cron("0 0 * * 0") == Cron("0 0 * * 7")
+    assert Cron("@daily") == Cron("0 0 * * *")
+    assert Cron("0 0 * * 1") != Cron("0 0 * * 2")
@@ -0,0 +1,103 @@
+import datetime
+
+import pytest
+import pandas as pd
+
+from redengine.core.time.utils import to_epoch_ns, epoch_ns_to_date, epoch_ns_to_datetime
+from redengine.time.interval import (
+    TimeOfMinute,
+    TimeOfHour,
+    TimeOfDay,
+    TimeOfWeek,
+    TimeOfMonth,
+    TimeOfYear,
+)
+from redengine.time import TimeDelta, StaticInterval
+
+@pytest.mark.parametrize("dt", [
+    pd.Timestamp("2022-03-15 11:22:33.123456789"),
+    pd.Timestamp("1969-12-31 23:59:59.999999"),
+    pd.Timestamp("2000-02-29"),
+])
+def test_epoch_ns(dt):
+    ns = to_epoch_ns(dt)
+    assert ns == dt.value
+    assert ns == to_epoch_ns(dt.to_pydatetime(warn=False)) + dt.nanosecond
+    assert epoch_ns_to_date(ns) == dt.date()
+    assert epoch_ns_to_datetime(ns) == dt.to_pydatetime(warn=False)
+
+def test_epoch_ns_tz():
+    dt = pd.Timestamp("2022-03-15 11:22:33", tz="Europe/Helsinki")
+    # Wall clock time
+    assert to_epoch_ns(dt) == pd.Timestamp("2022-03-15 11:22:33").value
+
+@pytest.mark.parametrize("period", [
+    TimeOfMinute("10", "20"),
+    TimeOfHour("10:00", "40:00"),
+    TimeOfDay("10:00", "12:00"),
+    TimeOfDay("22:00", "02:00"),
+    TimeOfWeek("Tue", "Thu"),
+    TimeOfMonth("5th", "20th"),
+    TimeOfYear("Feb", "Apr"),
+    TimeDelta("1 hour", "2 hours"),
+    StaticInterval(pd.Timestamp("2022-01-01"), pd.Timestamp("2022-06-01")),
+    TimeOfDay("10:00", "14:00") & TimeOfWeek("Tue", "Thu"),
+    TimeOfDay("10:00", "11:00") | TimeOfDay("11:00", "12:00"),
+])
+@pytest.mark.parametrize("dt", [
+    datetime.datetime(2022, 3, 15, 11, 22, 33, 123456),
+    datetime.datetime(2022, 3, 1),
+    datetime.datetime(2022, 2, 28, 23, 59, 59, 999999),
+])
+def test_input_types(period, dt):
+    # datetime and pd.Timestamp should give same results
+    ts = pd.Timestamp(dt)
+    for method in ("rollback", "rollforward"):
+        interval = getattr(period, method)(dt)
+        assert isinstance(interval, pd.Interval)
+        assert isinstance(interval.left, pd.Timestamp)
+        assert isinstance(interval.right, pd.Timestamp)
+        assert interval == getattr(period, method)(ts)
+    assert (dt in period) == (ts in period)
+
+def test_nanosecond():
+    time = TimeOfDay("10:00", "12:00")
+    dt = pd.Timestamp("2022-03-15 12:00:00.000000001")
+    assert dt not in time
+    assert time.rollback(dt) == pd.Interval(
+        pd.Timestamp("2022-03-15 10:00:00"),
+        pd.Timestamp("2022-03-15 12:00:00"),
+        closed="both"
+    )
+    assert time.next_start(dt) == pd.Timestamp("2022-03-16 10:00:00")
+
+def test_tz():
+    time = TimeOfDay("10:00", "12:00")
+    dt = pd.Timestamp("2022-03-15 11:00:00", tz="Europe/Helsinki")
+    interval = time.rollforward(dt)
+    assert interval.left == dt
+    assert interval.right == pd.Timestamp("2022-03-15 12:00:00", tz="Europe/Helsinki")
+
+@pytest.mark.parametrize("period,dt,start,end", [
+    pytest.param(TimeOfDay("10:00", "12:00"), "2022-03-15 11:00", "2022-03-15", "2022-03-16", id="day"),
+    pytest.param(TimeOfWeek("Tue", "Thu"), "2022-03-15 11:00", "2022-03-14", "2022-03-21", id="week"),
+    pytest.param(TimeOfMonth("5th", "20th"), "2024-02-15 11:00", "2024-02-01", "2024-03-01", id="month"),
+    pytest.param(TimeOfYear("Feb", "Apr"), "2024-02-15 11:00", "2024-02-01", "2024-03-01", id="year (by month)"),
+])
+def test_cycle_cache(period, dt, start, end):
+    ns = pd.Timestamp(dt).value
+    cycle = period._get_cycle(ns)
+    assert cycle[:2] == (pd.Timestamp(start).value, pd.Timestamp(end).value)
+    assert ns - cycle[2] == period.anchor_ns(ns)
+
+    # Same scope hits the cache
+    assert period._get_cycle(pd.Timestamp(end).value - 1) is cycle
+    period._get_cycle(pd.Timestamp(end).value)
+    assert period._get_cycle(ns) is cycle
+
+def test_cycle_cache_size():
+    period = TimeOfDay("10:00", "12:00")
+    period.cycle_cache_size = 3
+    for day in range(10):
+        period.rollforward(pd.Timestamp("2022-01-01") + pd.Timedelta(days=day))
+    assert len(period._cycle_cache) == 3
@@ -0,0 +1,114 @@
+import datetime
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from redengine.core.time import TimePeriod, StaticInterval, All, Any
+from redengine.time.interval import (
+    TimeOfMinute,
+    TimeOfHour,
+    TimeOfDay,
+    TimeOfWeek,
+    TimeOfMonth,
+    TimeOfYear,
+    RelativeDay,
+)
+from redengine.time import TimeDelta
+
+def to_list(arr):
+    return [pd.Timestamp(val) for val in arr]
+
+@pytest.mark.parametrize(
+    "period,start,end,exp_starts,exp_ends",
+    [
+        pytest.param(
+            TimeOfDay("10:00", "12:00"),
+            "2020-01-01 11:00", "2020-01-03 00:00",
+            ["2020-01-01 11:00", "2020-01-02 10:00"],
+            ["2020-01-01 12:00", "2020-01-02 12:00"],
+            id="TimeOfDay"),
+        pytest.param(
+            TimeOfDay("22:00", "02:00"),
+            "2020-01-01 00:00", "2020-01-02 23:00",
+            ["2020-01-01 00:00", "2020-01-01 22:00", "2020-01-02 22:00"],
+            ["2020-01-01 02:00", "2020-01-02 02:00", "2020-01-02 23:00"],
+            id="TimeOfDay overnight"),
+        pytest.param(
+            TimeOfWeek("Mon", time_point=True),
+            "2020-01-01 00:00", "2020-01-14 00:00",
+            ["2020-01-06 00:00", "2020-01-13 00:00"],
+            ["2020-01-06 23:59:59.999999999", "2020-01-13 23:59:59.999999999"],
+            id="TimeOfWeek"),
+        pytest.param(
+            TimeOfMonth("25th", "3rd"),
+            "2020-01-01 00:00", "2020-02-28 00:00",
+            ["2020-01-01 00:00", "2020-01-25 00:00", "2020-02-25 00:00"],
+            ["2020-01-03 23:59:59.999999999", "2020-02-03 23:59:59.999999999", "2020-02-28 00:00"],
+            id="TimeOfMonth over month"),
+        pytest.param(
+            TimeOfYear("Feb", "Mar"),
+            "2019-06-01 00:00", "2021-01-01 00:00",
+            ["2020-02-01 00:00"],
+            ["2020-03-31 23:59:59.999999999"],
+            id="TimeOfYear"),
+        pytest.param(
+            RelativeDay("yesterday", start_time=datetime.time(10), end_time=datetime.time(12)),
+            "2020-01-01 11:00", "2020-01-03 00:00",
+            ["2020-01-01 11:00", "2020-01-02 10:00"],
+            ["2020-01-01 12:00", "2020-01-02 12:00"],
+            id="RelativeDay"),
+        pytest.param(
+            StaticInterval(pd.Timestamp("2020-01-02"), pd.Timestamp("2020-01-05")),
+            "2020-01-01 00:00", "2020-01-03 00:00",
+            ["2020-01-02 00:00"],
+            ["2020-01-03 00:00"],
+            id="StaticInterval"),
+        pytest.param(
+            TimeDelta("1 hour"),
+            "2020-01-01 00:00", "2020-01-03 00:00",
+            ["2020-01-01 00:00"],
+            ["2020-01-03 00:00"],
+            id="TimeDelta"),
+        pytest.param(
+            TimeOfWeek("Fri", time_point=True) & TimeOfMonth("13th", time_point=True) & TimeOfDay("10:00", "11:00"),
+            "2020-01-01 00:00", "2020-12-31 00:00",
+            ["2020-03-13 10:00", "2020-11-13 10:00"],
+            ["2020-03-13 11:00", "2020-11-13 11:00"],
+            id="All"),
+        pytest.param(
+            TimeOfDay("08:00", "09:00") | TimeOfDay("09:00", "10:00") | TimeOfDay("12:00", "13:00"),
+            "2020-01-01 00:00", "2020-01-01 23:00",
+            ["2020-01-01 08:00", "2020-01-01 12:00"],
+            ["2020-01-01 10:00", "2020-01-01 13:00"],
+            id="Any"),
+    ],
+)
+def test_occurrences(period, start, end, exp_starts, exp_ends):
+    starts, ends = period.occurrences(pd.Timestamp(start), pd.Timestamp(end))
+    assert starts.dtype == np.dtype("datetime64[ns]")
+    assert ends.dtype == np.dtype("datetime64[ns]")
+    assert to_list(starts) == [pd.Timestamp(val) for val in exp_starts]
+    assert to_list(ends) == [pd.Timestamp(val) for val in exp_ends]
+
+@pytest.mark.parametrize(
+    "period",
+    [
+        TimeOfMinute("10", "20"),
+        TimeOfHour("50:00", "10:00"),
+        TimeOfDay("22:00", "02:00"),
+        TimeOfWeek("Sat", "Mon"),
+        TimeOfMonth("5th", "20th"),
+        TimeOfYear("Jan 15th", "Feb 10th"),
+        TimeOfDay("10:00", "14:00") & TimeOfWeek("Tue", "Thu"),
+        TimeOfDay("10:00", "11:00") | TimeOfDay("11:00", "12:00"),
+    ],
+)
+def test_occurrences_as_rolling(period):
+    # Bulk calculation should be the same as rolling forward
+    start = pd.Timestamp("2020-01-01 05:13")
+    end = pd.Timestamp("2020-02-15 18:00")
+    starts, ends = period.occurrences(start, end)
+    roll_starts, roll_ends = TimePeriod._occurrences_ns(period, start.value, end.value)
+    assert starts.astype(np.int64).tolist() == roll_starts.tolist()
+    assert ends.astype(np.int64).tolist() == roll_ends.tolist()
@@ -1,12 +1,13 @@
 
 from redengine.parse import parse_time
-from redengine.time import TimeOfDay, TimeOfHour, TimeOfMinute, TimeDelta, TimeOfWeek, TimeOfYear, TimeOfMonth
+from redengine.time import TimeOfDay, TimeOfHour, TimeOfMinute, TimeDelta, TimeOfWeek, TimeOfYear, TimeOfMonth, Cron
 
 import pytest
 
 @pytest.mark.parametrize(
     "time_str,expected", [
         pytest.param("every 10 seconds", TimeDelta("10 seconds"), id="every"),
+        pytest.param("cron '*/5 9-17 * * 1-5'", Cron("*/5 9-17 * * 1-5"), id="cron"),
 
         pytest.param("time of minute between 15:00 and 30:00", TimeOfMinute("15:00", "30:00"), id="TimeOfMinute between"),
         pytest.param("time of minute before 30:00", TimeOfMinute(None, "30:00"), id="TimeOfMinute before"),
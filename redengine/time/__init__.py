@@ -1,4 +1,5 @@
 from .interval import *
+from .cron import Cron
 from redengine.core.time import TimeDelta, StaticInterval, All, Any
 
 # Syntax
@@ -18,6 +19,7 @@ Session._time_parsers.update(
 
         re.compile(r"every (?P<past>.+)"): TimeDelta,
         re.compile(r"past (?P<past>.+)"): TimeDelta,
+        re.compile(r"cron '(?P<expression>.+)'"): Cron,
         "always": StaticInterval(),
         "never": StaticInterval(start=StaticInterval.max - StaticInterval.resolution),
     }
@@ -0,0 +1,237 @@
+import re
+import datetime
+from bisect import bisect_left, bisect_right
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from redengine.core.time.base import TimePeriod, _clip_occurrences, _to_interval, _MIN_NS, _MAX_NS
+from redengine.core.time.utils import to_epoch_ns, to_nanoseconds, DAY_NS, EPOCH_WEEKDAY, _EPOCH_ORDINAL
+
+MINUTE_NS = to_nanoseconds(minute=1)
+
+# Day of week of cron (Sunday is 0) of the epoch
+_EPOCH_CRON_WEEKDAY = (EPOCH_WEEKDAY + 1) % 7
+
+# Maximum days searched for the next (or previous) match.
+# The calendar repeats in 400 years but 28 years already
+# contains every combination of leap day and weekday.
+_MAX_SEARCH_DAYS = 366 * 28
+
+_MONTH_NAMES = {name: i for i, name in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1)}
+_WEEKDAY_NAMES = {name: i for i, name in enumerate(("sun", "mon", "tue", "wed", "thu", "fri", "sat"))}
+
+# Fields as (name, min, max, value names)
+_FIELDS = (
+    ("minute", 0, 59, None),
+    ("hour", 0, 23, None),
+    ("day of month", 1, 31, None),
+    ("month", 1, 12, _MONTH_NAMES),
+    ("day of week", 0, 7, _WEEKDAY_NAMES),
+)
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+def _parse_value(s:str, field:tuple) -> int:
+    name, low, high, names = field
+    if names is not None and s.lower() in names:
+        return names[s.lower()]
+    if not s.isdigit() or not low <= int(s) <= high:
+        raise ValueError(f"Invalid {name} in cron expression: {s!r}")
+    return int(s)
+
+def _parse_field(s:str, field:tuple) -> Tuple[int, bool]:
+    """Parse a field of a cron expression to a bitmask.
+    Returns also whether the field is unrestricted (*)"""
+    name, low, high, _ = field
+    mask = 0
+    for item in s.split(","):
+        value_range, _, step = item.partition("/")
+        if step:
+            if not step.isdigit() or int(step) == 0:
+                raise ValueError(f"Invalid step in cron expression: {item!r}")
+            step = int(step)
+        else:
+            step = 1
+
+        if value_range == "*":
+            start, end = low, high
+        elif "-" in value_range:
+            start, end = value_range.split("-", 1)
+            start, end = _parse_value(start, field), _parse_value(end, field)
+            if start > end:
+                raise ValueError(f"Invalid range in cron expression: {item!r}")
+        else:
+            start = _parse_value(value_range, field)
+            # ie. 5/15 means from 5 to the end every 15
+            end = high if step != 1 else start
+        for value in range(start, end + 1, step):
+            mask |= 1 << value
+    return mask, s == "*"
+
+
+class Cron(TimePeriod):
+    """Time period of the minutes matching a cron expression.
+
+    The fields of the expression are compiled to bitmasks
+    (minute of day, day of month, month and day of week)
+    thus checking whether a moment is in the period and
+    searching the next matching minute are bit operations
+    without calendar arithmetic. Each matching minute is
+    a separate interval: a task with ``cron '*/5 * * * *'``
+    runs once every 5 minutes.
+
+    As in cron, if both day of month and day of week are
+    restricted, a day matches if either of them matches.
+
+    Parameters
+    ----------
+    expression : str
+        Cron expression with fields minute, hour, day of month,
+        month and day of week (ie. ``*/5 9-17 * * 1-5``) or
+        a macro (``@yearly``, ``@monthly``, ``@weekly``,
+        ``@daily`` or ``@hourly``).
+
+    Examples
+    --------
+    >>> from redengine.time import Cron
+    >>> Cron("*/5 9-17 * * mon-fri")
+    Cron('*/5 9-17 * * mon-fri')
+    """
+
+    def __init__(self, expression:str):
+        self.expression = expression
+        fields = _MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expression!r}")
+        (minutes, _), (hours, _), (days, any_day), (months, _), (weekdays, any_weekday) = (
+            _parse_field(s, field) for s, field in zip(fields, _FIELDS)
+        )
+        if weekdays & (1 << 7):
+            # 7 is also Sunday
+            weekdays = (weekdays | 1) & ~(1 << 7)
+
+        self._months = months
+        self._days = days
+        self._weekdays = weekdays
+        if any_day and not any_weekday:
+            self._days = 0
+        elif any_weekday and not any_day:
+            self._weekdays = 0
+
+        # Minutes of day as a bitmask and as sorted list (for searching)
+        self._day_minutes = [
+            hour * 60 + minute
+            for hour in range(24) if hours >> hour & 1
+            for minute in range(60) if minutes >> minute & 1
+        ]
+        self._day_minute_mask = sum(1 << minute for minute in self._day_minutes)
+
+        # Lookups for vectorized calculations
+        self._month_table = np.array([bool(months >> i & 1) for i in range(13)])
+        self._day_table = np.array([bool(self._days >> i & 1) for i in range(32)])
+        self._weekday_table = np.array([bool(self._weekdays >> i & 1) for i in range(7)])
+
+    def __contains__(self, dt):
+        return self._match_ns(to_epoch_ns(dt))
+
+    def rollforward(self, dt):
+        "Get next minute of the period (or current if in the period)"
+        return _to_interval(self._rollforward_span(to_epoch_ns(dt)), like=dt)
+
+    def rollback(self, dt):
+        "Get previous minute of the period (or current if in the period)"
+        return _to_interval(self._rollback_span(to_epoch_ns(dt)), like=dt)
+
+    def _match_ns(self, ns:int) -> bool:
+        day, ns_of_day = divmod(ns, DAY_NS)
+        return bool(self._day_minute_mask >> (ns_of_day // MINUTE_NS) & 1) and self._match_day(day)
+
+    def _match_day(self, day:int) -> bool:
+        "Whether the day (days from epoch) matches"
+        date = datetime.date.fromordinal(_EPOCH_ORDINAL + day)
+        if not self._months >> date.month & 1:
+            return False
+        weekday = (day + _EPOCH_CRON_WEEKDAY) % 7
+        return bool(self._days >> date.day & 1 or self._weekdays >> weekday & 1)
+
+    def _rollforward_span(self, ns:int) -> tuple:
+        if self._match_ns(ns):
+            return (ns, ns - ns % MINUTE_NS + MINUTE_NS - 1, "both")
+        start = self._next_start(ns)
+        if start is None:
+            return (_MAX_NS, _MAX_NS, "both")
+        return (start, start + MINUTE_NS - 1, "both")
+
+    def _rollback_span(self, ns:int) -> tuple:
+        if self._match_ns(ns):
+            return (ns - ns % MINUTE_NS, ns, "both")
+        start = self._prev_start(ns)
+        if start is None:
+            return (_MIN_NS, _MIN_NS, "both")
+        return (start, start + MINUTE_NS - 1, "both")
+
+    def _next_start(self, ns:int) -> Optional[int]:
+        "Get start of the next matching minute after ns"
+        day, ns_of_day = divmod(ns, DAY_NS)
+        minutes = self._day_minutes
+        if self._match_day(day):
+            i = bisect_right(minutes, ns_of_day // MINUTE_NS)
+            if i < len(minutes):
+                return day * DAY_NS + minutes[i] * MINUTE_NS
+        for day in range(day + 1, day + 1 + _MAX_SEARCH_DAYS):
+            if self._match_day(day):
+                return day * DAY_NS + minutes[0] * MINUTE_NS
+        return None
+
+    def _prev_start(self, ns:int) -> Optional[int]:
+        "Get start of the previous matching minute before ns"
+        day, ns_of_day = divmod(ns, DAY_NS)
+        minutes = self._day_minutes
+        if self._match_day(day):
+            i = bisect_left(minutes, ns_of_day // MINUTE_NS)
+            if i > 0:
+                return day * DAY_NS + minutes[i - 1] * MINUTE_NS
+        for day in range(day - 1, day - 1 - _MAX_SEARCH_DAYS, -1):
+            if self._match_day(day):
+                return day * DAY_NS + minutes[-1] * MINUTE_NS
+        return None
+
+    def _occurrences_ns(self, start, end):
+        days = np.arange(start // DAY_NS, end // DAY_NS + 1, dtype=np.int64)
+        dates = days.astype("datetime64[D]")
+        months = dates.astype("datetime64[M]")
+        month_numbers = months.astype(np.int64) % 12 + 1
+        month_days = (dates - months).astype(np.int64) + 1
+        weekdays = (days + _EPOCH_CRON_WEEKDAY) % 7
+
+        is_match = self._month_table[month_numbers] & (self._day_table[month_days] | self._weekday_table[weekdays])
+        minutes = np.array(self._day_minutes, dtype=np.int64) * MINUTE_NS
+        starts = (days[is_match][:, None] * DAY_NS + minutes[None, :]).ravel()
+        return _clip_occurrences(starts, starts + MINUTE_NS - 1, start, end)
+
+    def __eq__(self, other):
+        "Test whether self and other are essentially the same periods"
+        if type(self) == type(other):
+            return (
+                self._day_minutes == other._day_minutes
+                and self._months == other._months
+                and self._days == other._days
+                and self._weekdays == other._weekdays
+            )
+        else:
+            return False
+
+    def __str__(self):
+        return f"cron '{self.expression}'"
+
+    def __repr__(self):
+        return f"Cron({self.expression!r})"
@@ -2,12 +2,19 @@
 import calendar
 import re
 
+import datetime
+
 import dateutil
+import numpy as np
 import pandas as pd
 
-from redengine.core.time.anchor import AnchoredInterval
-from redengine.core.time.base import TimeInterval
-from redengine.core.time.utils import timedelta_to_str, to_dict, to_nanoseconds
+from redengine.core.time.anchor import AnchoredInterval, _fixed_cycle, _fixed_cycles
+from redengine.core.time.base import TimeInterval, _clip_occurrences
+from redengine.core.time.utils import (
+    timedelta_to_str, to_dict, to_nanoseconds,
+    to_epoch_ns, epoch_ns_to_date, timedelta_to_ns, days_in_month,
+    EPOCH_WEEKDAY, DAY_NS, _EPOCH_ORDINAL
+)
 
 
 class TimeOfMinute(AnchoredInterval):
@@ -25,6 +32,19 @@ class TimeOfMinute(AnchoredInterval):
     _scope_max = to_nanoseconds(minute=1) - 1 # See: pd.Timedelta(59999999999, unit="ns")
     _unit_resolution = to_nanoseconds(second=1)
 
+    def anchor_ns(self, ns, **kwargs):
+        "Turn nanoseconds from epoch to nanoseconds of the minute"
+        return ns % (self._scope_max + 1)
+
+    def _cycle_key(self, ns):
+        return ns // (self._scope_max + 1)
+
+    def _compute_cycle(self, ns):
+        return _fixed_cycle(ns, self._scope_max + 1)
+
+    def _get_cycles(self, start, end):
+        return _fixed_cycles(start, end, self._scope_max + 1)
+
     def anchor_str(self, s, **kwargs):
         # ie. 30.123
         res = re.search(r"(?P<second>[0-9][0-9])([.](?P<microsecond>[0-9]{0,6}))?(?P<nanosecond>[0-9]+)?", s, flags=re.IGNORECASE)
@@ -54,6 +74,19 @@ class TimeOfHour(AnchoredInterval):
     _scope_max = to_nanoseconds(hour=1) - 1
     _unit_resolution = to_nanoseconds(minute=1)
 
+    def anchor_ns(self, ns, **kwargs):
+        "Turn nanoseconds from epoch to nanoseconds of the hour"
+        return ns % (self._scope_max + 1)
+
+    def _cycle_key(self, ns):
+        return ns // (self._scope_max + 1)
+
+    def _compute_cycle(self, ns):
+        return _fixed_cycle(ns, self._scope_max + 1)
+
+    def _get_cycles(self, start, end):
+        return _fixed_cycles(start, end, self._scope_max + 1)
+
     def anchor_str(self, s, **kwargs):
         # ie. 12:30.123
         res = re.search(r"(?P<minute>[0-9][0-9]):(?P<second>[0-9][0-9])([.](?P<microsecond>[0-9]{0,6}))?(?P<nanosecond>[0-9]+)?", s, flags=re.IGNORECASE)
@@ -92,13 +125,20 @@ class TimeOfDay(AnchoredInterval):
 
     def anchor_dt(self, dt, **kwargs):
         "Turn datetime to nanoseconds according to the scope (by removing higher time elements)"
-        d = to_dict(dt)
-        d = {
-            key: val
-            for key, val in d.items()
-            if key in ("hour", "minute", "second", "microsecond", "nanosecond")
-        }
-        return to_nanoseconds(**d) 
+        return self.anchor_ns(to_epoch_ns(dt))
+
+    def anchor_ns(self, ns, **kwargs):
+        "Turn nanoseconds from epoch to nanoseconds of the day"
+        return ns % DAY_NS
+
+    def _cycle_key(self, ns):
+        return ns // DAY_NS
+
+    def _compute_cycle(self, ns):
+        return _fixed_cycle(ns, DAY_NS)
+
+    def _get_cycles(self, start, end):
+        return _fixed_cycles(start, end, DAY_NS)
 
 class TimeOfWeek(AnchoredInterval):
     """Time interval anchored to week cycle
@@ -139,14 +179,23 @@ class TimeOfWeek(AnchoredInterval):
 
     def anchor_dt(self, dt, **kwargs):
         "Turn datetime to nanoseconds according to the scope (by removing higher time elements)"
-        d = to_dict(dt)
-        d = {
-            key: val
-            for key, val in d.items()
-            if key in ("hour", "minute", "second", "microsecond", "nanosecond")
-        }
-        dayofweek = dt.weekday()
-        return to_nanoseconds(**d) + dayofweek * to_nanoseconds(day=1)
+        return self.anchor_ns(to_epoch_ns(dt))
+
+    def anchor_ns(self, ns, **kwargs):
+        "Turn nanoseconds from epoch to nanoseconds of the week"
+        # Epoch is not Monday thus shifting
+        return (ns + EPOCH_WEEKDAY * DAY_NS) % (7 * DAY_NS)
+
+    def _cycle_key(self, ns):
+        # ISO week (from Monday)
+        return (ns + EPOCH_WEEKDAY * DAY_NS) // (7 * DAY_NS)
+
+    def _compute_cycle(self, ns):
+        return _fixed_cycle(ns, 7 * DAY_NS, shift=-EPOCH_WEEKDAY * DAY_NS)
+
+    def _get_cycles(self, start, end):
+        # Weeks start from Monday
+        return _fixed_cycles(start, end, 7 * DAY_NS, shift=-EPOCH_WEEKDAY * DAY_NS)
 
 
 class TimeOfMonth(AnchoredInterval):
@@ -201,27 +250,37 @@ class TimeOfMonth(AnchoredInterval):
 
     def anchor_dt(self, dt, **kwargs):
         "Turn datetime to nanoseconds according to the scope (by removing higher time elements)"
-        d = to_dict(dt)
-        d = {
-            key: val
-            for key, val in d.items()
-            if key in ("day", "hour", "minute", "second", "microsecond", "nanosecond")
-        }
-        if "day" in d:
-            # Day (of month) does not start from 0 (but from 1)
-            d["day"] = d["day"] - 1
-
-        return to_nanoseconds(**d)
+        return self.anchor_ns(to_epoch_ns(dt))
+
+    def anchor_ns(self, ns, **kwargs):
+        "Turn nanoseconds from epoch to nanoseconds of the month"
+        # Day (of month) does not start from 0 (but from 1)
+        day = epoch_ns_to_date(ns).day - 1
+        return day * DAY_NS + ns % DAY_NS
+
+    def _get_cycles(self, start, end):
+        first = np.datetime64(epoch_ns_to_date(start), "M") - 1
+        last = np.datetime64(epoch_ns_to_date(end), "M") + 1
+        months = np.arange(first, last + 1)
+        return months.astype("datetime64[ns]").astype(np.int64)
+
+    def _cycle_key(self, ns):
+        date = epoch_ns_to_date(ns)
+        return (date.year, date.month)
+
+    def _compute_cycle(self, ns):
+        date = epoch_ns_to_date(ns)
+        start = (date.toordinal() - _EPOCH_ORDINAL - date.day + 1) * DAY_NS
+        length = days_in_month(date.year, date.month) * DAY_NS
+        return (start, start + length, start, self.get_scope_back(date), length)
 
     def get_scope_forward(self, dt):
-        n_days = calendar.monthrange(dt.year, dt.month)[1]
-        return to_nanoseconds(day=1) * n_days
+        return DAY_NS * days_in_month(dt.year, dt.month)
 
     def get_scope_back(self, dt):
         month = 12 if dt.month == 1 else dt.month - 1
         year = dt.year - 1 if dt.month == 1 else dt.year
-        n_days = calendar.monthrange(year, month)[1]
-        return to_nanoseconds(day=1) * n_days
+        return DAY_NS * days_in_month(year, month)
 
 class TimeOfYear(AnchoredInterval):
     """Time interval anchored to day cycle of a clock
@@ -274,17 +333,40 @@ class TimeOfYear(AnchoredInterval):
 
     def anchor_dt(self, dt, **kwargs):
         "Turn datetime to nanoseconds according to the scope (by removing higher time elements)"
-        dt_dict = to_dict(dt)
-        d = {
-            key: val
-            for key, val in dt_dict.items()
-            if key in ("day", "hour", "minute", "second", "microsecond", "nanosecond")
-        }
-        nth_month = dt_dict["month"] - 1
-        if "day" in d:
-            # Day (of month) does not start from 0 (but from 1)
-            d["day"] = d["day"] - 1
-        return nth_month * to_nanoseconds(day=31) + to_nanoseconds(**d)
+        return self.anchor_ns(to_epoch_ns(dt))
+
+    def anchor_ns(self, ns, **kwargs):
+        "Turn nanoseconds from epoch to nanoseconds of the year"
+        date = epoch_ns_to_date(ns)
+        nth_month = date.month - 1
+        # Day (of month) does not start from 0 (but from 1)
+        day = date.day - 1
+        return nth_month * to_nanoseconds(day=31) + day * DAY_NS + ns % DAY_NS
+
+    def _cycle_key(self, ns):
+        # Months are anchored as 31 days thus
+        # the relative nanoseconds shift monthly
+        date = epoch_ns_to_date(ns)
+        return (date.year, date.month)
+
+    def _compute_cycle(self, ns):
+        date = epoch_ns_to_date(ns)
+        start = (date.toordinal() - _EPOCH_ORDINAL - date.day + 1) * DAY_NS
+        end = start + days_in_month(date.year, date.month) * DAY_NS
+        offset = start - (date.month - 1) * to_nanoseconds(day=31)
+        return (start, end, offset, self.get_scope_back(date), self.get_scope_forward(date))
+
+    def _get_cycles(self, start, end):
+        first = np.datetime64(epoch_ns_to_date(start), "Y") - 1
+        last = np.datetime64(epoch_ns_to_date(end), "Y") + 1
+        years = np.arange(first, last + 1)
+        return years.astype("datetime64[ns]").astype(np.int64)
+
+    def _offset_cycles(self, cycles, ns):
+        # Months are anchored as 31 days
+        nth_month, ns = divmod(ns, to_nanoseconds(day=31))
+        months = cycles.astype("datetime64[ns]").astype("datetime64[M]") + nth_month
+        return months.astype("datetime64[ns]").astype(np.int64) + ns
 
 
 class RelativeDay(TimeInterval):
@@ -320,6 +402,19 @@ class RelativeDay(TimeInterval):
     def rollforward(self, dt):
         raise AttributeError("RelativeDay has no next day")
 
+    def _occurrences_ns(self, start, end):
+        # The days the period refers to when
+        # the reference is in the range
+        offset = timedelta_to_ns(self.offsets[self.day]) // DAY_NS
+        days = np.arange(start // DAY_NS - offset, end // DAY_NS - offset + 1, dtype=np.int64) * DAY_NS
+
+        start_time = self.start_time
+        end_time = self.end_time
+        # Dates (the defaults) are considered as full days
+        ns_start = _time_to_ns(start_time) if isinstance(start_time, datetime.time) else 0
+        ns_end = _time_to_ns(end_time) if isinstance(end_time, datetime.time) else DAY_NS - 1
+        return _clip_occurrences(days + ns_start, days + ns_end, start, end)
+
     def __repr__(self):
         args_str = str(self.day)
         if self.start_time != self.min.date():
@@ -328,3 +423,6 @@ class RelativeDay(TimeInterval):
             args_str += f', end_time={self.end_time}'
 
         return f"RelativeDay({args_str})"
+
+def _time_to_ns(time:datetime.time) -> int:
+    return to_nanoseconds(hour=time.hour, minute=time.minute, second=time.second, microsecond=time.microsecond)